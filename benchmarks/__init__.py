@@ -0,0 +1,65 @@
+"""
+Pyfranca benchmarks.
+
+Run a benchmark from the repository root, e.g.:
+
+    python -m benchmarks.parser_tables
+
+The suite covers the lexers, the parser, the processor and the tools on
+generated models of several sizes, with stored baselines:
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+"""
+
+import resource
+import sys
+import timeit
+from pyfranca import ModelGenerator
+
+
+def generate_fidl(units, **kwargs):
+    """
+    Generate a single-file model with ModelGenerator - a package with an
+    interface and four types per unit.
+
+    :param units: Number of interfaces.
+    :param kwargs: Further ModelGenerator arguments.
+    :return: FIDL text.
+    """
+    kwargs.setdefault("types", 4 * units)
+    generator = ModelGenerator(packages=1, interfaces=units, **kwargs)
+    return generator.generate()[generator.file_name(0)]
+
+
+def bench(functions, count):
+    """
+    Time functions, alternating between them to even out the noise.
+
+    :return: A list of the best times.
+    """
+    results = [float("inf")] * len(functions)
+    for _ in range(count):
+        for i, function in enumerate(functions):
+            start = timeit.default_timer()
+            function()
+            results[i] = min(results[i], timeit.default_timer() - start)
+    return results
+
+
+def peak_rss():
+    """
+    Get the peak resident set size of the process in bytes. The ru_maxrss
+    of a new process starts at the one of its parent on Linux - the high
+    water mark of the process image is used there instead.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    # Kilobytes on Linux, bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
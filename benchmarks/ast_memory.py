@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+AST memory benchmark - retained bytes per AST node of a parsed model, before
+and after slotted node classes.
+
+The "before" figure is measured on a copy of the model with dict-based
+nodes, laid out like the AST nodes before __slots__ - with a per-instance
+__dict__, own empty containers for absent comments, arguments and flags,
+and an own instance per use of a primitive type. The "after" figure is
+measured on a deep copy of the model. Both copies share the names and
+values with the parsed model, so that only the nodes and their containers
+are counted.
+"""
+
+import argparse
+import copy
+import gc
+import tracemalloc
+from collections import OrderedDict
+from pyfranca import Parser, ast
+from benchmarks import generate_fidl
+
+
+class DictNode(object):
+    """ AST node with a per-instance __dict__. """
+    pass
+
+
+def slot_names(node):
+    """ Get the slot names of an AST node. """
+    for cls in type(node).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            yield name
+
+
+def dict_nodes(package):
+    """ Copy an AST into dict-based nodes. """
+    memo = {}
+
+    def convert(value):
+        if value is ast.EMPTY_MAPPING:
+            return OrderedDict()
+        if value is ast.EMPTY_LIST:
+            return []
+        result = memo.get(id(value))
+        if result is not None:
+            return result
+        if isinstance(value, ast._Slotted):
+            result = DictNode()
+            if not isinstance(value, ast.PrimitiveType):
+                memo[id(value)] = result
+            for name in slot_names(value):
+                if hasattr(value, name):
+                    result.__dict__[name] = convert(getattr(value, name))
+        elif isinstance(value, dict):
+            result = memo[id(value)] = OrderedDict()
+            for key, item in value.items():
+                result[key] = convert(item)
+        elif isinstance(value, list):
+            result = memo[id(value)] = [convert(item) for item in value]
+        else:
+            result = value
+        return result
+
+    return convert(package)
+
+
+def count_nodes():
+    """ Count the live AST node objects. """
+    return sum(1 for item in gc.get_objects()
+               if type(item).__module__ == "pyfranca.ast")
+
+
+def traced(function, *args):
+    """ Measure the memory retained by the result of a function. """
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def measure(fidl):
+    """ Parse a model and measure the memory it retains. """
+    parser = Parser()
+    gc.collect()
+    nodes_before = count_nodes()
+    size, package = traced(parser.parse, fidl)
+    nodes = count_nodes() - nodes_before
+    before, _ = traced(dict_nodes, package)
+    after, _ = traced(copy.deepcopy, package)
+    uses = sum(1 for _ in ast.walk(package))
+    return size, nodes, before, after, uses
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="AST memory benchmark.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=500,
+        help="Number of interfaces in the model.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    size, nodes, before, after, uses = measure(generate_fidl(args.count))
+
+    print("Retained AST memory:")
+    print("\t{:<24}{:>10d}".format("nodes", nodes))
+    print("\t{:<24}{:>10.1f} KiB".format("total", size / 1024.0))
+    print("\t{:<24}{:>10.1f} B".format("per node", float(size) / nodes))
+    print("Node structure of {} node uses:".format(uses))
+    print("\t{:<24}{:>10.1f} B/node".format("before, dict-based",
+                                            float(before) / uses))
+    print("\t{:<24}{:>10.1f} B/node".format("after, slotted",
+                                            float(after) / uses))
+    print("\t{:<24}{:>10.1f} %".format("saving",
+                                      (1.0 - float(after) / before) * 100))
+
+
+if __name__ == "__main__":
+    main()
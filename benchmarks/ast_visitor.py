@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+AST traversal benchmark - visitor dispatch vs. an isinstance cascade.
+
+Both traversals collect the type references of all namespaces of a model,
+descending into the same nodes. The cascade follows the structure of the
+type linking code of the processor before it was ported to
+ast.NodeVisitor.
+"""
+
+import argparse
+import timeit
+from pyfranca import Parser, ast
+from benchmarks import generate_fidl
+
+
+class CascadeCollector(object):
+    """ Collect type references with an isinstance cascade. """
+
+    def __init__(self):
+        self.references = []
+
+    def namespace(self, namespace):
+        for name in namespace.typedefs.values():
+            self.type(name)
+        for name in namespace.enumerations.values():
+            self.type(name)
+        for name in namespace.structs.values():
+            self.type(name)
+        for name in namespace.arrays.values():
+            self.type(name)
+        for name in namespace.maps.values():
+            self.type(name)
+        for name in namespace.constants.values():
+            self.type(name)
+        if isinstance(namespace, ast.Interface):
+            for name in namespace.attributes.values():
+                self.type(name)
+            for name in namespace.methods.values():
+                self.type(name)
+            for name in namespace.broadcasts.values():
+                self.type(name)
+
+    def complextype(self, name):
+        if isinstance(name, ast.Enumeration):
+            pass
+        elif isinstance(name, ast.Struct):
+            for field in name.fields.values():
+                self.type(field.type)
+        elif isinstance(name, ast.Array):
+            self.type(name.type)
+        elif isinstance(name, ast.Map):
+            self.type(name.key_type)
+            self.type(name.value_type)
+        elif isinstance(name, ast.Constant):
+            self.type(name.type)
+
+    def type(self, name):
+        if isinstance(name, ast.Typedef):
+            self.type(name.type)
+        elif isinstance(name, ast.PrimitiveType):
+            pass
+        elif isinstance(name, ast.ComplexType):
+            self.complextype(name)
+        elif isinstance(name, ast.Reference):
+            self.references.append(name)
+        elif isinstance(name, ast.Attribute):
+            self.type(name.type)
+        elif isinstance(name, ast.Method):
+            for arg in name.in_args.values():
+                self.type(arg.type)
+            for arg in name.out_args.values():
+                self.type(arg.type)
+            if isinstance(name.errors, ast.Reference):
+                self.type(name.errors)
+        elif isinstance(name, ast.Broadcast):
+            for arg in name.out_args.values():
+                self.type(arg.type)
+
+
+class VisitorCollector(ast.NodeVisitor):
+    """ Collect type references with a visitor. """
+
+    def __init__(self):
+        self.references = []
+        self._table = self.get_dispatch_table()
+
+    def visit_Namespace(self, namespace):
+        table = self._table
+        for field in namespace._member_fields:
+            for name in getattr(namespace, field).values():
+                table[name.__class__](name)
+
+    def visit_PrimitiveType(self, name):
+        pass
+
+    def visit_Typedef(self, name):
+        self._table[name.type.__class__](name.type)
+
+    visit_Array = visit_Constant = visit_Attribute = visit_Typedef
+
+    def visit_Enumeration(self, name):
+        pass
+
+    def visit_Struct(self, name):
+        table = self._table
+        for field in name.fields.values():
+            table[field.type.__class__](field.type)
+
+    def visit_Map(self, name):
+        self._table[name.key_type.__class__](name.key_type)
+        self._table[name.value_type.__class__](name.value_type)
+
+    def visit_Reference(self, name):
+        self.references.append(name)
+
+    def visit_Method(self, name):
+        table = self._table
+        for arg in name.in_args.values():
+            table[arg.type.__class__](arg.type)
+        for arg in name.out_args.values():
+            table[arg.type.__class__](arg.type)
+        if isinstance(name.errors, ast.Reference):
+            self.visit_Reference(name.errors)
+
+    def visit_Broadcast(self, name):
+        table = self._table
+        for arg in name.out_args.values():
+            table[arg.type.__class__](arg.type)
+
+
+class NodeCounter(ast.NodeVisitor):
+    """ Count all nodes with the generic child iteration. """
+
+    def __init__(self):
+        self.count = 0
+
+    def generic_visit(self, node):
+        self.count += 1
+        super(NodeCounter, self).generic_visit(node)
+
+
+def bench(package, count):
+    """ Time collecting the references of all namespaces. """
+    namespaces = list(package.typecollections.values()) + \
+        list(package.interfaces.values())
+
+    def cascade():
+        collector = CascadeCollector()
+        for namespace in namespaces:
+            collector.namespace(namespace)
+        return collector.references
+
+    def visitor():
+        collector = VisitorCollector()
+        for namespace in namespaces:
+            collector.visit(namespace)
+        return collector.references
+
+    def generic():
+        counter = NodeCounter()
+        counter.visit(package)
+        return counter.count
+
+    assert cascade() == visitor()
+    return len(visitor()), generic(), [
+        min(timeit.repeat(function, number=1, repeat=count))
+        for function in (cascade, visitor, generic)]
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="AST traversal benchmark.")
+    parser.add_argument(
+        "-m", "--units", type=int, default=500,
+        help="Number of interfaces in the model.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=20,
+        help="Number of measurements.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    package = Parser().parse(generate_fidl(args.units))
+    references, nodes, (cascade, visitor, generic) = bench(package,
+                                                           args.count)
+
+    print("Collecting {} type references:".format(references))
+    print("\t{:<24}{:>10.3f} ms".format("isinstance cascade", cascade * 1e3))
+    print("\t{:<24}{:>10.3f} ms".format("NodeVisitor", visitor * 1e3))
+    print("\t{:<24}{:>10.1f}x".format("speedup", cascade / visitor))
+    print("Visiting all {} nodes:".format(nodes))
+    print("\t{:<24}{:>10.3f} ms".format("generic_visit()", generic * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Comment scanning benchmark - pathological inputs: huge block and structured
+comments and an unterminated comment, scanned by the find-based lexer rules,
+the FastLexer and the former lazy regular expression rules.
+"""
+
+import argparse
+import timeit
+from pyfranca import Lexer, FastLexer, LexerException
+
+
+class RegexCommentLexer(Lexer):
+    """ Lexer with the former regular expression comment rules. """
+
+    # noinspection PyPep8Naming,PyIncorrectDocstring
+    @staticmethod
+    def t_BLOCK_COMMENT(t):
+        # noinspection PySingleQuotedDocstring
+        r"/\*(.|\n)*?\*/"
+        t.lexer.lineno += t.value.count("\n")
+
+    # noinspection PyPep8Naming,PyIncorrectDocstring
+    @staticmethod
+    def t_STRUCTURED_COMMENT(t):
+        # noinspection PySingleQuotedDocstring
+        r"<\*\*(.|\n)*?\*\*>"
+        t.lexer.lineno += t.value.count("\n")
+        t.value = t.value[3:-3].strip()
+        return t
+
+
+def make_inputs(size):
+    """ Generate the pathological inputs of about the given size. """
+    text = ("* Licensed under the Apache License, Version 2.0 - see the "
+            "LICENSE file. *\n") * (size // 80)
+    return [
+        ("block comment", "/*" + text + "*/\npackage P"),
+        ("structured comment", "<**" + text + "**>\npackage P"),
+        ("unterminated comment", "package P\n/*" + text),
+        ("unterminated openers", "package P\n" + "/* <** " * (size // 8)),
+    ]
+
+
+def tokenize(lexer_class, data):
+    """ Tokenize an input, ignoring lexer errors. """
+    try:
+        lexer_class().tokenize_data(data)
+    except LexerException:
+        pass
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Comment scanning benchmark.")
+    parser.add_argument(
+        "-s", "--size", type=float, default=10.0,
+        help="Size of the inputs in megabytes.")
+    parser.add_argument(
+        "--no-regex", action="store_true",
+        help="Skip the regular expression comment rules.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    lexers = [("find-based rules", Lexer), ("FastLexer", FastLexer)]
+    if not args.no_regex:
+        lexers.append(("regex rules", RegexCommentLexer))
+    for name, data in make_inputs(int(args.size * 1e6)):
+        megabytes = len(data) / 1e6
+        print("{} ({:.1f} MB):".format(name.capitalize(), megabytes))
+        for lexer_name, lexer_class in lexers:
+            seconds = min(timeit.repeat(
+                lambda: tokenize(lexer_class, data), number=1, repeat=3))
+            print("\t{:<24}{:>10.3f} s{:>10.1f} MB/s".format(
+                lexer_name, seconds, megabytes / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+File input benchmark - peak resident memory and time of tokenizing and
+parsing a large file, read into a string vs. memory-mapped. Each case runs
+in a fresh process, as the peak resident set size never decreases.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from pyfranca import Lexer, FastLexer, Parser, NO_COMMENTS
+from pyfranca.franca_lexer import open_input
+from benchmarks import peak_rss
+
+
+def make_fidl(count):
+    """
+    Generate a comment-heavy model with a type collection per unit, in
+    chunks.
+    """
+    license_text = "\n".join(
+        "    * Licensed under the Apache License, Version 2.0 - line {}."
+        .format(i) for i in range(40))
+    yield "package P\n"
+    for i in range(count):
+        yield """
+            /*
+{1}
+             */
+            <** @description: Type collection {0}.
+{1}
+            **>
+            typeCollection TC{0} {{
+                enumeration E{0} {{ A = 0x1 B = 0b10 C = 3 }}
+                struct S{0} {{
+                    Int32 a
+                    String b
+                }}
+                const String N{0} = "name {0}"
+            }}
+""".format(i, license_text)
+
+
+def tokenize(lexer, fspec, use_mmap):
+    """ Tokenize a file without keeping the tokens. """
+    with open_input(fspec, "utf-8", use_mmap) as data:
+        lexer.lexer.encoding = "utf-8"
+        lexer.lexer.input(data)
+        token = lexer.lexer.token
+        while token():
+            pass
+        lexer.lexer.input("")
+
+
+# Benchmark cases - a name and a function of a file specification.
+CASES = [
+    # The interpreter and the imported modules.
+    ("baseline", None),
+    ("tokenize, read, PLY lexer",
+     lambda fspec: tokenize(Lexer(), fspec, False)),
+    ("tokenize, read, FastLexer",
+     lambda fspec: tokenize(FastLexer(), fspec, False)),
+    ("tokenize, mmap, FastLexer",
+     lambda fspec: tokenize(FastLexer(), fspec, True)),
+    ("parse, read, FastLexer",
+     lambda fspec: Parser(the_lexer=FastLexer(), comment_mode=NO_COMMENTS,
+                          encoding="utf-8").parse_file(fspec)),
+    ("parse, mmap, FastLexer",
+     lambda fspec: Parser(comment_mode=NO_COMMENTS, encoding="utf-8",
+                          use_mmap=True).parse_file(fspec)),
+]
+
+
+def measure(index, fspec):
+    """ Run a case and print the peak resident set size and the time. """
+    function = CASES[index][1]
+    if function is not None:
+        start = timeit.default_timer()
+        function(fspec)
+        seconds = timeit.default_timer() - start
+    else:
+        seconds = 0.0
+    print("{} {}".format(peak_rss(), seconds))
+
+
+def run(index, fspec):
+    """ Run a case in a new process. """
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.file_input", "--measure",
+         str(index), fspec])
+    rss, seconds = output.split()
+    return int(rss), float(seconds)
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="File input benchmark.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=5000,
+        help="Number of type collections in the model.")
+    parser.add_argument(
+        "--measure", type=int, nargs=1, metavar="CASE",
+        help=argparse.SUPPRESS)
+    parser.add_argument(
+        "fspec", nargs="?", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+    if args.measure:
+        measure(args.measure[0], args.fspec)
+        return
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        fspec = os.path.join(tmp_dir, "P.fidl")
+        with open(fspec, "w") as f:
+            f.writelines(make_fidl(args.count))
+        megabytes = os.path.getsize(fspec) / 1e6
+        baseline, _ = run(0, fspec)
+        print("Input file {:.1f} MB, peak RSS above a {:.1f} MB "
+              "baseline:".format(megabytes, baseline / 1e6))
+        for index, (name, _) in enumerate(CASES[1:], 1):
+            rss, seconds = run(index, fspec)
+            print("\t{:<30}{:>10.1f} MB{:>10.3f} s".format(
+                name, (rss - baseline) / 1e6, seconds))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
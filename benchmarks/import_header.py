@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Import header benchmark - scanning the package names and imports of files
+vs. parsing them, on the test models and a generated model.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+from pyfranca import FastLexer, Parser, ModelGenerator
+from benchmarks import bench
+
+
+def corpus():
+    """ Get the file specifications of the test models. """
+    base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "..", "pyfranca", "tests", "fidl")
+    fspecs = []
+    for dir_name, _, file_names in os.walk(base_dir):
+        for file_name in sorted(file_names):
+            fspecs.append(os.path.join(dir_name, file_name))
+    return fspecs
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Import header benchmark.")
+    parser.add_argument(
+        "-p", "--packages", type=int, default=20,
+        help="Number of packages (files) in the generated model.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    parser = Parser()
+    fast_parser = Parser(the_lexer=FastLexer())
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        generated = ModelGenerator(packages=args.packages,
+                                   interfaces=5).write(tmp_dir)
+        for title, fspecs in (("Test models", corpus()),
+                              ("Generated model", generated)):
+            names = ["parse_file", "scan_header", "scan_header, FastLexer"]
+            functions = [
+                lambda: [parser.parse_file(f) for f in fspecs],
+                lambda: [parser.scan_header(f) for f in fspecs],
+                lambda: [fast_parser.scan_header(f) for f in fspecs]]
+            results = bench(functions, 5)
+            print("{} ({} files, {:.1f} kB):".format(
+                title, len(fspecs),
+                sum(os.path.getsize(f) for f in fspecs) / 1e3))
+            for name, seconds in zip(names, results):
+                print("\t{:<24}{:>10.3f} ms{:>10.0f}x".format(
+                    name, seconds * 1e3, results[0] / seconds))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Lexer throughput benchmark - the PLY lexer vs. the FastLexer, tokenizing and
+parsing a generated model.
+"""
+
+import argparse
+from pyfranca import Lexer, FastLexer, Parser
+from benchmarks import bench
+
+
+def make_fidl(count):
+    """ Generate a model with a mix of all token kinds. """
+    lines = ["package P"]
+    for i in range(count):
+        lines.append("""
+            // Unit {0}
+            typeCollection TC{0} {{
+                version {{ major 1 minor {0} }}
+                /* Enumeration
+                   of three values */
+                enumeration E{0} {{ A = 0x1 B = 0b10 C = 3 }}
+                struct S{0} {{
+                    Int32 a
+                    String b
+                    E{0} c
+                }}
+                const Int32 C{0} = -{0}
+                const Double D{0} = 1.5e-3d
+                const String N{0} = "name {0}"
+                const Boolean F{0} = true
+            }}
+            <** @description: Interface {0}. **>
+            interface I{0} {{
+                attribute TC{0}.S{0} s readonly
+                method m{0} {{
+                    in {{ UInt8 a Boolean b }}
+                    out {{ String c }}
+                }}
+            }}""".format(i))
+    return "\n".join(lines)
+
+
+def tokenize(lexer, fidl):
+    """ Tokenize an input text. """
+    lexer.lexer.lineno = 1
+    lexer.lexer.input(fidl)
+    token = lexer.lexer.token
+    while token():
+        pass
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Lexer throughput benchmark.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=500,
+        help="Number of type collection and interface pairs in the model.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    fidl = make_fidl(args.count)
+    megabytes = len(fidl) / 1e6
+    names = ["PLY lexer", "FastLexer"]
+    lexers = [Lexer(), FastLexer()]
+    parsers = [Parser(the_lexer=lexer) for lexer in lexers]
+    tokenizing = bench([lambda lexer=lexer: tokenize(lexer, fidl)
+                        for lexer in lexers], 20)
+    parsing = bench([lambda parser=parser: parser.parse(fidl)
+                     for parser in parsers], 5)
+
+    print("Tokenizing {:.2f} MB:".format(megabytes))
+    for name, seconds in zip(names, tokenizing):
+        print("\t{:<24}{:>10.2f} MB/s".format(name, megabytes / seconds))
+    print("\t{:<24}{:>10.1f}x".format("speedup",
+                                      tokenizing[0] / tokenizing[1]))
+    print("Parsing:")
+    for name, seconds in zip(names, parsing):
+        print("\t{:<24}{:>10.3f} ms".format(name, seconds * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Namespace membership benchmark - the unified member index vs. probing
+the per-kind member dictionaries.
+"""
+
+import argparse
+import timeit
+from pyfranca import ast
+
+
+def make_interface(count):
+    """ Build an interface with `count` members of each kind. """
+    members = []
+    for i in range(count):
+        members += [
+            ast.Typedef("T{}".format(i), ast.Int32()),
+            ast.Enumeration("E{}".format(i)),
+            ast.Struct("S{}".format(i)),
+            ast.Array("A{}".format(i), ast.Int32()),
+            ast.Map("M{}".format(i), ast.Int32(), ast.String()),
+            ast.Constant("C{}".format(i), ast.Int32(),
+                         ast.IntegerValue(i)),
+            ast.Attribute("a{}".format(i), ast.Int32()),
+            ast.Method("m{}".format(i)),
+            ast.Broadcast("b{}".format(i))]
+    return ast.Interface("I", members=members)
+
+
+def chained_contains(interface, name):
+    """ Membership test by probing each member kind in turn. """
+    return name in interface.typedefs or \
+        name in interface.enumerations or \
+        name in interface.structs or \
+        name in interface.arrays or \
+        name in interface.maps or \
+        name in interface.constants or \
+        name in interface.attributes or \
+        name in interface.methods or \
+        name in interface.broadcasts
+
+
+def bench(interface, names, count):
+    """ Time membership tests of all names. """
+    def indexed():
+        for name in names:
+            name in interface
+
+    def chained():
+        for name in names:
+            chained_contains(interface, name)
+
+    indexed_time = min(timeit.repeat(indexed, number=count, repeat=3))
+    chained_time = min(timeit.repeat(chained, number=count, repeat=3))
+    lookups = float(len(names) * count)
+    return indexed_time / lookups, chained_time / lookups
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Namespace member lookup benchmark.")
+    parser.add_argument(
+        "-m", "--members", type=int, default=500,
+        help="Number of members of each kind in the namespace.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=20,
+        help="Number of lookups of each name per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    interface = make_interface(args.members)
+    hits = [name for name, _ in interface.members()]
+    misses = ["X{}".format(i) for i in range(len(hits))]
+
+    print("Membership test cost in a namespace with {} members:".format(len(hits)))
+    for label, names in (("hit", hits), ("miss", misses)):
+        indexed, chained = bench(interface, names, args.count)
+        print("\t{:<24}{:>10.1f} ns".format(label + ", member index",
+                                            indexed * 1e9))
+        print("\t{:<24}{:>10.1f} ns".format(label + ", per-kind probes",
+                                            chained * 1e9))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Parser profile - reductions and semantic action times per grammar
+production on a generated model, and the split of the parse time into
+lexing, semantic actions and the LR parser engine.
+"""
+
+import argparse
+from pyfranca import Lexer, FastLexer, Parser, ParserProfile, \
+    ModelGenerator
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Parser profile.")
+    parser.add_argument(
+        "-p", "--packages", type=int, default=20,
+        help="Number of packages in the generated model.")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3,
+        help="Number of times to parse the model.")
+    parser.add_argument(
+        "-n", "--rows", type=int, default=20,
+        help="Number of productions and actions to list.")
+    parser.add_argument(
+        "--fast", action="store_true",
+        help="Use FastLexer.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    texts = list(ModelGenerator(packages=args.packages).generate().values())
+    profile = ParserProfile()
+    parser = Parser(the_lexer=FastLexer() if args.fast else Lexer(),
+                    profile=profile)
+    for _ in range(args.repeat):
+        for text in texts:
+            parser.parse(text)
+    print(profile.report(args.rows))
+
+
+if __name__ == "__main__":
+    main()
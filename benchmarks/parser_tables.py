@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Parser construction benchmark - LALR table generation vs. the table cache.
+"""
+
+import argparse
+import shutil
+import tempfile
+import timeit
+from pyfranca import Parser
+
+
+def bench_uncached(count):
+    """ Build the LALR tables on every construction. """
+    def build():
+        Parser.clear_table_cache()
+        Parser()
+    return min(timeit.repeat(build, number=1, repeat=count))
+
+
+def bench_disk(count):
+    """ Load the LALR tables from a table file on every construction. """
+    table_dir = tempfile.mkdtemp()
+    try:
+        Parser.clear_table_cache()
+        Parser(table_dir=table_dir)
+
+        def build():
+            Parser.clear_table_cache()
+            Parser(table_dir=table_dir)
+        return min(timeit.repeat(build, number=1, repeat=count))
+    finally:
+        Parser.clear_table_cache()
+        shutil.rmtree(table_dir)
+
+
+def bench_memory(count):
+    """ Reuse the in-memory LALR tables. """
+    Parser()
+    return timeit.timeit(Parser, number=count) / count
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Parser construction benchmark.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=20,
+        help="Number of constructions per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    uncached = bench_uncached(args.count)
+    disk = bench_disk(args.count)
+    memory = bench_memory(args.count)
+
+    print("Parser() construction cost per file:")
+    print("\t{:<24}{:>10.3f} ms".format("table generation", uncached * 1e3))
+    print("\t{:<24}{:>10.3f} ms".format("table file", disk * 1e3))
+    print("\t{:<24}{:>10.3f} ms".format("in-memory tables", memory * 1e3))
+    print("\t{:<24}{:>10.1f}x".format("speedup", uncached / memory))
+
+
+if __name__ == "__main__":
+    main()
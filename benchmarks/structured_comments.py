@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Structured comment benchmark - the single-pass tag scanner vs. the former
+split-based implementation, and parsing of a comment-heavy model in the
+eager, lazy and no-comment modes.
+"""
+
+import argparse
+import re
+import timeit
+import tracemalloc
+from collections import OrderedDict
+from pyfranca import Parser, EAGER_COMMENTS, LAZY_COMMENTS, NO_COMMENTS
+from benchmarks import generate_fidl
+
+
+def legacy_parse_structured_comment(comment):
+    """ The former implementation of Parser.parse_structured_comment(). """
+    keys = ['@description', '@author', '@deprecated', '@source_uri',
+            '@source_alias', '@see', '@experimental']
+
+    strings = re.split('(' + '|'.join(keys) + ')', comment)
+
+    strings = [item.strip() for item in strings]
+    strings = [item.lstrip(':') for item in strings]
+    strings = [item.strip() for item in strings]
+    for item in strings:
+        if item == "":
+            strings.remove(item)
+
+    comments = OrderedDict()
+    length = len(strings)
+    i = 0
+    while i < length:
+        key = strings[i]
+        if key in keys:
+            comments[key] = ""
+
+            if i < (length - 1):
+                item = strings[i + 1]
+                if item not in keys:
+                    comments[key] = item
+                    i += 1
+        i += 1
+    return comments
+
+
+COMMENTS = [
+    "@description: Short.",
+    "@description: Multi-line description\n    of an element\n"
+    "    with several lines.\n@author: Somebody\n@see: Other",
+    "@deprecated @experimental",
+    "@description : collection TC @source_uri: http://example.com/tc.fidl "
+    "@source_alias: TC",
+]
+
+
+def bench_comments(count):
+    """ Time parsing the sample comments. """
+    results = []
+    for function in (legacy_parse_structured_comment,
+                     Parser.parse_structured_comment):
+        def run():
+            for comment in COMMENTS:
+                function(comment)
+        results.append(min(timeit.repeat(run, number=count, repeat=5)) /
+                       (count * len(COMMENTS)))
+    return results
+
+
+def bench_parse(fidl, comment_mode, count):
+    """ Time parsing a comment-heavy model and measure the retained memory. """
+    parser = Parser(comment_mode=comment_mode)
+    seconds = min(timeit.repeat(lambda: parser.parse(fidl), number=1,
+                                repeat=count))
+    tracemalloc.start()
+    package = parser.parse(fidl)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del package
+    return seconds, size
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Structured comment benchmark.")
+    parser.add_argument(
+        "-m", "--units", type=int, default=200,
+        help="Number of interfaces in the model.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=2000,
+        help="Number of comment parses per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    for comment in COMMENTS:
+        assert legacy_parse_structured_comment(comment) == \
+            Parser.parse_structured_comment(comment)
+    legacy, scanner = bench_comments(args.count)
+    # A structured comment on every element.
+    fidl = generate_fidl(args.units, comments=1.0)
+    modes = [(comment_mode, bench_parse(fidl, comment_mode, 5))
+             for comment_mode in (EAGER_COMMENTS, LAZY_COMMENTS, NO_COMMENTS)]
+
+    print("Structured comment parsing cost:")
+    print("\t{:<24}{:>10.2f} us".format("split-based", legacy * 1e6))
+    print("\t{:<24}{:>10.2f} us".format("single-pass scanner", scanner * 1e6))
+    print("\t{:<24}{:>10.1f}x".format("speedup", legacy / scanner))
+    print("Parsing a model with {} comments:".format(fidl.count("<**")))
+    for comment_mode, (seconds, size) in modes:
+        print("\t{:<24}{:>10.3f} ms{:>10.1f} KiB".format(
+            comment_mode, seconds * 1e3, size / 1024.0))
+
+
+if __name__ == "__main__":
+    main()
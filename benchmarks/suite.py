@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+"""
+Benchmark suite - throughput and peak memory of the lexers, the parser, the
+processor and fidl_dump.py on generated models of several sizes, with
+stored baselines.
+
+Each case runs in a fresh process, so that the peak resident set size is
+its own. Save a baseline and compare later runs with it, e.g.:
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json
+
+The comparison exits with status 1 if a case got slower or its peak memory
+grew by more than the threshold. Timings are only comparable on the same,
+otherwise idle machine - raise the threshold on shared ones.
+
+benchmarks/baseline.json is a stored baseline, recorded on a development
+machine. Record a baseline on your own machine before comparing timings.
+"""
+
+import argparse
+import json
+import os
+import platform
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from pyfranca import Lexer, FastLexer, Parser, Processor, ModelGenerator, \
+    ast
+from benchmarks import peak_rss
+
+
+# Model sizes - ModelGenerator arguments.
+SIZES = {
+    "small": {"packages": 5},
+    "medium": {"packages": 20, "interfaces": 3},
+    "large": {"packages": 80, "interfaces": 4, "imports": 3, "depth": 4},
+}
+
+# Directory of the tools.
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                         "tools")
+
+
+def read_files(fspecs):
+    """ Read the files into strings. """
+    texts = []
+    for fspec in fspecs:
+        with open(fspec, "r") as f:
+            texts.append(f.read())
+    return texts
+
+
+def tokenize(lexer_class, fspecs):
+    """ Tokenize the files. """
+    texts = read_files(fspecs)
+    lexer = lexer_class()
+
+    def run():
+        count = 0
+        for text in texts:
+            count += len(lexer.tokenize_data(text))
+        return count
+
+    return run, "tokens/s"
+
+
+def parse(fspecs):
+    """ Parse the files. """
+    texts = read_files(fspecs)
+    parser = Parser()
+
+    def run():
+        for text in texts:
+            parser.parse(text)
+        return len(texts)
+
+    return run, "files/s"
+
+
+def import_files(fspecs):
+    """ Import the files into a processor. """
+
+    def run():
+        Processor().import_files(fspecs)
+        return len(fspecs)
+
+    return run, "files/s"
+
+
+def resolve(fspecs):
+    """ Resolve the type references with the public Processor.resolve(). """
+    processor = Processor()
+    processor.import_files(fspecs)
+    references = []
+    for package in processor.packages.values():
+        for namespace in list(package.typecollections.values()) + \
+                list(package.interfaces.values()):
+            for reference in ast.walk(namespace, kinds=ast.Reference):
+                references.append((namespace, reference.name))
+
+    def run():
+        for namespace, name in references:
+            Processor.resolve(namespace, name)
+        return len(references)
+
+    return run, "references/s"
+
+
+def dump(fspecs):
+    """ Dump the files with fidl_dump.py . """
+    tool = os.path.join(TOOLS_DIR, "fidl_dump.py")
+
+    def run():
+        argv = sys.argv
+        sys.argv = [tool] + fspecs
+        try:
+            with open(os.devnull, "w") as f:
+                stdout = sys.stdout
+                sys.stdout = f
+                try:
+                    runpy.run_path(tool, run_name="__main__")
+                finally:
+                    sys.stdout = stdout
+        finally:
+            sys.argv = argv
+        return len(fspecs)
+
+    return run, "files/s"
+
+
+# Benchmark cases - functions of the file specifications of a model,
+#   returning a function to time, which returns the number of processed
+#   items, and the unit of the rate.
+CASES = {
+    "tokenize": lambda fspecs: tokenize(Lexer, fspecs),
+    "tokenize_fast": lambda fspecs: tokenize(FastLexer, fspecs),
+    "parse": parse,
+    "import": import_files,
+    "resolve": resolve,
+    "dump": dump,
+}
+CASE_ORDER = ["tokenize", "tokenize_fast", "parse", "import", "resolve",
+              "dump"]
+
+# Minimum duration of a timed run in seconds.
+MIN_TIME = 0.2
+
+
+def measure(case, model_dir, repeat):
+    """ Run a case in this process and print its results as JSON. """
+    fspecs = sorted(os.path.join(model_dir, file_name)
+                    for file_name in os.listdir(model_dir))
+    function, unit = CASES[case](fspecs)
+    rate = 0.0
+    items = 0
+    for _ in range(repeat):
+        # Short cases are run repeatedly to even out the timer noise.
+        count = 0
+        start = timeit.default_timer()
+        while True:
+            items = function()
+            count += 1
+            seconds = timeit.default_timer() - start
+            if seconds >= MIN_TIME:
+                break
+        rate = max(rate, items * count / seconds)
+    print(json.dumps({"items": items, "rate": rate, "unit": unit,
+                      "peak_rss": peak_rss()}))
+
+
+def run_case(case, model_dir, repeat):
+    """ Run a case in a new process. """
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.suite", "--measure", case,
+         model_dir, "--repeat", str(repeat)])
+    return json.loads(output.decode("utf-8"))
+
+
+def run_suite(cases, sizes, repeat):
+    """
+    Run the benchmark cases on the models of the given sizes.
+
+    :return: A dictionary of "case/size" keys and result dictionaries.
+    """
+    results = {}
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            model_dir = os.path.join(tmp_dir, size)
+            ModelGenerator(**SIZES[size]).write(model_dir)
+            for case in cases:
+                result = run_case(case, model_dir, repeat)
+                results["{}/{}".format(case, size)] = result
+                print("\t{:<24}{:>14.1f} {:<14}{:>10.1f} MB".format(
+                    "{}/{}".format(case, size), result["rate"],
+                    result["unit"], result["peak_rss"] / 1e6))
+    finally:
+        shutil.rmtree(tmp_dir)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print a comparison of results with a baseline.
+
+    :param threshold: Relative change, reported as a regression.
+    :return: A list of the keys of the regressed cases.
+    """
+    regressions = []
+    print("Comparison with the baseline:")
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        old, new = baseline[key], results[key]
+        speed = new["rate"] / old["rate"]
+        memory = float(new["peak_rss"]) / old["peak_rss"]
+        regressed = speed < 1.0 - threshold or memory > 1.0 + threshold
+        if regressed:
+            regressions.append(key)
+        print("\t{:<24}{:>10.2f}x speed{:>10.2f}x memory{}".format(
+            key, speed, memory, "  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Benchmark suite.")
+    parser.add_argument(
+        "-c", "--case", dest="cases", action="append", choices=CASE_ORDER,
+        help="Case to run. All cases by default.")
+    parser.add_argument(
+        "-s", "--size", dest="sizes", action="append",
+        choices=sorted(SIZES),
+        help="Model size to run the cases on. All sizes by default.")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3,
+        help="Number of timed runs per case - the best one counts.")
+    parser.add_argument(
+        "--save", metavar="baseline.json",
+        help="Save the results as a baseline.")
+    parser.add_argument(
+        "--compare", metavar="baseline.json",
+        help="Compare the results with a baseline.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="Relative slowdown or memory growth, reported as a "
+             "regression.")
+    parser.add_argument(
+        "--measure", metavar="CASE", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "model_dir", nargs="?", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+    if args.measure:
+        measure(args.measure, args.model_dir, args.repeat)
+        return
+
+    cases = args.cases or CASE_ORDER
+    sizes = args.sizes or ["small", "medium", "large"]
+    print("Python {} on {}:".format(platform.python_version(),
+                                    platform.platform()))
+    results = run_suite(cases, sizes, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "results": results}, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
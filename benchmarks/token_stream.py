@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Token stream benchmark - retained bytes per token and tokenizing time of
+a list of LexToken objects vs. the compact TokenStream.
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from pyfranca import Lexer, FastLexer
+from benchmarks import generate_fidl
+
+
+def measure(function):
+    """ Measure the memory retained by the result of a function. """
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, len(result)
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Token stream benchmark.")
+    parser.add_argument(
+        "-n", "--count", type=int, default=500,
+        help="Number of interfaces in the model.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    fidl = generate_fidl(args.count)
+    cases = []
+    for lexer_name, lexer in (("PLY lexer", Lexer()),
+                              ("FastLexer", FastLexer())):
+        cases.append(("LexToken list, " + lexer_name,
+                      lambda lexer=lexer: lexer.tokenize_data(fidl)))
+        cases.append(("TokenStream, " + lexer_name,
+                      lambda lexer=lexer: lexer.tokenize_stream(fidl)))
+
+    print("Tokenizing {} characters:".format(len(fidl)))
+    for name, function in cases:
+        size, tokens = measure(function)
+        seconds = min(timeit.repeat(function, number=1, repeat=5))
+        print("\t{:<30}{:>8.1f} B/token{:>10.3f} ms".format(
+            name, float(size) / tokens, seconds * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,16 @@
 Pyfranca package.
 """
 
-from pyfranca.franca_lexer import LexerException, Lexer
-from pyfranca.franca_parser import ParserException, Parser
-from pyfranca.franca_processor import ProcessorException, Processor
+from pyfranca.franca_lexer import LexerException, Lexer, FastLexer, \
+    TokenStream
+from pyfranca.franca_parser import ParserException, Parser, ParserPool, \
+    EAGER_COMMENTS, LAZY_COMMENTS, NO_COMMENTS
+from pyfranca.franca_processor import ProcessorException, Processor, \
+    ProcessorHooks
+from pyfranca.franca_cache import ASTCache
+from pyfranca.franca_stats import ProcessorStats, ParserProfile
+from pyfranca.franca_graph import GraphException, DependencyGraph
+from pyfranca.franca_generator import ModelGenerator
 
 
 __version__ = "0.4.1"
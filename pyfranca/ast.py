@@ -4,23 +4,163 @@ Franca abstract syntax tree representation.
 
 from abc import ABCMeta
 from collections import OrderedDict
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 
 class ASTException(Exception):
 
     def __init__(self, message):
-        super(ASTException, self).__init__()
+        super(ASTException, self).__init__(message)
         self.message = message
 
     def __str__(self):
         return self.message
 
 
-class Package(object):
+class _FrozenOrderedDict(OrderedDict):
+    """
+    Immutable empty OrderedDict, shared by the nodes without comments,
+    arguments, etc.
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Shared empty mapping is immutable.")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = move_to_end = _immutable
+
+    def __reduce__(self):
+        # Unpickle as the shared instance.
+        return "EMPTY_MAPPING"
+
+
+class _FrozenList(list):
+    """
+    Immutable empty list, shared by the nodes without flags.
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Shared empty list is immutable.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = remove = pop = clear = sort = reverse = \
+        _immutable
+
+    def __reduce__(self):
+        # Unpickle as the shared instance.
+        return "EMPTY_LIST"
+
+
+# Shared values of absent comments, arguments and flags.
+EMPTY_MAPPING = _FrozenOrderedDict()
+EMPTY_LIST = _FrozenList()
+
+
+class LazyComments(Mapping):
+    """
+    Read-only mapping of structured comments, which keeps the raw comment
+    text and parses it on first access.
+    """
+
+    __slots__ = ("raw", "_scanner", "_comments")
+
+    def __init__(self, raw, scanner):
+        """
+        Constructor.
+
+        :param raw: Structured comment text, e.g. "<** @description: x **>".
+        :param scanner: An object with a parse_structured_comment() method,
+            e.g. the parser class.
+        """
+        self.raw = raw
+        self._scanner = scanner
+        self._comments = None
+
+    @property
+    def parsed(self):
+        """
+        Whether the comment text has been parsed.
+        """
+        return self._comments is not None
+
+    def _get_comments(self):
+        comments = self._comments
+        if comments is None:
+            comments = self._scanner.parse_structured_comment(self.raw)
+            self._comments = comments
+        return comments
+
+    def __getitem__(self, key):
+        return self._get_comments()[key]
+
+    def __iter__(self):
+        return iter(self._get_comments())
+
+    def __len__(self):
+        return len(self._get_comments())
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__,
+                                 list(self._get_comments().items()))
+
+    def __reduce__(self):
+        # Pickle the raw text only.
+        return self.__class__, (self.raw, self._scanner)
+
+
+def _comments(comments):
+    """
+    Get the comments value of a node. Lazy comments are kept unparsed.
+    """
+    if comments is None:
+        return EMPTY_MAPPING
+    if isinstance(comments, LazyComments) or comments:
+        return comments
+    return EMPTY_MAPPING
+
+
+class _Slotted(object):
+    """
+    Base of the AST classes. The attributes are stored in __slots__ instead
+    of a per-instance __dict__.
+    """
+
+    __slots__ = ()
+
+    # Names of the attributes holding child nodes - a node, a mapping of
+    # nodes or a list of nodes. See iter_child_nodes().
+    _child_fields = ()
+
+    def __getstate__(self):
+        # Required for pickle protocols before 2.
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class Package(_Slotted):
     """
     AST representation of a Franca package.
     """
 
+    __slots__ = ("name", "files", "imports", "interfaces", "typecollections",
+                 "comments")
+    _child_fields = ("imports", "typecollections", "interfaces")
+
     def __init__(self, name, file_name=None, imports=None,
                  interfaces=None, typecollections=None, comments=None):
         """
@@ -32,7 +172,7 @@ class Package(object):
         self.interfaces = interfaces if interfaces else OrderedDict()
         self.typecollections = typecollections if typecollections else \
             OrderedDict()
-        self.comments = comments if comments else OrderedDict()
+        self.comments = _comments(comments)
 
         for item in self.interfaces.values():
             item.package = self
@@ -77,7 +217,10 @@ class Package(object):
         return self
 
 
-class Import(object):
+class Import(_Slotted):
+
+    __slots__ = ("file", "namespace", "package_reference",
+                 "namespace_reference")
 
     def __init__(self, file_name, namespace=None):
         self.file = file_name
@@ -86,14 +229,82 @@ class Import(object):
         self.namespace_reference = None
 
 
-class Namespace(object):
+class _MemberDict(OrderedDict):
+    """
+    Per-kind member dictionary of a namespace, which keeps the member index
+    of the namespace up to date.
+    """
+
+    __slots__ = ("_namespace",)
+
+    def __init__(self, namespace, members=None):
+        self._namespace = namespace
+        super(_MemberDict, self).__init__()
+        if members:
+            for name, member in members.items():
+                OrderedDict.__setitem__(self, name, member)
+
+    def __setitem__(self, name, member):
+        OrderedDict.__setitem__(self, name, member)
+        self._namespace._members[name] = member
+
+    def __delitem__(self, name):
+        OrderedDict.__delitem__(self, name)
+        self._namespace._remove_from_index(name)
+
+    def pop(self, name, *default):
+        if name in self:
+            member = self[name]
+            del self[name]
+            return member
+        if default:
+            return default[0]
+        raise KeyError(name)
+
+    def popitem(self, last=True):
+        if not self:
+            raise KeyError("dictionary is empty")
+        name = next(reversed(self) if last else iter(self))
+        return name, self.pop(name)
+
+    def setdefault(self, name, default=None):
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, member in OrderedDict(*args, **kwargs).items():
+            self[name] = member
+
+    def clear(self):
+        for name in list(self):
+            del self[name]
+
+    def copy(self):
+        return OrderedDict(self)
+
+    def __reduce__(self):
+        # Restored as a plain OrderedDict and wrapped by the namespace.
+        return OrderedDict, (list(self.items()),)
+
+
+class Namespace(_Slotted):
+
+    __slots__ = ("package", "name", "flags", "version", "typedefs",
+                 "enumerations", "structs", "arrays", "maps", "constants",
+                 "comments", "_members")
+
+    # Per-kind member dictionaries.
+    _member_fields = ("typedefs", "enumerations", "structs", "arrays", "maps",
+                      "constants")
+    _child_fields = ("version",) + _member_fields
 
     __metaclass__ = ABCMeta
 
     def __init__(self, name, flags=None, members=None, comments=None):
         self.package = None
         self.name = name
-        self.flags = flags if flags else []         # Unused
+        self.flags = flags if flags else EMPTY_LIST    # Unused
         self.version = None
         self.typedefs = OrderedDict()
         self.enumerations = OrderedDict()
@@ -101,7 +312,10 @@ class Namespace(object):
         self.arrays = OrderedDict()
         self.maps = OrderedDict()
         self.constants = OrderedDict()
-        self.comments = comments if comments else OrderedDict()
+        self.comments = _comments(comments)
+        # Name -> member index of all the per-kind members above, updated
+        #   through the per-kind dictionaries.
+        self._members = OrderedDict()
         if members:
             for member in members:
                 self._add_member(member)
@@ -109,31 +323,64 @@ class Namespace(object):
     def __contains__(self, name):
         if not isinstance(name, str):
             raise TypeError
-        res = name in self.typedefs or \
-            name in self.enumerations or \
-            name in self.structs or \
-            name in self.arrays or \
-            name in self.maps or \
-            name in self.constants
-        return res
+        return name in self._members
 
     def __getitem__(self, name):
         if not isinstance(name, str):
             raise TypeError
-        elif name in self.typedefs:
-            return self.typedefs[name]
-        elif name in self.enumerations:
-            return self.enumerations[name]
-        elif name in self.structs:
-            return self.structs[name]
-        elif name in self.arrays:
-            return self.arrays[name]
-        elif name in self.maps:
-            return self.maps[name]
-        elif name in self.constants[name]:
-            return self.constants[name]
+        return self._members[name]
+
+    def members(self):
+        """
+        Iterate over the named members in definition order.
+
+        :return: Iterator of (name, ast.Type) tuples.
+        """
+        return iter(self._members.items())
+
+    def __setattr__(self, name, value):
+        if name in self._member_fields:
+            # Per-kind dictionaries are wrapped, so that they keep the
+            #   member index up to date.
+            if not isinstance(value, _MemberDict) or \
+                    value._namespace is not self:
+                value = _MemberDict(self, value)
+            _Slotted.__setattr__(self, name, value)
+            if hasattr(self, "_members"):
+                self._update_index()
         else:
-            raise KeyError
+            _Slotted.__setattr__(self, name, value)
+
+    def __setstate__(self, state):
+        # Restore the member index as pickled, after the per-kind
+        #   dictionaries.
+        for name, value in state.items():
+            if name != "_members":
+                setattr(self, name, value)
+        if "_members" in state:
+            _Slotted.__setattr__(self, "_members", state["_members"])
+
+    def _remove_from_index(self, name):
+        # A member of another kind can have the same name.
+        for field in self._member_fields:
+            members = getattr(self, field, None)
+            if members and name in members:
+                self._members[name] = members[name]
+                return
+        self._members.pop(name, None)
+
+    def _update_index(self):
+        # Rebuild the member index after the per-kind dictionaries were
+        # replaced, keeping the definition order of the remaining members.
+        members = OrderedDict()
+        for field in self._member_fields:
+            members.update(getattr(self, field, None) or ())
+        index = OrderedDict()
+        for name in self._members:
+            if name in members:
+                index[name] = members.pop(name)
+        index.update(members)
+        self._members = index
 
     def _add_member(self, member):
         if isinstance(member, Version):
@@ -181,116 +428,193 @@ class Namespace(object):
 
 class TypeCollection(Namespace):
 
+    __slots__ = ()
+
     def __init__(self, name, flags=None, members=None, comments=None):
         super(TypeCollection, self).__init__(name, flags=flags,
                                              members=members, comments=comments)
 
 
-class Type(object):
+class Type(_Slotted):
+
+    __slots__ = ("namespace", "name", "comments")
 
     __metaclass__ = ABCMeta
 
     def __init__(self, name=None, comments=None):
         self.namespace = None
         self.name = name if name else self.__class__.__name__
-        self.comments = comments if comments else OrderedDict()
+        self.comments = _comments(comments)
 
 
 class Typedef(Type):
 
+    __slots__ = ("type",)
+    _child_fields = ("type",)
+
     def __init__(self, name, base_type, comments=None):
         super(Typedef, self).__init__(name, comments)
         self.type = base_type
 
 
 class PrimitiveType(Type):
+    """
+    Primitive types are flyweights - each primitive type class has a single
+    immutable instance, shared by all models. Primitive types can be
+    compared by identity.
+    """
+
+    __slots__ = ()
 
     __metaclass__ = ABCMeta
 
+    # Primitive type class -> the shared instance.
+    _instances = {}
+
+    def __new__(cls):
+        instance = PrimitiveType._instances.get(cls)
+        if instance is None:
+            instance = super(PrimitiveType, cls).__new__(cls)
+            super(PrimitiveType, instance).__setattr__("namespace", None)
+            super(PrimitiveType, instance).__setattr__("name", cls.__name__)
+            super(PrimitiveType, instance).__setattr__("comments",
+                                                       EMPTY_MAPPING)
+            PrimitiveType._instances[cls] = instance
+        return instance
+
     def __init__(self):
-        super(PrimitiveType, self).__init__()
+        # The shared instance is initialized once in __new__().
+        pass
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Primitive types are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Primitive types are immutable.")
+
+    def __reduce__(self):
+        # Unpickle as the shared instance.
+        return self.__class__, ()
+
+    def __setstate__(self, state):
+        pass
 
 
 class Int8(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Int8, self).__init__()
 
 
 class Int16(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Int16, self).__init__()
 
 
 class Int32(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Int32, self).__init__()
 
 
 class Int64(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Int64, self).__init__()
 
 
 class UInt8(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(UInt8, self).__init__()
 
 
 class UInt16(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(UInt16, self).__init__()
 
 
 class UInt32(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(UInt32, self).__init__()
 
 
 class UInt64(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(UInt64, self).__init__()
 
 
 class Boolean(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Boolean, self).__init__()
 
 
 class Float(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Float, self).__init__()
 
 
 class Double(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(Double, self).__init__()
 
 
 class String(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(String, self).__init__()
 
 
 class ByteBuffer(PrimitiveType):
 
+    __slots__ = ()
+
     def __init__(self):
         super(ByteBuffer, self).__init__()
 
 
+# Primitive type name -> the shared primitive type instance.
+PRIMITIVE_TYPES = dict(
+    (cls.__name__, cls()) for cls in (
+        Int8, Int16, Int32, Int64, UInt8, UInt16, UInt32, UInt64, Boolean,
+        Float, Double, String, ByteBuffer))
+
+
 class ComplexType(Type):
 
+    __slots__ = ()
+
     __metaclass__ = ABCMeta
 
     def __init__(self, comments=None):
@@ -299,6 +623,8 @@ class ComplexType(Type):
 
 class Value(Type):
 
+    __slots__ = ("value",)
+
     _metaclass__ = ABCMeta
 
     def __init__(self, value, value_type=None):
@@ -308,6 +634,8 @@ class Value(Type):
 
 class IntegerValue(Value):
 
+    __slots__ = ("base",)
+
     BINARY = 2
     DECIMAL = 10
     HEXADECIMAL = 16
@@ -319,68 +647,91 @@ class IntegerValue(Value):
 
 class BooleanValue(Value):
 
+    __slots__ = ()
+
     def __init__(self, value):
         super(BooleanValue, self).__init__(value)
 
 
 class FloatValue(Value):
 
+    __slots__ = ()
+
     def __init__(self, value):
         super(FloatValue, self).__init__(value)
 
 
 class DoubleValue(Value):
 
+    __slots__ = ()
+
     def __init__(self, value):
         super(DoubleValue, self).__init__(value)
 
 
 class StringValue(Value):
 
+    __slots__ = ()
+
     def __init__(self, value):
         super(StringValue, self).__init__(value)
 
 
 class Enumeration(ComplexType):
 
+    __slots__ = ("enumerators", "extends", "reference", "flags")
+    _child_fields = ("enumerators",)
+
     def __init__(self, name, enumerators=None, extends=None, flags=None, comments=None):
         super(Enumeration, self).__init__(comments=comments)
         self.name = name
         self.enumerators = enumerators if enumerators else OrderedDict()
         self.extends = extends
         self.reference = None
-        self.flags = flags if flags else []         # Unused
+        self.flags = flags if flags else EMPTY_LIST    # Unused
+
 
+class Enumerator(_Slotted):
 
-class Enumerator(object):
+    __slots__ = ("name", "value", "comments")
+    _child_fields = ("value",)
 
     def __init__(self, name, value=None, comments=None):
         self.name = name
         self.value = value
-        self.comments = comments if comments else OrderedDict()
+        self.comments = _comments(comments)
 
 
 class Struct(ComplexType):
 
+    __slots__ = ("fields", "extends", "reference", "flags")
+    _child_fields = ("fields",)
+
     def __init__(self, name, fields=None, extends=None, flags=None, comments=None):
         super(Struct, self).__init__(comments=comments)
         self.name = name
         self.fields = fields if fields else OrderedDict()
         self.extends = extends
         self.reference = None
-        self.flags = flags if flags else []
+        self.flags = flags if flags else EMPTY_LIST
+
 
+class StructField(_Slotted):
 
-class StructField(object):
+    __slots__ = ("name", "type", "comments")
+    _child_fields = ("type",)
 
     def __init__(self, name, field_type, comments=None):
         self.name = name
         self.type = field_type
-        self.comments = comments if comments else OrderedDict()
+        self.comments = _comments(comments)
 
 
 class Array(ComplexType):
 
+    __slots__ = ("type",)
+    _child_fields = ("type",)
+
     def __init__(self, name, element_type, comments=None):
         super(Array, self).__init__(comments=comments)
         self.name = name            # None for implicit arrays.
@@ -389,6 +740,9 @@ class Array(ComplexType):
 
 class Map(ComplexType):
 
+    __slots__ = ("key_type", "value_type")
+    _child_fields = ("key_type", "value_type")
+
     def __init__(self, name, key_type, value_type, comments=None):
         super(Map, self).__init__(comments=comments)
         self.name = name
@@ -398,6 +752,9 @@ class Map(ComplexType):
 
 class Constant(ComplexType):
 
+    __slots__ = ("type", "value")
+    _child_fields = ("type", "value")
+
     def __init__(self, name, element_type, element_value, comments=None):
         super(Constant, self).__init__(comments=comments)
         self.name = name
@@ -407,6 +764,8 @@ class Constant(ComplexType):
 
 class Reference(Type):
 
+    __slots__ = ("reference",)
+
     def __init__(self, name):
         super(Reference, self).__init__()
         self.name = name
@@ -415,6 +774,12 @@ class Reference(Type):
 
 class Interface(Namespace):
 
+    __slots__ = ("attributes", "methods", "broadcasts", "extends", "reference")
+
+    _member_fields = Namespace._member_fields + ("attributes", "methods",
+                                                 "broadcasts")
+    _child_fields = ("version",) + _member_fields
+
     def __init__(self, name, flags=None, members=None, extends=None, comments=None):
         super(Interface, self).__init__(name=name, flags=flags, members=None, comments=comments)
         self.attributes = OrderedDict()
@@ -426,27 +791,6 @@ class Interface(Namespace):
             for member in members:
                 self._add_member(member)
 
-    def __contains__(self, name):
-        if not isinstance(name, str):
-            raise TypeError
-        res = super(Interface, self).__contains__(name) or \
-            name in self.attributes or \
-            name in self.methods or \
-            name in self.broadcasts
-        return res
-
-    def __getitem__(self, name):
-        if not isinstance(name, str):
-            raise TypeError
-        elif name in self.attributes:
-            return self.attributes[name]
-        elif name in self.methods:
-            return self.methods[name]
-        elif name in self.broadcasts:
-            return self.broadcasts[name]
-        else:
-            return super(Interface, self).__getitem__(name)
-
     def _add_member(self, member):
         if isinstance(member, Type):
             if member.name in self:
@@ -479,7 +823,9 @@ class Interface(Namespace):
             super(Interface, self)._add_member(member)
 
 
-class Version(object):
+class Version(_Slotted):
+
+    __slots__ = ("major", "minor")
 
     def __init__(self, major, minor):
         self.major = major
@@ -491,35 +837,266 @@ class Version(object):
 
 class Attribute(Type):
 
+    __slots__ = ("type", "flags")
+    _child_fields = ("type",)
+
     def __init__(self, name, attr_type, flags=None, comments=None):
         super(Attribute, self).__init__(name, comments)
         self.type = attr_type
-        self.flags = flags if flags else []
+        self.flags = flags if flags else EMPTY_LIST
 
 
 class Method(Type):
 
+    __slots__ = ("flags", "in_args", "out_args", "errors")
+    _child_fields = ("in_args", "out_args", "errors")
+
     def __init__(self, name, flags=None,
                  in_args=None, out_args=None, errors=None, comments=None):
         super(Method, self).__init__(name, comments)
-        self.flags = flags if flags else []
-        self.in_args = in_args if in_args else OrderedDict()
-        self.out_args = out_args if out_args else OrderedDict()
+        self.flags = flags if flags else EMPTY_LIST
+        self.in_args = in_args if in_args else EMPTY_MAPPING
+        self.out_args = out_args if out_args else EMPTY_MAPPING
         # Errors can be an OrderedDict() or a Reference to an enumeration.
-        self.errors = errors if errors else OrderedDict()
+        self.errors = errors if errors else EMPTY_MAPPING
 
 
 class Broadcast(Type):
 
+    __slots__ = ("flags", "out_args")
+    _child_fields = ("out_args",)
+
     def __init__(self, name, flags=None, out_args=None, comments=None):
         super(Broadcast, self).__init__(name, comments)
-        self.flags = flags if flags else []
-        self.out_args = out_args if out_args else OrderedDict()
+        self.flags = flags if flags else EMPTY_LIST
+        self.out_args = out_args if out_args else EMPTY_MAPPING
 
 
-class Argument(object):
+class Argument(_Slotted):
+
+    __slots__ = ("name", "type", "comments")
+    _child_fields = ("type",)
 
     def __init__(self, name, arg_type, comments=None):
         self.name = name
         self.type = arg_type
-        self.comments = comments if comments else OrderedDict()
+        self.comments = _comments(comments)
+
+
+def iter_child_nodes(node):
+    """
+    Iterate over the direct child nodes of an AST node. Resolved references
+    are not followed.
+
+    :param node: AST node.
+    :return: Generator of AST nodes.
+    """
+    for field in node._child_fields:
+        value = getattr(node, field)
+        if isinstance(value, _Slotted):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield item
+        elif isinstance(value, list):
+            for item in value:
+                yield item
+
+
+# Traversal orders of walk() and iter_nodes().
+PRE_ORDER = "pre"
+POST_ORDER = "post"
+
+
+def iter_nodes(node, order=PRE_ORDER, kinds=None, prune=None):
+    """
+    Iterate over an AST node and its descendants with their parents.
+
+    The traversal uses an explicit stack, so it is not limited by the
+    recursion limit, and it is lazy - the children of a node are fetched
+    when the traversal reaches it. Resolved references are not followed.
+
+    :param node: AST node, e.g. ast.Package.
+    :param order: PRE_ORDER to yield a node before its children or
+        POST_ORDER to yield it after them.
+    :param kinds: An AST class or a tuple of AST classes to yield or None
+        to yield all nodes. Other nodes are traversed, but not yielded.
+    :param prune: A callable, which gets a node and returns True to skip
+        its descendants, or None.
+    :return: Generator of (parent node, node) tuples. The parent of the
+        given node is None.
+    """
+    if order == PRE_ORDER:
+        stack = [(None, node)]
+        while stack:
+            parent, item = stack.pop()
+            if kinds is None or isinstance(item, kinds):
+                yield parent, item
+            if prune is None or not prune(item):
+                children = list(iter_child_nodes(item))
+                children.reverse()
+                stack.extend((item, child) for child in children)
+    elif order == POST_ORDER:
+        # (parent, node, iterator of the children or None if not expanded)
+        stack = [(None, node, None)]
+        while stack:
+            parent, item, children = stack[-1]
+            if children is None:
+                if prune is None or not prune(item):
+                    children = iter_child_nodes(item)
+                else:
+                    children = iter(())
+                stack[-1] = (parent, item, children)
+            for child in children:
+                stack.append((item, child, None))
+                break
+            else:
+                stack.pop()
+                if kinds is None or isinstance(item, kinds):
+                    yield parent, item
+    else:
+        raise ValueError("Unknown traversal order '{}'.".format(order))
+
+
+def walk(node, order=PRE_ORDER, kinds=None, prune=None):
+    """
+    Iterate over an AST node and its descendants without recursion.
+    See iter_nodes() for the parameters.
+
+    :return: Generator of AST nodes.
+    """
+    for _, item in iter_nodes(node, order, kinds, prune):
+        yield item
+
+
+# Visitor class -> {node class -> visit method name}.
+_dispatch_tables = {}
+
+
+class NodeVisitor(object):
+    """
+    Base class of AST visitors.
+
+    visit() calls the visit_<class name>() method of the visitor for the
+    node class or, if not defined, for the nearest base class of the node,
+    e.g. visit_Interface(), visit_Namespace() or visit_ComplexType(). The
+    generic_visit() method is called if no such method exists. The methods
+    are looked up once per visitor class and bound once per visitor object.
+    Visitors keep their traversal state, e.g. the current namespace, in
+    attributes.
+    """
+
+    def visit(self, node):
+        """
+        Visit a node.
+
+        :param node: AST node.
+        :return: The result of the visit method.
+        """
+        try:
+            method = self._dispatch_table[node.__class__]
+        except (AttributeError, KeyError):
+            method = self._dispatch(node.__class__)
+        return method(node)
+
+    def get_dispatch_table(self):
+        """
+        Get the bound visit methods for the AST node classes.
+
+        table[node.__class__](node) is equivalent to visit(node), but saves
+        a call in loops over many nodes. The table covers the AST node
+        classes, defined before the first visit.
+
+        :return: A dictionary of node class -> bound visit method.
+        """
+        try:
+            return self._dispatch_table
+        except AttributeError:
+            self._dispatch(_Slotted)
+            return self._dispatch_table
+
+    def _dispatch(self, node_class):
+        # Resolve the visit method names once per visitor class and bind the
+        # methods once per visitor object, for all the AST node classes.
+        cls = self.__class__
+        names = _dispatch_tables.get(cls)
+        if names is None:
+            names = _dispatch_tables[cls] = {}
+        if node_class not in names:
+            node_classes = [node_class]
+            stack = [_Slotted]
+            while stack:
+                base = stack.pop()
+                node_classes.append(base)
+                stack.extend(base.__subclasses__())
+            for item in node_classes:
+                name = "generic_visit"
+                for base in item.__mro__:
+                    if hasattr(cls, "visit_" + base.__name__):
+                        name = "visit_" + base.__name__
+                        break
+                names[item] = name
+        table = self.__dict__.get("_dispatch_table")
+        if table is None or node_class not in table:
+            table = self._dispatch_table = dict(
+                (item, getattr(self, name)) for item, name in names.items())
+        return table[node_class]
+
+    def generic_visit(self, node):
+        """
+        Visit the child nodes of a node.
+
+        :param node: AST node.
+        """
+        table = self.get_dispatch_table()
+        for child in iter_child_nodes(node):
+            try:
+                method = table[child.__class__]
+            except KeyError:
+                method = self._dispatch(child.__class__)
+            method(child)
+
+
+class NodeTransformer(NodeVisitor):
+    """
+    Base class of AST transformers.
+
+    The visit methods return a node replacing the visited one or None to
+    remove it from its parent mapping or list. generic_visit() transforms
+    the child nodes and returns the node. Mapping keys are preserved.
+    """
+
+    def generic_visit(self, node):
+        """
+        Transform the child nodes of a node.
+
+        :param node: AST node.
+        :return: The node.
+        """
+        for field in node._child_fields:
+            value = getattr(node, field)
+            if isinstance(value, _Slotted):
+                new_value = self.visit(value)
+            elif isinstance(value, dict):
+                new_value = OrderedDict()
+                for key, item in value.items():
+                    new_item = self.visit(item)
+                    if new_item is not None:
+                        new_value[key] = new_item
+                if len(new_value) == len(value) and all(
+                        new_value[key] is item for key, item in value.items()):
+                    new_value = value
+            elif isinstance(value, list):
+                new_value = [new_item for new_item in
+                             (self.visit(item) for item in value)
+                             if new_item is not None]
+                if len(new_value) == len(value) and all(
+                        new_item is item
+                        for new_item, item in zip(new_value, value)):
+                    new_value = value
+            else:
+                continue
+            if new_value is not value:
+                # Namespaces update their member index.
+                setattr(node, field, new_value)
+        return node
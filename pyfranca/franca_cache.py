@@ -0,0 +1,176 @@
+"""
+Franca AST cache.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+
+
+class ASTCache(object):
+    """
+    On-disk cache of parsed, unlinked ast.Package objects, keyed by the
+    content of the parsed FIDL.
+    """
+
+    suffix = ".pickle"
+
+    def __init__(self, directory, max_size=None):
+        """
+        Constructor.
+
+        :param directory: Cache directory. Created if it does not exist.
+        :param max_size: Maximum total size of the cache entries in bytes or
+            None for no limit. Least recently used entries are evicted first.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Created concurrently.
+                if not os.path.isdir(directory):
+                    raise
+
+    @staticmethod
+    def key(fidl, salt=""):
+        """
+        Calculate the cache key of an FIDL text.
+
+        :param fidl: FIDL string or binary input, e.g. a memory-mapped file.
+        :param salt: String identifying the parser configuration.
+        :return: Hexadecimal digest string.
+        """
+        from pyfranca import __version__
+        digest = hashlib.sha1()
+        digest.update("{}\n{}\n".format(__version__, salt).encode("utf-8"))
+        if isinstance(fidl, type(u"")):
+            fidl = fidl.encode("utf-8")
+        digest.update(fidl)
+        return digest.hexdigest()
+
+    def _fspec(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        """
+        Load a package from the cache.
+
+        :param key: Cache key.
+        :return: ast.Package object or None if not cached.
+        """
+        fspec = self._fspec(key)
+        try:
+            with open(fspec, "rb") as f:
+                package = pickle.load(f)
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+        except Exception:
+            # Damaged entry.
+            self.misses += 1
+            self._remove(fspec)
+            return None
+        # Mark the entry as recently used.
+        try:
+            os.utime(fspec, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return package
+
+    def put(self, key, package):
+        """
+        Store a package in the cache.
+
+        :param key: Cache key.
+        :param package: ast.Package object.
+        """
+        fspec = self._fspec(key)
+        # Write to a private file and rename it in place, so that
+        #   concurrent readers never see partial entries.
+        tmp_fspec = "{}.{}.{}.tmp".format(
+            fspec, os.getpid(), threading.current_thread().ident)
+        try:
+            with open(tmp_fspec, "wb") as f:
+                pickle.dump(package, f, pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+        except (IOError, OSError, pickle.PicklingError):
+            # Caching is best-effort, e.g. on a full disk.
+            self._remove(tmp_fspec)
+            return
+        # Size of the entry being replaced.
+        old_size = 0
+        if self.max_size is not None and self._size is not None:
+            try:
+                old_size = os.path.getsize(fspec)
+            except OSError:
+                pass
+        try:
+            os.rename(tmp_fspec, fspec)
+        except OSError:
+            # The entry is already in place on Windows.
+            self._remove(tmp_fspec)
+            return
+        if self.max_size is not None:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += size - old_size
+            if self._size > self.max_size:
+                self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits max_size.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        for fspec, entry_size, _ in entries:
+            if self.max_size is None or size <= self.max_size:
+                break
+            if self._remove(fspec):
+                self.evictions += 1
+            size -= entry_size
+        self._size = size
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        for fspec, _, _ in self._entries():
+            self._remove(fspec)
+        self._size = 0
+
+    def _entries(self):
+        """
+        List the cache entries.
+
+        :return: A list of (fspec, size, mtime) tuples.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            fspec = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(fspec)
+            except OSError:
+                # Removed concurrently.
+                continue
+            entries.append((fspec, stat.st_size, stat.st_mtime))
+        return entries
+
+    @staticmethod
+    def _remove(fspec):
+        try:
+            os.remove(fspec)
+        except OSError:
+            return False
+        return True
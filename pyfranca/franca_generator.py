@@ -0,0 +1,257 @@
+"""
+Synthetic Franca model generator.
+"""
+
+import os
+import random
+from collections import OrderedDict
+
+
+class ModelGenerator(object):
+    """
+    Generator of synthetic, valid Franca models for scale testing.
+
+    A model consists of packages, one per file. Each package has a type
+    collection and interfaces, which use the types of the package and of
+    the imported packages. Packages are arranged in import levels - a
+    package imports packages of the next lower level only, so the import
+    graph is acyclic and its depth is bounded. The output is deterministic
+    for a seed.
+    """
+
+    # Primitive types for fields and arguments.
+    primitive_types = ["Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16",
+                       "UInt32", "UInt64", "Boolean", "Float", "Double",
+                       "String", "ByteBuffer"]
+
+    def __init__(self, packages=10, interfaces=2, methods=5, attributes=5,
+                 broadcasts=2, types=6, struct_fields=5, enumerators=5,
+                 imports=2, depth=3, comments=0.5, anonymous_arrays=0.1,
+                 package_prefix="gen", seed=0):
+        """
+        Constructor.
+
+        :param packages: Number of packages (files).
+        :param interfaces: Number of interfaces per package.
+        :param methods: Number of methods per interface.
+        :param attributes: Number of attributes per interface.
+        :param broadcasts: Number of broadcasts per interface.
+        :param types: Number of types per type collection - structures,
+            enumerations, arrays and maps in turn.
+        :param struct_fields: Number of fields per structure.
+        :param enumerators: Number of enumerators per enumeration.
+        :param imports: Maximum number of packages a package imports (import
+            fan-out).
+        :param depth: Number of import levels. Packages of the lowest level
+            import nothing.
+        :param comments: Fraction of the elements with structured
+            comments, 0.0 to 1.0 .
+        :param anonymous_arrays: Fraction of the fields, arguments and
+            attributes with anonymous array types, 0.0 to 1.0 .
+        :param package_prefix: Prefix of the package names.
+        :param seed: Random seed.
+        """
+        if packages < 1 or depth < 1:
+            raise ValueError("At least one package and import level are "
+                             "required.")
+        self.packages = packages
+        self.interfaces = interfaces
+        self.methods = methods
+        self.attributes = attributes
+        self.broadcasts = broadcasts
+        self.types = types
+        self.struct_fields = struct_fields
+        self.enumerators = enumerators
+        self.imports = imports
+        self.depth = depth
+        self.comments = comments
+        self.anonymous_arrays = anonymous_arrays
+        self.package_prefix = package_prefix
+        self.seed = seed
+        self._random = None
+        self._lines = None
+
+    def package_name(self, index):
+        """
+        Get the name of a package.
+
+        :param index: Package index.
+        :return: Package name string.
+        """
+        return "{}.P{}".format(self.package_prefix, index)
+
+    @staticmethod
+    def file_name(index):
+        """
+        Get the file name of a package.
+
+        :param index: Package index.
+        :return: File name string.
+        """
+        return "P{}.fidl".format(index)
+
+    def level(self, index):
+        """
+        Get the import level of a package.
+
+        :param index: Package index.
+        :return: Import level, 0 for the lowest one.
+        """
+        return index * min(self.depth, self.packages) // self.packages
+
+    def generate(self):
+        """
+        Generate the model.
+
+        :return: An OrderedDict of file names and FIDL texts.
+        """
+        self._random = random.Random(self.seed)
+        levels = {}
+        for index in range(self.packages):
+            levels.setdefault(self.level(index), []).append(index)
+        files = OrderedDict()
+        for index in range(self.packages):
+            candidates = levels.get(self.level(index) - 1, [])
+            imported = sorted(self._random.sample(
+                candidates, min(self.imports, len(candidates))))
+            files[self.file_name(index)] = self._package(index, imported)
+        self._lines = None
+        return files
+
+    def write(self, directory):
+        """
+        Generate the model and write it to a directory.
+
+        :param directory: Output directory. Created if missing.
+        :return: A list of the file specifications of the written files.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fspecs = []
+        for file_name, fidl in self.generate().items():
+            fspec = os.path.join(directory, file_name)
+            with open(fspec, "w") as f:
+                f.write(fidl)
+            fspecs.append(fspec)
+        return fspecs
+
+    def _emit(self, indent, line):
+        self._lines.append("    " * indent + line)
+
+    def _comment(self, indent, text):
+        """ Emit a structured comment with the configured density. """
+        if self._random.random() < self.comments:
+            self._emit(indent, "<** @description: {} **>".format(text))
+
+    def _type(self, types):
+        """ Choose a type for a field, an argument or an attribute. """
+        if types and self._random.random() < 0.5:
+            type_name = self._random.choice(types)
+        else:
+            type_name = self._random.choice(self.primitive_types)
+        if self._random.random() < self.anonymous_arrays:
+            type_name += "[]"
+        return type_name
+
+    def _package(self, index, imported):
+        """ Generate the FIDL text of a package. """
+        self._lines = []
+        self._comment(0, "Package {}.".format(index))
+        self._emit(0, "package {}".format(self.package_name(index)))
+        # Imported types are referenced by FQN.
+        types = []
+        for imported_index in imported:
+            namespace = "{}.Types".format(self.package_name(imported_index))
+            self._emit(0, "import {}.* from \"{}\"".format(
+                namespace, self.file_name(imported_index)))
+            types.extend("{}.{}".format(namespace, name)
+                         for name in self._type_names(imported_index))
+        self._emit(0, "")
+        types.extend(self._type_collection(index, types))
+        for i in range(self.interfaces):
+            self._interface(index, i, types)
+        return "\n".join(self._lines) + "\n"
+
+    def _type_names(self, index):
+        """ Get the names of the types of a package. """
+        prefixes = ["S", "E", "A", "M"]
+        return ["{}{}_{}".format(prefixes[i % 4], index, i)
+                for i in range(self.types)]
+
+    def _type_collection(self, index, types):
+        """ Emit the type collection of a package. """
+        self._comment(0, "Types of package {}.".format(index))
+        self._emit(0, "typeCollection Types {")
+        self._emit(1, "version { major 1 minor 0 }")
+        local_types = []
+        for i, name in enumerate(self._type_names(index)):
+            self._emit(0, "")
+            self._comment(1, "Type {}.".format(name))
+            kind = i % 4
+            if kind == 0:
+                self._emit(1, "struct {} {{".format(name))
+                for j in range(self.struct_fields):
+                    self._comment(2, "Field {}.".format(j))
+                    self._emit(2, "{} f{}".format(
+                        self._type(types + local_types), j))
+                self._emit(1, "}")
+            elif kind == 1:
+                self._emit(1, "enumeration {} {{".format(name))
+                for j in range(self.enumerators):
+                    self._comment(2, "Enumerator {}.".format(j))
+                    self._emit(2, "V{} = {}".format(j, hex(j)))
+                self._emit(1, "}")
+            elif kind == 2:
+                self._emit(1, "array {} of {}".format(
+                    name, self._type(types + local_types).rstrip("[]")))
+            else:
+                self._emit(1, "map {} {{ {} to {} }}".format(
+                    name, self._random.choice(self.primitive_types),
+                    self._type(types + local_types)))
+            local_types.append(name)
+        self._emit(1, "const String Name = \"Package {}\"".format(index))
+        self._emit(0, "}")
+        return local_types
+
+    def _arguments(self, indent, direction, count, types):
+        """ Emit an argument group unless empty. """
+        if not count:
+            return
+        self._emit(indent, "{} {{".format(direction))
+        for i in range(count):
+            self._comment(indent + 1, "Argument {}.".format(i))
+            self._emit(indent + 1, "{} {}{}".format(
+                self._type(types), direction, i))
+        self._emit(indent, "}")
+
+    def _interface(self, index, interface_index, types):
+        """ Emit an interface. """
+        name = "I{}_{}".format(index, interface_index)
+        self._emit(0, "")
+        self._comment(0, "Interface {}.".format(name))
+        self._emit(0, "interface {} {{".format(name))
+        self._emit(1, "version {{ major 1 minor {} }}".format(interface_index))
+        for i in range(self.attributes):
+            self._comment(1, "Attribute {}.".format(i))
+            flags = self._random.choice(["", " readonly", " noSubscriptions"])
+            self._emit(1, "attribute {} a{}{}".format(
+                self._type(types), i, flags))
+        for i in range(self.methods):
+            self._emit(0, "")
+            self._comment(1, "Method {}.".format(i))
+            fire_and_forget = self._random.random() < 0.2
+            self._emit(1, "method m{}{} {{".format(
+                i, " fireAndForget" if fire_and_forget else ""))
+            self._arguments(2, "in", self._random.randint(0, 3), types)
+            if not fire_and_forget:
+                self._arguments(2, "out", self._random.randint(1, 2), types)
+            self._emit(1, "}")
+        for i in range(self.broadcasts):
+            self._emit(0, "")
+            self._comment(1, "Broadcast {}.".format(i))
+            selective = self._random.random() < 0.2
+            self._emit(1, "broadcast b{}{} {{".format(
+                i, " selective" if selective else ""))
+            self._arguments(2, "out", self._random.randint(1, 3), types)
+            self._emit(1, "}")
+        self._emit(0, "}")
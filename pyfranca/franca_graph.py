@@ -0,0 +1,255 @@
+"""
+Franca import dependency graph.
+"""
+
+from collections import OrderedDict
+
+
+class GraphException(Exception):
+
+    def __init__(self, message, cycle=None):
+        super(GraphException, self).__init__(message)
+        self.message = message
+        self.cycle = cycle
+
+    def __str__(self):
+        return self.message
+
+
+class DependencyGraph(object):
+    """
+    Directed graph of dependencies between nodes, e.g. model files or
+    packages. An edge leads from a node to a node it depends on (imports).
+    Nodes and edges are kept in insertion order.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        # Node -> OrderedDict of the nodes it depends on (forward edges).
+        self._dependencies = OrderedDict()
+        # Node -> OrderedDict of the nodes depending on it (reverse edges).
+        self._dependents = OrderedDict()
+
+    def __contains__(self, node):
+        return node in self._dependencies
+
+    def __iter__(self):
+        return iter(self._dependencies)
+
+    def __len__(self):
+        return len(self._dependencies)
+
+    def add_node(self, node):
+        """
+        Add a node without edges unless it is already in the graph.
+
+        :param node: A hashable node.
+        """
+        if node not in self._dependencies:
+            self._dependencies[node] = OrderedDict()
+            self._dependents[node] = OrderedDict()
+
+    def add_edge(self, node, dependency):
+        """
+        Add a dependency edge, adding the missing nodes.
+
+        :param node: The depending node.
+        :param dependency: The node it depends on.
+        """
+        self.add_node(node)
+        self.add_node(dependency)
+        self._dependencies[node][dependency] = None
+        self._dependents[dependency][node] = None
+
+    def remove_node(self, node):
+        """
+        Remove a node and all its edges.
+
+        :param node: A node in the graph.
+        """
+        for dependency in self._dependencies.pop(node):
+            if dependency != node:
+                del self._dependents[dependency][node]
+        for dependent in self._dependents.pop(node):
+            if dependent != node:
+                del self._dependencies[dependent][node]
+
+    def dependencies(self, node):
+        """
+        Get the direct dependencies of a node.
+
+        :param node: A node in the graph.
+        :return: A list of nodes.
+        """
+        return list(self._dependencies[node])
+
+    def dependents(self, node):
+        """
+        Get the nodes directly depending on a node.
+
+        :param node: A node in the graph.
+        :return: A list of nodes.
+        """
+        return list(self._dependents[node])
+
+    @staticmethod
+    def _closure(edges, nodes):
+        closure = set(nodes)
+        stack = list(closure)
+        while stack:
+            for node in edges[stack.pop()]:
+                if node not in closure:
+                    closure.add(node)
+                    stack.append(node)
+        return closure
+
+    def transitive_dependencies(self, nodes):
+        """
+        Get the nodes, the given ones depend on directly or transitively.
+
+        :param nodes: A collection of nodes in the graph.
+        :return: A set of nodes, including the given ones.
+        """
+        return self._closure(self._dependencies, nodes)
+
+    def transitive_dependents(self, nodes):
+        """
+        Get the nodes, depending on the given ones directly or transitively.
+
+        :param nodes: A collection of nodes in the graph.
+        :return: A set of nodes, including the given ones.
+        """
+        return self._closure(self._dependents, nodes)
+
+    def subgraph(self, nodes):
+        """
+        Get the graph induced by a subset of the nodes.
+
+        :param nodes: An iterable of nodes in the graph.
+        :return: DependencyGraph object with the given nodes in the given
+            order.
+        """
+        graph = DependencyGraph()
+        for node in nodes:
+            graph.add_node(node)
+        for node in graph:
+            for dependency in self._dependencies[node]:
+                if dependency in graph:
+                    graph.add_edge(node, dependency)
+        return graph
+
+    def grouped(self, key):
+        """
+        Get the graph of node groups, e.g. the package graph of a file graph.
+        Edges within a group are omitted.
+
+        :param key: A function mapping a node to its group.
+        :return: DependencyGraph object with the groups as nodes.
+        """
+        graph = DependencyGraph()
+        for node, dependencies in self._dependencies.items():
+            group = key(node)
+            graph.add_node(group)
+            for dependency in dependencies:
+                dependency_group = key(dependency)
+                if dependency_group != group:
+                    graph.add_edge(group, dependency_group)
+        return graph
+
+    def strongly_connected_components(self):
+        """
+        Get the strongly connected components of the graph (Tarjan's
+        algorithm). Nodes in a component depend on each other in a cycle,
+        unless the component has a single node.
+
+        :return: A list of lists of nodes. The components are ordered so
+            that a component precedes the components depending on it.
+        """
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in self._dependencies:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._dependencies[root]))]
+            while work:
+                node, dependencies = work[-1]
+                for dependency in dependencies:
+                    if dependency not in index:
+                        index[dependency] = lowlink[dependency] = len(index)
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency,
+                                     iter(self._dependencies[dependency])))
+                        break
+                    elif dependency in on_stack:
+                        lowlink[node] = min(lowlink[node], index[dependency])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            item = stack.pop()
+                            on_stack.discard(item)
+                            component.append(item)
+                            if item == node:
+                                break
+                        component.reverse()
+                        components.append(component)
+        return components
+
+    def find_cycle(self):
+        """
+        Find a dependency cycle.
+
+        :return: A list of nodes, starting and ending with the same node,
+            or None if the graph is acyclic.
+        """
+        visited = set()
+        for root in self._dependencies:
+            if root in visited:
+                continue
+            visited.add(root)
+            path = [root]
+            on_path = set(path)
+            work = [iter(self._dependencies[root])]
+            while work:
+                for dependency in work[-1]:
+                    if dependency in on_path:
+                        return path[path.index(dependency):] + [dependency]
+                    if dependency not in visited:
+                        visited.add(dependency)
+                        path.append(dependency)
+                        on_path.add(dependency)
+                        work.append(iter(self._dependencies[dependency]))
+                        break
+                else:
+                    work.pop()
+                    on_path.discard(path.pop())
+        return None
+
+    def topological_order(self):
+        """
+        Order the nodes so that each node follows its dependencies.
+
+        :return: A list of nodes.
+        :raises GraphException: If the graph contains a dependency cycle.
+        """
+        cycle = self.find_cycle()
+        if cycle is not None:
+            raise GraphException(
+                "Circular dependency {}.".format(
+                    " -> ".join("'{}'".format(node) for node in cycle)),
+                cycle)
+        return [component[0]
+                for component in self.strongly_connected_components()]
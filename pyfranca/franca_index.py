@@ -0,0 +1,117 @@
+"""
+Franca symbol index.
+"""
+
+
+class PackageScope(object):
+    """
+    Names visible from a package, in resolution precedence order.
+    """
+
+    def __init__(self, package):
+        """
+        Constructs the visible-name tables of a package.
+
+        :param package: ast.Package object.
+        """
+        # Type ID -> ast.Type from the package type collections, followed by
+        #   the namespaces imported in the package. The first definition of
+        #   a name wins.
+        self.types = {}
+        # "package.namespace" strings of namespace imports.
+        self.imports = set()
+        # Namespace ID -> ast.Namespace from model imports.
+        self.namespaces = {}
+
+        for typecollection in package.typecollections.values():
+            self._add_types(typecollection)
+        for package_import in package.imports:
+            if package_import.namespace:
+                self.imports.add(package_import.namespace[:-2])
+                if package_import.namespace_reference:
+                    self._add_types(package_import.namespace_reference)
+            elif package_import.package_reference:
+                package_reference = package_import.package_reference
+                for namespace in package_reference.typecollections.values():
+                    self.namespaces.setdefault(namespace.name, namespace)
+                for namespace in package_reference.interfaces.values():
+                    self.namespaces.setdefault(namespace.name, namespace)
+
+    def _add_types(self, namespace):
+        for name, item in namespace.members():
+            self.types.setdefault(name, item)
+
+
+class SymbolIndex(object):
+    """
+    Index of the symbols of imported Franca packages.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        # FQN -> ast.Type for all namespace members.
+        self.types = {}
+        # ast.Package -> PackageScope, built on demand.
+        self._scopes = {}
+
+    def add_package(self, package):
+        """
+        Index the namespaces of a package.
+
+        :param package: ast.Package object.
+        """
+        for namespace in package.typecollections.values():
+            self.add_namespace(package.name, namespace)
+        for namespace in package.interfaces.values():
+            self.add_namespace(package.name, namespace)
+        self.invalidate()
+
+    def add_namespace(self, package_name, namespace):
+        """
+        Index the members of a namespace.
+
+        :param package_name: Name of the package, defining the namespace.
+        :param namespace: ast.Namespace object.
+        """
+        prefix = "{}.{}.".format(package_name, namespace.name)
+        for name, item in namespace.members():
+            self.types[prefix + name] = item
+
+    def remove_namespace(self, package_name, namespace):
+        """
+        Remove the members of a namespace from the index.
+
+        :param package_name: Name of the package, defining the namespace.
+        :param namespace: ast.Namespace object.
+        """
+        prefix = "{}.{}.".format(package_name, namespace.name)
+        for name, item in namespace.members():
+            if self.types.get(prefix + name) is item:
+                del self.types[prefix + name]
+        self.invalidate()
+
+    def scope(self, package):
+        """
+        Get the visible-name tables of a package.
+
+        :param package: ast.Package object.
+        :return: PackageScope object.
+        """
+        scope = self._scopes.get(package)
+        if scope is None:
+            scope = PackageScope(package)
+            self._scopes[package] = scope
+        return scope
+
+    def invalidate(self, package=None):
+        """
+        Drop visible-name tables after packages or their imports change.
+
+        :param package: ast.Package object or None to drop all tables.
+        """
+        if package is None:
+            self._scopes.clear()
+        else:
+            self._scopes.pop(package, None)
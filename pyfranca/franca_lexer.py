@@ -2,19 +2,78 @@
 Franca lexer.
 """
 
+import contextlib
+import functools
+import io
+import mmap
+import operator
+import os
+import re
+from array import array
+import string
+from collections import OrderedDict
 import ply.lex as lex
 
 
 class LexerException(Exception):
 
     def __init__(self, message):
-        super(LexerException, self).__init__()
+        super(LexerException, self).__init__(message)
         self.message = message
 
     def __str__(self):
         return self.message
 
 
+@contextlib.contextmanager
+def open_input(fspec, encoding=None, use_mmap=False):
+    """
+    Open an input file for lexing, as a context manager.
+
+    :param fspec: Input file specification.
+    :param encoding: Encoding of the file. Defaults to the platform encoding
+        for text input and to UTF-8 for memory-mapped input.
+    :param use_mmap: Yield the file memory-mapped as read-only binary input,
+        instead of reading it into a string. The encoding must be
+        ASCII-compatible.
+    :return: The input text or buffer.
+
+    On Python 2 files are read as native strings in their encoding and the
+    lexers yield native string values for both text and memory-mapped
+    input.
+    """
+    if not use_mmap:
+        if str is bytes:
+            # Universal newlines, as on Python 3.
+            f = open(fspec, "rU")
+        elif encoding is None:
+            f = open(fspec, "r")
+        else:
+            f = io.open(fspec, "r", encoding=encoding)
+        with f:
+            yield f.read()
+        return
+    encoding = encoding or "utf-8"
+    try:
+        compatible = string.printable.encode(encoding) == \
+            string.printable.encode("ascii")
+    except UnicodeError:
+        compatible = False
+    if not compatible:
+        raise ValueError(
+            "Encoding '{}' is not ASCII-compatible.".format(encoding))
+    with open(fspec, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped.
+            yield b""
+            return
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+
 class Lexer(object):
     """
     Franca IDL PLY lexer.
@@ -109,22 +168,54 @@ class Lexer(object):
         r"\/\/[^\r\n]*"
         t.lexer.lineno += t.value.count("\n")
 
-    # Block comments
+    @staticmethod
+    def _comment_end(data, start, opener, terminator, lineno):
+        """
+        Find the end of a comment with str.find(), in linear time.
+
+        :param data: Input text.
+        :param start: Position of the comment opener.
+        :param opener: Comment opener, e.g. "/*".
+        :param terminator: Comment terminator, e.g. "*/".
+        :param lineno: Line number of the comment.
+        :return: Position after the terminator.
+        """
+        end = data.find(terminator, start + len(opener))
+        if end == -1:
+            # Unterminated comments are illegal at the opener.
+            char = data[start:start + 1]
+            if not isinstance(char, str):
+                char = char.decode("ascii")
+            raise LexerException("Illegal character '{}' at line {}.".format(
+                                 char, lineno))
+        return end + len(terminator)
+
+    # Block comments - the rule matches the opener and the comment is
+    # scanned for the terminator.
     # noinspection PyPep8Naming,PyIncorrectDocstring
     @staticmethod
     def t_BLOCK_COMMENT(t):
         # noinspection PySingleQuotedDocstring
-        r"/\*(.|\n)*?\*/"
-        t.lexer.lineno += t.value.count("\n")
-
-    # Structured comments
+        r"/\*"
+        lexer = t.lexer
+        end = Lexer._comment_end(lexer.lexdata, t.lexpos, "/*", "*/",
+                                 t.lineno)
+        lexer.lineno += lexer.lexdata.count("\n", t.lexpos, end)
+        lexer.lexpos = end
+
+    # Structured comments - the rule matches the opener and the comment is
+    # scanned for the terminator.
     # noinspection PyPep8Naming,PyIncorrectDocstring
     @staticmethod
     def t_STRUCTURED_COMMENT(t):
         # noinspection PySingleQuotedDocstring
-        r"<\*\*(.|\n)*?\*\*>"
-        t.lexer.lineno += t.value.count("\n")
-        t.value = t.value[3:-3].strip()
+        r"<\*\*"
+        lexer = t.lexer
+        end = Lexer._comment_end(lexer.lexdata, t.lexpos, "<**", "**>",
+                                 t.lineno)
+        lexer.lineno += lexer.lexdata.count("\n", t.lexpos, end)
+        lexer.lexpos = end
+        t.value = lexer.lexdata[t.lexpos + 3:end - 3].strip()
         return t
 
     # noinspection PyPep8Naming,PyIncorrectDocstring
@@ -192,6 +283,9 @@ class Lexer(object):
         raise LexerException("Illegal character '{}' at line {}.".format(
                              t.value[0], t.lineno))
 
+    # Binary input support - see FastLexer.
+    supports_buffers = False
+
     def __init__(self, **kwargs):
         """
         Constructor.
@@ -226,12 +320,625 @@ class Lexer(object):
             tokenized_data.append(tok)
         return tokenized_data
 
-    def tokenize_file(self, fspec):
+    def tokenize_file(self, fspec, encoding=None, use_mmap=False):
         """
         Tokenize input file to stdout for testing purposes.
 
         :param fspec: Input file to parse.
+        :param encoding: Encoding of the file - see open_input().
+        :param use_mmap: Lex the memory-mapped file without reading it into
+            a string. Requires a lexer with buffer support.
+        """
+        if use_mmap and not self.supports_buffers:
+            raise LexerException(
+                "{} does not support memory-mapped input.".format(
+                    self.__class__.__name__))
+        with open_input(fspec, encoding, use_mmap) as data:
+            if use_mmap:
+                self.lexer.encoding = encoding or "utf-8"
+            try:
+                return self.tokenize(data)
+            finally:
+                # Release the input buffer.
+                self.lexer.input("")
+
+    def tokenize_stream(self, data):
+        """
+        Tokenize input data to a compact token stream.
+
+        :param data: Input text.
+        :return: TokenStream object.
+        """
+        types = TokenStream.token_types
+        type_kinds = TokenStream.token_kinds
+        kinds = array("B")
+        starts = array("I")
+        ends = array("I")
+        lines = array("I")
+        lexer = self.lexer
+        lexer.lineno = 1
+        lexer.input(data)
+        get_token = lexer.token
+        while True:
+            tok = get_token()
+            if not tok:
+                break
+            kinds.append(type_kinds[tok.type])
+            starts.append(tok.lexpos)
+            # The lexer is positioned after the token.
+            ends.append(lexer.lexpos)
+            lines.append(tok.lineno)
+        return TokenStream(data, types, kinds, starts, ends, lines)
+
+
+def _view(buffer):
+    """
+    Get a zero-copy view of an array. Arrays are used directly where they
+    do not support memoryview, i.e. with Python 2.
+    """
+    try:
+        return memoryview(buffer)
+    except TypeError:
+        return buffer
+
+
+class TokenStream(object):
+    """
+    Compact, read-only stream of tokens. The token kinds, the start and end
+    positions and the line numbers are stored in arrays - 13 bytes per
+    token (see bytes_per_token) instead of a LexToken object per token.
+    Token text and values are materialized on access from the source text.
+
+    Iteration yields (token type, start, end) tuples and slicing returns
+    a stream sharing the arrays of this one.
+    """
+
+    # Token types by kind - the Lexer tokens and literals.
+    token_types = tuple(Lexer.tokens) + tuple(Lexer.literals)
+    token_kinds = dict((token_type, kind)
+                       for kind, token_type in enumerate(token_types))
+
+    # Array type codes of the kinds, start positions, end positions and
+    # line numbers.
+    typecodes = ("B", "I", "I", "I")
+    bytes_per_token = sum(array(typecode).itemsize for typecode in typecodes)
+
+    # Token values from the token text. The value is the text for the
+    # token types which are not listed.
+    _converters = {
+        "STRUCTURED_COMMENT": lambda text: text[3:-3].strip(),
+        "STRING_VAL": lambda text: text[1:-1],
+        "HEXADECIMAL_VAL": lambda text: int(text, 16),
+        "BINARY_VAL": lambda text: int(text, 2),
+        "INTEGER_VAL": lambda text: int(text, 10),
+        "BOOLEAN_VAL": lambda text: text == "true",
+    }
+
+    def __init__(self, data, types, kinds, starts, ends, lines):
+        """
+        Constructor.
+
+        :param data: Source text.
+        :param types: Token types by kind.
+        :param kinds: Array of the token kinds.
+        :param starts: Array of the token start positions.
+        :param ends: Array of the token end positions.
+        :param lines: Array of the token line numbers.
+        """
+        self.data = data
+        self.types = types
+        self.kinds = _view(kinds)
+        self.starts = _view(starts)
+        self.ends = _view(ends)
+        self.lines = _view(lines)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __iter__(self):
+        # zip() and map() return lists on Python 2.
+        return iter(zip(map(self.types.__getitem__, self.kinds),
+                        self.starts, self.ends))
+
+    def __getitem__(self, index):
+        """
+        Get a token or a slice of the stream.
+
+        :param index: Token index or a slice.
+        :return: LexToken object with the token value or a TokenStream
+            object sharing the arrays of this one.
+        """
+        if isinstance(index, slice):
+            return TokenStream(self.data, self.types, self.kinds[index],
+                               self.starts[index], self.ends[index],
+                               self.lines[index])
+        tok = lex.LexToken()
+        tok.type = self.type(index)
+        tok.value = self.value(index)
+        tok.lineno = self.lines[index]
+        tok.lexpos = self.starts[index]
+        return tok
+
+    @property
+    def nbytes(self):
+        """
+        Size of the token arrays in bytes.
+        """
+        return len(self) * self.bytes_per_token
+
+    def type(self, index):
+        """
+        Get the type of a token.
+
+        :param index: Token index.
+        :return: Token type, e.g. "ID" or "{".
+        """
+        return self.types[self.kinds[index]]
+
+    def text(self, index):
+        """
+        Get the source text of a token.
+
+        :param index: Token index.
+        :return: Token text.
+        """
+        return self.data[self.starts[index]:self.ends[index]]
+
+    def value(self, index):
+        """
+        Get the value of a token, as produced by the lexer.
+
+        :param index: Token index.
+        :return: Token value.
+        """
+        converter = self._converters.get(self.type(index))
+        text = self.text(index)
+        return converter(text) if converter else text
+
+
+def _buffer_counter(data, chunk_size=1 << 20):
+    """
+    Get a count(sub, start, end) function for a buffer object, e.g. an
+    mmap.mmap, which has no count() method. The buffer is copied in chunks.
+
+    :param data: Bytes or a buffer object.
+    :param chunk_size: Maximum size of the copied chunks.
+    """
+    if hasattr(data, "count"):
+        return data.count
+
+    def count(sub, start, end):
+        # Only single byte subsequences are counted, e.g. newlines.
+        result = 0
+        while start < end:
+            chunk_end = min(start + chunk_size, end)
+            result += data[start:chunk_end].count(sub)
+            start = chunk_end
+        return result
+
+    return count
+
+
+class _FastScanner(object):
+    """
+    Scanner of the FastLexer with the interface of the PLY lexer objects,
+    used by the PLY parser - input(), token(), lineno and lexpos.
+    """
+
+    def __init__(self, pattern, kinds, buffer_pattern):
+        """
+        Constructor.
+
+        :param pattern: Compiled master regular expression.
+        :param kinds: A list of (token kind, token type) tuples, indexed by
+            the group index of the matching rule.
+        :param buffer_pattern: Compiled master regular expression for
+            binary input.
+        """
+        self._pattern = pattern
+        self._kinds = kinds
+        self._buffer_pattern = buffer_pattern
+        # Encoding of binary input.
+        self.encoding = "utf-8"
+        self.lexdata = None
+        self.lineno = 1
+        self.lexpos = 0
+        self.token = self._end
+
+    @staticmethod
+    def _end():
+        return None
+
+    def input(self, data):
+        """
+        Set the input text.
+
+        :param data: Input text or binary input in an ASCII-compatible
+            encoding - bytes or a buffer object, e.g. mmap.mmap . Token
+            positions in binary input are byte offsets.
+        """
+        self.lexdata = data
+        self.lexpos = 0
+        self.token = functools.partial(next, self._scan(data), None)
+
+    def _scan(self, data):
+        """
+        Generate the tokens of an input text.
+        """
+        # Local copies of the frequently used names.
+        IGNORE, LINES, ID, LITERAL, INTEGER, HEXADECIMAL, BINARY, BOOLEAN, \
+            STRING, BLOCK_COMMENT, STRUCTURED_COMMENT = FastLexer.IGNORE, \
+            FastLexer.LINES, FastLexer.ID, FastLexer.LITERAL, \
+            FastLexer.INTEGER, FastLexer.HEXADECIMAL, FastLexer.BINARY, \
+            FastLexer.BOOLEAN, FastLexer.STRING, FastLexer.BLOCK_COMMENT, \
+            FastLexer.STRUCTURED_COMMENT
+        kinds = self._kinds
+        keyword_map = Lexer._keyword_map
+        comment_end = Lexer._comment_end
+        new_token = lex.LexToken
+        # Buffers keep the line endings of the file.
+        buffered = not isinstance(data, str)
+        if not buffered:
+            finditer = self._pattern.finditer
+            count = data.count
+            decode = None
+            newline, block_comment, structured_comment = \
+                "\n", ("/*", "*/"), ("<**", "**>")
+        else:
+            # Decode only the token values of binary input. Python 2 keeps
+            #   native strings, like for text input.
+            finditer = self._buffer_pattern.finditer
+            count = _buffer_counter(data)
+            if str is bytes:
+                decode = None
+            else:
+                decode = operator.methodcaller("decode", self.encoding)
+            newline, block_comment, structured_comment = \
+                b"\n", (b"/*", b"*/"), (b"<**", b"**>")
+        pos = 0
+        lineno = self.lineno
+        scanning = True
+        while scanning:
+            scanning = False
+            for m in finditer(data, pos):
+                if m.start() != pos:
+                    # No rule matches at pos.
+                    break
+                index = m.lastindex
+                start = m.start(index)
+                if start != pos:
+                    # Skipped whitespace.
+                    lineno += count(newline, pos, start)
+                pos = m.end()
+                kind, token_type = kinds[index]
+                value = m.group(index)
+                if decode is not None:
+                    value = decode(value)
+                if kind == ID:
+                    token_type = keyword_map.get(value, "ID")
+                elif kind == LITERAL:
+                    token_type = value
+                elif kind == LINES:
+                    lineno += value.count("\n")
+                    continue
+                elif kind == IGNORE:
+                    continue
+                elif kind == INTEGER:
+                    value = int(value, 10)
+                elif kind == STRING:
+                    value = value[1:-1]
+                    if buffered:
+                        value = value.replace("\r\n", "\n")
+                elif kind == HEXADECIMAL:
+                    value = int(value, 16)
+                elif kind == BINARY:
+                    value = int(value, 2)
+                elif kind == BOOLEAN:
+                    value = value == "true"
+                elif kind == BLOCK_COMMENT or kind == STRUCTURED_COMMENT:
+                    # Continue scanning after the comment terminator.
+                    self.lineno = lineno
+                    self.lexpos = start
+                    if kind == BLOCK_COMMENT:
+                        pos = comment_end(data, start, block_comment[0],
+                                          block_comment[1], lineno)
+                    else:
+                        pos = comment_end(data, start, structured_comment[0],
+                                          structured_comment[1], lineno)
+                        value = data[start + 3:pos - 3]
+                        if decode is not None:
+                            value = decode(value)
+                        if buffered:
+                            value = value.replace("\r\n", "\n")
+                        token = new_token()
+                        token.type = token_type
+                        token.value = value.strip()
+                        token.lineno = lineno
+                        token.lexpos = start
+                        self.lexpos = pos
+                        yield token
+                    lineno += count(newline, start, pos)
+                    scanning = True
+                    break
+                token = new_token()
+                token.type = token_type
+                token.value = value
+                token.lineno = lineno
+                token.lexpos = start
+                self.lexpos = pos
+                yield token
+        self._finish(data, pos, lineno)
+
+    def _finish(self, data, pos, lineno):
+        """
+        Finish scanning an input text at a position, where no rule matches
+        or the end.
+
+        :raises LexerException: Unless at the end of the input.
+        """
+        end = len(data)
+        if isinstance(data, str):
+            whitespace = FastLexer._whitespace
+            newline = "\n"
+        else:
+            whitespace = FastLexer._buffer_whitespace.encode("ascii")
+            newline = b"\n"
+        if pos < end:
+            # Skip the whitespace before the illegal character.
+            start = pos
+            while pos < end and data[pos:pos + 1] in whitespace:
+                pos += 1
+            lineno += data[start:pos].count(newline)
+        self.lineno = lineno
+        self.lexpos = pos
+        if pos < end:
+            char = data[pos:pos + 4]
+            if not isinstance(char, str):
+                char = char.decode(self.encoding, "replace")
+            raise LexerException("Illegal character '{}' at line {}.".format(
+                                 char[0], lineno))
+
+    def scan_stream(self, data):
+        """
+        Scan an input text to a token stream without creating token objects
+        or token values.
+
+        :param data: Input text.
+        :return: TokenStream object.
+        """
+        IGNORE, LINES, ID, LITERAL, BLOCK_COMMENT, STRUCTURED_COMMENT = \
+            FastLexer.IGNORE, FastLexer.LINES, FastLexer.ID, \
+            FastLexer.LITERAL, FastLexer.BLOCK_COMMENT, \
+            FastLexer.STRUCTURED_COMMENT
+        token_kinds = TokenStream.token_kinds
+        id_kind = token_kinds["ID"]
+        keyword_kinds = dict((keyword, token_kinds[token_type])
+                             for keyword, token_type
+                             in Lexer._keyword_map.items())
+        finditer = self._pattern.finditer
+        kinds = self._kinds
+        comment_end = Lexer._comment_end
+        count = data.count
+        kind_array = array("B")
+        starts = array("I")
+        ends = array("I")
+        lines = array("I")
+        add_kind = kind_array.append
+        add_start = starts.append
+        add_end = ends.append
+        add_line = lines.append
+        pos = 0
+        lineno = self.lineno
+        scanning = True
+        while scanning:
+            scanning = False
+            for m in finditer(data, pos):
+                if m.start() != pos:
+                    break
+                index = m.lastindex
+                start = m.start(index)
+                if start != pos:
+                    lineno += count("\n", pos, start)
+                pos = m.end()
+                kind, token_type = kinds[index]
+                if kind == ID:
+                    token_kind = keyword_kinds.get(m.group(index), id_kind)
+                elif kind == LITERAL:
+                    token_kind = token_kinds[m.group(index)]
+                elif kind == LINES:
+                    lineno += m.group(index).count("\n")
+                    continue
+                elif kind == IGNORE:
+                    continue
+                elif kind == BLOCK_COMMENT or kind == STRUCTURED_COMMENT:
+                    self.lineno = lineno
+                    if kind == BLOCK_COMMENT:
+                        pos = comment_end(data, start, "/*", "*/", lineno)
+                    else:
+                        pos = comment_end(data, start, "<**", "**>", lineno)
+                        add_kind(token_kinds[token_type])
+                        add_start(start)
+                        add_end(pos)
+                        add_line(lineno)
+                    lineno += count("\n", start, pos)
+                    scanning = True
+                    break
+                else:
+                    token_kind = token_kinds[token_type]
+                add_kind(token_kind)
+                add_start(start)
+                add_end(pos)
+                add_line(lineno)
+        self._finish(data, pos, lineno)
+        return TokenStream(data, TokenStream.token_types, kind_array, starts,
+                           ends, lines)
+
+
+class FastLexer(Lexer):
+    """
+    Franca IDL lexer, producing the token stream of Lexer without the
+    per-rule PLY callbacks.
+
+    The Lexer rules are combined into a single compiled regular expression
+    with a branch per class of the characters, a token can start with. A
+    branch tries only the rules which can match at such a character and
+    the matching rule is identified by the group index. Other characters
+    are matched with all rules in the PLY order. A drop-in replacement for
+    the_lexer of franca_parser.Parser .
+    """
+
+    # Token kinds.
+    IGNORE = 0
+    LINES = 1
+    TOKEN = 2
+    ID = 3
+    LITERAL = 4
+    INTEGER = 5
+    HEXADECIMAL = 6
+    BINARY = 7
+    BOOLEAN = 8
+    STRING = 9
+    BLOCK_COMMENT = 10
+    STRUCTURED_COMMENT = 11
+
+    # Token kinds of the Lexer rules.
+    _rule_kinds = {
+        "t_NEWLINE": LINES,
+        "t_LINE_COMMENT": IGNORE,
+        "t_BLOCK_COMMENT": BLOCK_COMMENT,
+        "t_STRUCTURED_COMMENT": STRUCTURED_COMMENT,
+        "t_STRING_VAL": STRING,
+        "t_REAL_VAL": TOKEN,
+        "t_HEXADECIMAL_VAL": HEXADECIMAL,
+        "t_BINARY_VAL": BINARY,
+        "t_INTEGER_VAL": INTEGER,
+        "t_BOOLEAN_VAL": BOOLEAN,
+        "t_ID": ID,
+    }
+
+    # ASCII characters, the matches of the Lexer rules can start with.
+    _rule_first_chars = {
+        "t_NEWLINE": "\n",
+        "t_LINE_COMMENT": "/",
+        "t_BLOCK_COMMENT": "/",
+        "t_STRUCTURED_COMMENT": "<",
+        "t_STRING_VAL": "\"",
+        "t_REAL_VAL": "+-.0123456789",
+        "t_HEXADECIMAL_VAL": "0",
+        "t_BINARY_VAL": "0",
+        "t_INTEGER_VAL": "+-0123456789",
+        "t_BOOLEAN_VAL": "tf",
+        "t_ID": string.ascii_letters,
+    }
+
+    # Ignored characters and newlines - skipped without producing tokens.
+    _whitespace = Lexer.t_ignore + "\n"
+    # Binary input is not newline-translated on reading - carriage returns
+    # of "\r\n" line endings are skipped too.
+    _buffer_whitespace = _whitespace + "\r"
+
+    # Master regular expression and token kinds, built on first use.
+    _master = None
+
+    @classmethod
+    def _get_rules(cls):
+        """
+        Get the rules of the Lexer in the order of their definition, which
+        is the order PLY tries them in.
+
+        :return: A list of (rule name, regular expression) tuples.
+        """
+        rules = []
+        for name, item in vars(Lexer).items():
+            if name.startswith("t_") and isinstance(item, staticmethod):
+                function = item.__func__
+                if name != "t_error":
+                    rules.append((function.__code__.co_firstlineno, name,
+                                  function.__doc__))
+        rules.sort()
+        for _, name, _ in rules:
+            if name not in cls._rule_kinds:
+                raise LexerException(
+                    "Lexer rule '{}' is not supported.".format(name))
+        return [(name, regex) for _, name, regex in rules]
+
+    @classmethod
+    def _build_master(cls):
+        """
+        Build the master regular expression.
+
+        :return: A tuple of the compiled expression, the list of
+            (token kind, token type) tuples, indexed by group index, and
+            the compiled expression for binary input.
+        """
+        rules = cls._get_rules()
+        literals = "".join(Lexer.literals)
+        # Group the characters by the rules which can match at them.
+        classes = OrderedDict()
+        chars = set(literals)
+        for name, _ in rules:
+            chars.update(cls._rule_first_chars[name])
+        for char in sorted(chars - set(cls._whitespace)):
+            key = tuple(name for name, _ in rules
+                        if char in cls._rule_first_chars[name])
+            classes.setdefault(key, []).append(char)
+        kinds = [None]
+        branches = []
+
+        def add_group(regex, kind, token_type):
+            kinds.append((kind, token_type))
+            # Skip the groups of the regular expression.
+            kinds.extend([None] * re.compile(regex, re.VERBOSE).groups)
+            return "({})".format(regex)
+
+        # Try the larger character classes first.
+        for key, class_chars in sorted(classes.items(),
+                                       key=lambda item: -len(item[1])):
+            groups = [add_group(regex, cls._rule_kinds[name], name[2:])
+                      for name, regex in rules if name in key]
+            class_literals = [char for char in class_chars
+                              if char in literals]
+            if class_literals:
+                groups.append(add_group("[{}]".format(
+                    re.escape("".join(class_literals))), cls.LITERAL, None))
+            branches.append("(?=[{}])(?:{})".format(
+                re.escape("".join(class_chars)), "|".join(groups)))
+        # Other characters, e.g. non-ASCII digits, are tried with all rules.
+        branches.append("|".join(
+            add_group(regex, cls._rule_kinds[name], name[2:])
+            for name, regex in rules))
+        # Trailing whitespace.
+        branches.append(add_group(r"\Z", cls.IGNORE, None))
+        # Whitespace before a token is skipped by the same match.
+        regex = "|".join(branches)
+        pattern = re.compile("[{}]*(?:{})".format(
+            re.escape(cls._whitespace), regex), re.VERBOSE)
+        buffer_pattern = re.compile("[{}]*(?:{})".format(
+            re.escape(cls._buffer_whitespace), regex).encode("ascii"),
+            re.VERBOSE)
+        return pattern, kinds, buffer_pattern
+
+    # Memory-mapped and other binary input in an ASCII-compatible encoding
+    #   is lexed in place, decoding only the token values. Line endings are
+    #   "\n" or "\r\n" and token positions are byte offsets.
+    supports_buffers = True
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        master = FastLexer._master
+        if master is None:
+            master = self._build_master()
+            FastLexer._master = master
+        self.lexer = _FastScanner(*master)
+
+    def tokenize_stream(self, data):
+        """
+        Tokenize input data to a compact token stream.
+
+        :param data: Input text.
+        :return: TokenStream object.
         """
-        with open(fspec, "r") as f:
-            data = f.read()
-        return self.tokenize(data)
+        self.lexer.lineno = 1
+        return self.lexer.scan_stream(data)
@@ -4,12 +4,25 @@ Franca parser.
 
 from collections import OrderedDict
 from abc import ABCMeta
+import hashlib
+import os
+import threading
+import timeit
 import ply.yacc as yacc
 from pyfranca import franca_lexer
+from pyfranca import franca_stats
 from pyfranca import ast
 import re
 
 
+# Structured comment modes - parse the comments while parsing, keep the raw
+# text and parse it on first access (ast.LazyComments) or drop the comments.
+EAGER_COMMENTS = "eager"
+LAZY_COMMENTS = "lazy"
+NO_COMMENTS = "none"
+COMMENT_MODES = (EAGER_COMMENTS, LAZY_COMMENTS, NO_COMMENTS)
+
+
 class ArgumentGroup(object):
 
     __metaclass__ = ABCMeta
@@ -33,7 +46,7 @@ class ErrorArgumentGroup(ArgumentGroup):
 class ParserException(Exception):
 
     def __init__(self, message):
-        super(ParserException, self).__init__()
+        super(ParserException, self).__init__(message)
         self.message = message
 
     def __str__(self):
@@ -45,6 +58,15 @@ class Parser(object):
     Franca IDL PLY parser.
     """
 
+    # LALR tables shared by all parser instances in the process. The key is
+    #   the parser class and the grammar signature.
+    _tables = {}
+    _tables_lock = threading.Lock()
+
+    # Directory for persistent LALR table files or None to keep the tables
+    #   in memory only.
+    table_dir = None
+
     @staticmethod
     def _package_def(members):
         imports = []
@@ -62,40 +84,63 @@ class Parser(object):
                     raise ParserException("Unexpected package member type.")
         return imports, interfaces, typecollections
 
+    # Tags of structured comments.
+    comment_tags = ["@description", "@author", "@deprecated", "@source_uri",
+                    "@source_alias", "@see", "@experimental"]
+    # Pattern matching any of the tags.
+    _comment_tag_pattern = None
+
+    @classmethod
+    def register_comment_tag(cls, tag):
+        """
+        Register a custom structured comment tag, e.g. "@requirement".
+        The tag is recognized by all parsers of the class.
+
+        :param tag: Tag, starting with "@".
+        """
+        if not tag.startswith("@") or len(tag) < 2:
+            raise ValueError("Invalid structured comment tag '{}'.".format(
+                tag))
+        if tag not in cls.comment_tags:
+            cls.comment_tags = cls.comment_tags + [tag]
+            cls._comment_tag_pattern = None
+
+    @classmethod
+    def _get_comment_tag_pattern(cls):
+        pattern = cls.__dict__.get("_comment_tag_pattern")
+        if pattern is None:
+            # Prefer the longest of the tags starting at the same position.
+            tags = sorted(cls.comment_tags, key=len, reverse=True)
+            pattern = re.compile("|".join(re.escape(tag) for tag in tags))
+            cls._comment_tag_pattern = pattern
+        return pattern
+
     @staticmethod
-    def parse_structured_comment(comment):
+    def _comment_text(text):
+        # Remove optional spaces and ':'.
+        return text.strip().lstrip(":").strip()
+
+    @classmethod
+    def parse_structured_comment(cls, comment):
         """
         Parse a structured comment.
 
         :param comment: Structured comment of an Franca-IDL symbol to parse.
         :return: OrderedDict of all comments. Key is Franca-IDL keyword, e.g. @description, value conatins the text.
         """
-        keys = ['@description', '@author', '@deprecated', '@source_uri', '@source_alias', '@see', '@experimental']
-
-        strings = re.split('(' + '|'.join(keys) + ')', comment)
-
-        # remove optional spaces, ':' and finally empty strings
-        strings = [item.strip() for item in strings]
-        strings = [item.lstrip(':') for item in strings]
-        strings = [item.strip() for item in strings]
-        for item in strings:
-            if item == "":
-                strings.remove(item)
-
         comments = OrderedDict()
-        length = len(strings)
-        i = 0
-        while i < length:
-            key = strings[i]
-            if key in keys:
-                comments[key] = ""
-
-                if i < (length - 1):
-                    item = strings[i + 1]
-                    if item not in keys:
-                        comments[key] = item
-                        i += 1
-            i += 1
+        tag = None
+        start = 0
+        # The text of a tag extends to the next tag. Text before the first
+        #   tag is ignored.
+        for match in cls._get_comment_tag_pattern().finditer(comment):
+            if tag is not None:
+                comments[tag] = cls._comment_text(
+                    comment[start:match.start()])
+            tag = match.group()
+            start = match.end()
+        if tag is not None:
+            comments[tag] = cls._comment_text(comment[start:])
         return comments
 
     # noinspection PyIncorrectDocstring
@@ -116,7 +161,14 @@ class Parser(object):
         """
         structured_comment : STRUCTURED_COMMENT
         """
-        p[0] = Parser.parse_structured_comment(p[1])
+        owner = p.parser.owner
+        comment_mode = owner.comment_mode
+        if comment_mode == EAGER_COMMENTS:
+            p[0] = owner.parse_structured_comment(p[1])
+        elif comment_mode == LAZY_COMMENTS:
+            p[0] = ast.LazyComments(p[1], owner.__class__)
+        else:
+            p[0] = None
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -805,8 +857,7 @@ class Parser(object):
              | STRING
              | BYTEBUFFER
         """
-        type_class = getattr(ast, p[1])
-        p[0] = type_class()
+        p[0] = ast.PRIMITIVE_TYPES[p[1]]
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -826,8 +877,7 @@ class Parser(object):
              | STRING '[' ']'
              | BYTEBUFFER '[' ']'
         """
-        type_class = getattr(ast, p[1])
-        p[0] = ast.Array(name=None, element_type=type_class())
+        p[0] = ast.Array(name=None, element_type=ast.PRIMITIVE_TYPES[p[1]])
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -863,22 +913,191 @@ class Parser(object):
         else:
             raise ParserException("Reached unexpected end of file.")
 
-    def __init__(self, the_lexer=None, **kwargs):
+    def __init__(self, the_lexer=None, table_dir=None, cache=None,
+                 comment_mode=EAGER_COMMENTS, encoding=None, use_mmap=False,
+                 stats=None, profile=None, **kwargs):
         """
         Constructor.
 
-        :param lexer: a lexer object to use.
-        """
+        :param the_lexer: a lexer object to use. Defaults to a
+            franca_lexer.FastLexer with use_mmap and to a franca_lexer.Lexer
+            otherwise.
+        :param table_dir: Directory for persistent LALR table files. Overrides
+            Parser.table_dir .
+        :param cache: franca_cache.ASTCache object for parse_file() or None.
+        :param comment_mode: Structured comment mode - EAGER_COMMENTS,
+            LAZY_COMMENTS or NO_COMMENTS.
+        :param encoding: Encoding of the files, parsed by parse_file() - see
+            franca_lexer.open_input().
+        :param use_mmap: Lex the files, parsed by parse_file(), memory-mapped
+            instead of reading them into strings. Requires a lexer with
+            buffer support.
+        :param stats: franca_stats.ProcessorStats object to record the
+            lexing and parsing times and the token count in or None.
+        :param profile: franca_stats.ParserProfile object to record the
+            reductions and the semantic action times per grammar production
+            in or None.
+        :param kwargs: Arguments for ply.yacc.yacc() . The LALR table cache
+            is bypassed when any are given.
+        """
+        if comment_mode not in COMMENT_MODES:
+            raise ValueError("Invalid comment mode '{}'.".format(comment_mode))
         if not the_lexer:
-            the_lexer = franca_lexer.Lexer()
+            if use_mmap:
+                the_lexer = franca_lexer.FastLexer()
+            else:
+                the_lexer = franca_lexer.Lexer()
+        if use_mmap and not the_lexer.supports_buffers:
+            raise ValueError("{} does not support memory-mapped input.".format(
+                the_lexer.__class__.__name__))
         self._lexer = the_lexer
+        self.comment_mode = comment_mode
+        self.encoding = encoding
+        self.use_mmap = use_mmap
+        self.stats = stats
+        self.profile = profile
         self.tokens = self._lexer.tokens
-        # Disable debugging, by default.
-        if "debug" not in kwargs:
-            kwargs["debug"] = False
-        if "write_tables" not in kwargs:
-            kwargs["write_tables"] = False
-        self._parser = yacc.yacc(module=self, **kwargs)
+        self.cache = cache
+        self._signature = self.grammar_signature(self.tokens)
+        if table_dir is not None:
+            self.table_dir = table_dir
+        if kwargs:
+            # Disable debugging, by default.
+            if "debug" not in kwargs:
+                kwargs["debug"] = False
+            if "write_tables" not in kwargs:
+                kwargs["write_tables"] = False
+            self._parser = yacc.yacc(module=self, **kwargs)
+        else:
+            tables = self._get_tables()
+            self._parser = yacc.LRParser(tables, self.p_error)
+        # Productions reach the parser object through p.parser.owner .
+        self._parser.owner = self
+        if profile is not None:
+            # The productions of the shared tables are left unchanged.
+            self._parser.productions = self._profiled_productions(
+                self._parser.productions, profile)
+
+    @staticmethod
+    def _profiled_productions(productions, profile):
+        """
+        Copy PLY productions, recording the reductions and the times of
+        their semantic actions in a profile.
+
+        :param productions: A list of ply.yacc.MiniProduction objects.
+        :param profile: franca_stats.ParserProfile object.
+        :return: A list of ply.yacc.MiniProduction objects.
+        """
+        clock = timeit.default_timer
+
+        def profiled(action, counters):
+            def profiled_action(p):
+                start = clock()
+                try:
+                    action(p)
+                finally:
+                    counters[1] += 1
+                    counters[2] += clock() - start
+            return profiled_action
+
+        result = []
+        for production in productions:
+            if production.callable is not None:
+                counters = profile.production(production.str,
+                                              production.func)
+                copy = yacc.MiniProduction(
+                    production.str, production.name, production.len,
+                    production.func, production.file, production.line)
+                copy.callable = profiled(production.callable, counters)
+                production = copy
+            result.append(production)
+        return result
+
+    @classmethod
+    def grammar_signature(cls, tokens=None):
+        """
+        Calculate a signature of the grammar, used to key LALR tables.
+
+        :param tokens: Token list. Defaults to the tokens of the Franca lexer.
+        :return: Hexadecimal digest string.
+        """
+        if tokens is None:
+            tokens = franca_lexer.Lexer.tokens
+        digest = hashlib.sha1()
+        digest.update(yacc.__tabversion__.encode("utf-8"))
+        digest.update(" ".join(tokens).encode("utf-8"))
+        for name in sorted(dir(cls)):
+            if name.startswith("p_"):
+                doc = getattr(cls, name).__doc__ or ""
+                digest.update(name.encode("utf-8"))
+                digest.update(" ".join(doc.split()).encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def clear_table_cache(cls):
+        """
+        Drop the in-memory LALR tables. Table files are not affected.
+        """
+        with Parser._tables_lock:
+            Parser._tables.clear()
+
+    def _get_tables(self):
+        """
+        Get the LALR tables for the grammar, generating them on first use.
+
+        :return: ply.yacc.LRTable object.
+        """
+        signature = self._signature
+        key = (self.__class__, signature)
+        with Parser._tables_lock:
+            tables = Parser._tables.get(key)
+            if tables is None:
+                lr_parser = self._load_tables(signature)
+                tables = yacc.LRTable()
+                tables.lr_productions = lr_parser.productions
+                tables.lr_action = lr_parser.action
+                tables.lr_goto = lr_parser.goto
+                Parser._tables[key] = tables
+        return tables
+
+    def _load_tables(self, signature):
+        """
+        Build a PLY parser, using a persistent table file when table_dir is
+        set.
+
+        :param signature: Grammar signature.
+        :return: ply.yacc.LRParser object.
+        """
+        table_dir = self.table_dir
+        if table_dir and not os.path.isdir(table_dir):
+            try:
+                os.makedirs(table_dir)
+            except OSError:
+                table_dir = None
+        if not table_dir:
+            return yacc.yacc(module=self, debug=False, write_tables=False)
+        fspec = os.path.join(
+            table_dir, "franca_parsetab_{}.pickle".format(signature))
+        if os.path.exists(fspec):
+            try:
+                return yacc.yacc(module=self, debug=False, picklefile=fspec)
+            except Exception:
+                # Damaged table file - regenerate it.
+                pass
+        # Write the tables to a private file and rename it in place, so
+        #   that concurrent processes never see partial table files.
+        tmp_fspec = "{}.{}.{}.tmp".format(
+            fspec, os.getpid(), threading.current_thread().ident)
+        lr_parser = yacc.yacc(module=self, debug=False, picklefile=tmp_fspec)
+        try:
+            os.rename(tmp_fspec, fspec)
+        except OSError:
+            # The file is already in place on Windows.
+            try:
+                os.remove(tmp_fspec)
+            except OSError:
+                pass
+        return lr_parser
 
     def parse(self, fidl):
         """
@@ -887,9 +1106,57 @@ class Parser(object):
         :param fidl: Input text to parse.
         :return: AST representation of the input.
         """
-        package = self._parser.parse(fidl)
+        lexer = self._lexer.lexer
+        # Reset the lexer state left over from a previous input.
+        lexer.lineno = 1
+        if self.stats is None and self.profile is None:
+            package = self._parser.parse(fidl, lexer=lexer)
+        else:
+            package = self._parse_timed(fidl, lexer)
         return package
 
+    def _parse_timed(self, fidl, lexer):
+        """
+        Parse input text, recording the lexing and parsing times in the
+        statistics and the profile.
+
+        :param fidl: Input text to parse.
+        :param lexer: PLY lexer object.
+        :return: AST representation of the input.
+        """
+        stats = self.stats
+        clock = timeit.default_timer
+        cpu_time = franca_stats.cpu_time
+        # Wall time, CPU time and count of the tokens.
+        lexing = [0.0, 0.0, 0]
+
+        def get_token():
+            wall = clock()
+            cpu = cpu_time()
+            token = lexer.token()
+            lexing[0] += clock() - wall
+            lexing[1] += cpu_time() - cpu
+            if token is not None:
+                lexing[2] += 1
+            return token
+
+        start = clock()
+        lexer.input(fidl)
+        try:
+            if stats is None:
+                return self._parser.parse(lexer=lexer, tokenfunc=get_token)
+            with stats.timer("parse"):
+                try:
+                    return self._parser.parse(lexer=lexer,
+                                              tokenfunc=get_token)
+                finally:
+                    stats.add("lex", lexing[0], lexing[1])
+                    stats.count("tokens", lexing[2])
+        finally:
+            if self.profile is not None:
+                self.profile.add_parse(clock() - start, lexing[0],
+                                       lexing[2])
+
     def parse_file(self, fspec):
         """
         Parse input file
@@ -897,9 +1164,193 @@ class Parser(object):
         :param fspec: Specification of a fidl to parse.
         :return: AST representation of the input.
         """
-        with open(fspec, "r") as f:
-            fidl = f.read()
-        package = self.parse(fidl)
+        with self._open_file(fspec) as fidl:
+            if self.cache is None:
+                package = self._parse_input(fidl)
+            else:
+                key = self.cache_key(fidl)
+                package = self.cache.get(key)
+                if package is None:
+                    package = self._parse_input(fidl)
+                    self.cache.put(key, package)
         if package:
             package.files = [fspec]
         return package
+
+    def _open_file(self, fspec):
+        """
+        Open an input file for parse_file().
+
+        :param fspec: Input file specification.
+        :return: Context manager of the input text or buffer.
+        """
+        return franca_lexer.open_input(fspec, self.encoding, self.use_mmap)
+
+    def _parse_input(self, fidl):
+        """
+        Parse input text or a buffer of parse_file().
+
+        :param fidl: Input text or buffer.
+        :return: AST representation of the input.
+        """
+        if not self.use_mmap:
+            return self.parse(fidl)
+        lexer = self._lexer.lexer
+        lexer.encoding = self.encoding or "utf-8"
+        try:
+            return self.parse(fidl)
+        finally:
+            # Release the buffer, e.g. after a syntax error.
+            lexer.input("")
+
+    def cache_key(self, fidl):
+        """
+        Get the AST cache key of an input text.
+
+        :param fidl: Input text or buffer.
+        :return: Cache key string.
+        """
+        salt = [self._signature, self.comment_mode] + self.comment_tags
+        if not isinstance(fidl, type(u"")):
+            # Binary input is keyed by its encoding too.
+            salt.append(self.encoding or "utf-8")
+        return self.cache.key(fidl, " ".join(salt))
+
+    def file_cache_key(self, fspec):
+        """
+        Get the AST cache key of an input file, as used by parse_file().
+
+        :param fspec: Input file specification.
+        :return: Cache key string.
+        """
+        with self._open_file(fspec) as fidl:
+            return self.cache_key(fidl)
+
+    def scan_header(self, fspec):
+        """
+        Scan the package name and the imports of an input file without
+        parsing the definitions.
+
+        Lexing stops at the first definition. Franca requires imports to
+        precede the definitions - later imports are not scanned.
+
+        :param fspec: Input file specification.
+        :return: A tuple of the package name and a list of ast.Import
+            objects.
+        """
+        with self._open_file(fspec) as fidl:
+            lexer = self._lexer.lexer
+            if self.use_mmap:
+                lexer.encoding = self.encoding or "utf-8"
+            lexer.lineno = 1
+            lexer.input(fidl)
+            try:
+                return self._scan_header(lexer.token)
+            finally:
+                # Release the input.
+                lexer.input("")
+
+    @staticmethod
+    def _scan_header(get_token):
+        """
+        Scan the package name and the imports of a token sequence.
+
+        :param get_token: Function, returning the next token or None.
+        :return: A tuple of the package name and a list of ast.Import
+            objects.
+        """
+        token = get_token()
+        if token is not None and token.type == "STRUCTURED_COMMENT":
+            token = get_token()
+        Parser._expect(token, "PACKAGE")
+        name, token = Parser._scan_fqn(get_token, get_token())
+        imports = []
+        while token is not None and token.type == "IMPORT":
+            token = get_token()
+            if token is not None and token.type == "MODEL":
+                token = get_token()
+                Parser._expect(token, "STRING_VAL")
+                imports.append(ast.Import(file_name=token.value))
+            else:
+                namespace, token = Parser._scan_fqn(get_token, token)
+                Parser._expect(token, "FROM")
+                token = get_token()
+                Parser._expect(token, "STRING_VAL")
+                imports.append(ast.Import(file_name=token.value,
+                                          namespace=namespace))
+            token = get_token()
+        return name, imports
+
+    @staticmethod
+    def _scan_fqn(get_token, token):
+        """
+        Scan a fully qualified name - IDs, separated by dots, optionally
+        ending with a '*'.
+
+        :param get_token: Function, returning the next token or None.
+        :param token: The first token of the name.
+        :return: A tuple of the name and the token following it.
+        """
+        parts = []
+        while True:
+            if token is None or token.type not in ("ID", "*"):
+                Parser._expect(token, "ID")
+            parts.append(token.value)
+            is_wildcard = token.type == "*"
+            token = get_token()
+            if is_wildcard or token is None or token.type != ".":
+                return ".".join(parts), token
+            token = get_token()
+
+    @staticmethod
+    def _expect(token, token_type):
+        """
+        Check the type of a token, reporting errors like p_error().
+
+        :param token: Token or None at the end of the input.
+        :param token_type: Expected token type.
+        """
+        if token is None or token.type != token_type:
+            Parser.p_error(token)
+
+
+class ParserPool(object):
+    """
+    Thread-local pool of reusable parsers.
+    """
+
+    def __init__(self, parser_class=None, lexer_class=None, **kwargs):
+        """
+        Constructor.
+
+        :param parser_class: Parser class or subclass to create the parsers
+            of. Defaults to Parser.
+        :param lexer_class: Lexer class to create a lexer of for each
+            parser, or None for the default lexer of the parsers.
+        :param kwargs: Arguments for the parser constructor. Lexers are
+            stateful and cannot be shared between threads - pass a
+            lexer_class instead of the_lexer.
+        """
+        if "the_lexer" in kwargs:
+            raise ValueError(
+                "ParserPool cannot share a lexer between threads, "
+                "use lexer_class instead.")
+        self.parser_class = parser_class or Parser
+        self.lexer_class = lexer_class
+        self.kwargs = kwargs
+        self._local = threading.local()
+
+    def get(self):
+        """
+        Get the parser of the calling thread, creating it on first use.
+
+        :return: Parser object.
+        """
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            kwargs = self.kwargs
+            if self.lexer_class is not None:
+                kwargs = dict(kwargs, the_lexer=self.lexer_class())
+            parser = self.parser_class(**kwargs)
+            self._local.parser = parser
+        return parser
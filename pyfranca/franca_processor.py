@@ -1,32 +1,371 @@
 
+import hashlib
 import os
-from collections import OrderedDict
-from pyfranca import franca_parser, ast
+import pickle
+import time
+import timeit
+import warnings
+from collections import OrderedDict, deque
+from pyfranca import franca_lexer, franca_parser, franca_index, franca_graph, \
+    ast
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
 
 
 class ProcessorException(Exception):
 
     def __init__(self, message):
-        super(ProcessorException, self).__init__()
+        super(ProcessorException, self).__init__(message)
         self.message = message
 
     def __str__(self):
         return self.message
 
 
+def _warn_references(references):
+    """
+    Warn about the deprecated package references of the import methods.
+
+    :param references: A list of package references or None.
+    """
+    if references is not None:
+        warnings.warn("The references argument is ignored and deprecated.",
+                      DeprecationWarning, stacklevel=3)
+
+
+# Parser of a worker process and its configuration.
+_worker_parser = None
+_worker_config = None
+
+
+def _parse_file_worker(fspec, config):
+    """
+    Parse an FIDL file in a worker process.
+
+    :param fspec: File specification.
+    :param config: Parser configuration - see Processor._worker_config().
+    :return: The parsed ast.Package, pickled with the highest protocol.
+    """
+    global _worker_parser, _worker_config
+    if _worker_parser is None or _worker_config != config:
+        parser_class, lexer_class, comment_tags, kwargs = config
+        # Tags, registered after the worker was started.
+        for tag in comment_tags:
+            parser_class.register_comment_tag(tag)
+        kwargs = dict(kwargs)
+        if lexer_class is not None:
+            kwargs["the_lexer"] = lexer_class()
+        _worker_parser = parser_class(**kwargs)
+        _worker_config = config
+    package = _worker_parser.parse_file(fspec)
+    return pickle.dumps(package, pickle.HIGHEST_PROTOCOL)
+
+
+class _ReferenceVisitor(ast.NodeVisitor):
+    """
+    Visits the nodes of a namespace, which can contain type references.
+    """
+
+    def __init__(self):
+        # Namespace being visited.
+        self.namespace = None
+        self._table = self.get_dispatch_table()
+
+    def visit_Namespace(self, namespace):
+        self.namespace = namespace
+        table = self._table
+        for field in namespace._member_fields:
+            for name in getattr(namespace, field).values():
+                table[name.__class__](name)
+
+    def visit_PrimitiveType(self, name):
+        pass
+
+    def visit_Typedef(self, name):
+        self._table[name.type.__class__](name.type)
+
+    visit_Array = visit_Constant = visit_Attribute = visit_Typedef
+
+    def visit_Map(self, name):
+        self._table[name.key_type.__class__](name.key_type)
+        self._table[name.value_type.__class__](name.value_type)
+
+    def visit_Enumeration(self, name):
+        pass
+
+    def visit_Struct(self, name):
+        table = self._table
+        for field in name.fields.values():
+            table[field.type.__class__](field.type)
+
+    def visit_Reference(self, name):
+        pass
+
+    def visit_Method(self, name):
+        table = self._table
+        for arg in name.in_args.values():
+            table[arg.type.__class__](arg.type)
+        for arg in name.out_args.values():
+            table[arg.type.__class__](arg.type)
+        if isinstance(name.errors, ast.Reference):
+            self.visit_Reference(name.errors)
+
+    def visit_Broadcast(self, name):
+        table = self._table
+        for arg in name.out_args.values():
+            table[arg.type.__class__](arg.type)
+
+
+class _TypeLinker(_ReferenceVisitor):
+    """
+    Resolves the type references in a namespace.
+    """
+
+    def __init__(self, processor):
+        super(_TypeLinker, self).__init__()
+        self.processor = processor
+
+    def visit_Interface(self, namespace):
+        self.visit_Namespace(namespace)
+        if namespace.extends:
+            namespace.reference = self.processor._resolve_namespace(
+                namespace.package, namespace.extends)
+            if not isinstance(namespace.reference, ast.Interface):
+                raise ProcessorException(
+                    "Invalid interface reference '{}'.".format(
+                        namespace.extends))
+
+    def visit_Enumeration(self, name):
+        if name.extends:
+            name.reference = self.processor._resolve(self.namespace,
+                                                     name.extends)
+            if not isinstance(name.reference, ast.Enumeration):
+                raise ProcessorException(
+                    "Invalid enumeration reference '{}'.".format(
+                        name.extends))
+
+    def visit_Struct(self, name):
+        super(_TypeLinker, self).visit_Struct(name)
+        if name.extends:
+            name.reference = self.processor._resolve(self.namespace,
+                                                     name.extends)
+            if not isinstance(name.reference, ast.Struct):
+                raise ProcessorException(
+                    "Invalid struct reference '{}'.".format(name.extends))
+
+    def visit_Reference(self, name):
+        if not name.namespace:
+            name.namespace = self.namespace
+        if not name.reference:
+            name.reference = self.processor._resolve(self.namespace, name.name)
+
+    def visit_Method(self, name):
+        super(_TypeLinker, self).visit_Method(name)
+        # Errors can be a reference to an enumeration
+        if isinstance(name.errors, ast.Reference) and \
+                not isinstance(name.errors.reference, ast.Enumeration):
+            raise ProcessorException(
+                "Invalid error reference '{}'.".format(name.errors.name))
+
+
+class _ReferenceResetter(_ReferenceVisitor):
+    """
+    Clears the resolved references in a namespace.
+    """
+
+    def visit_Interface(self, namespace):
+        namespace.reference = None
+        self.visit_Namespace(namespace)
+
+    def visit_Enumeration(self, name):
+        name.reference = None
+
+    def visit_Struct(self, name):
+        name.reference = None
+        super(_ReferenceResetter, self).visit_Struct(name)
+
+    def visit_Reference(self, name):
+        name.reference = None
+
+
+class ProcessorHooks(object):
+    """
+    Base class of Processor hooks, e.g. for tracing, telemetry or progress
+    reporting. The methods do nothing - override the ones of interest.
+
+    Timestamps are in seconds since the epoch, as by time.time() , and
+    durations are in seconds.
+    """
+
+    def file_resolved(self, fspec, resolved_fspec, timestamp):
+        """
+        A model file was located.
+
+        :param fspec: File specification, e.g. of an import.
+        :param resolved_fspec: Specification of the existing file.
+        :param timestamp: Time of the event.
+        """
+        pass
+
+    def parse_started(self, fspec, size, timestamp):
+        """
+        Parsing of a file started. Not called for files parsed in worker
+        processes.
+
+        :param fspec: File specification.
+        :param size: File size in bytes.
+        :param timestamp: Time of the event.
+        """
+        pass
+
+    def parse_finished(self, fspec, package, size, duration, timestamp,
+                       error=None):
+        """
+        Parsing of a file finished.
+
+        :param fspec: File specification.
+        :param package: The parsed ast.Package or None on errors.
+        :param size: File size in bytes.
+        :param duration: Parsing time, including AST cache lookups.
+        :param timestamp: Time of the event.
+        :param error: The raised exception or None.
+        """
+        pass
+
+    def file_loaded(self, fspec, package, timestamp):
+        """
+        A parsed file was registered in the processor.
+
+        :param fspec: File specification.
+        :param package: ast.Package object of the file.
+        :param timestamp: Time of the event.
+        """
+        pass
+
+    def package_merged(self, fspec, package, timestamp):
+        """
+        The package of a file was merged into an already imported package
+        with the same name.
+
+        :param fspec: File specification.
+        :param package: The ast.Package object, merged into.
+        :param timestamp: Time of the event.
+        """
+        pass
+
+    def reference_resolved(self, namespace, name, resolved, timestamp):
+        """
+        A type reference was resolved.
+
+        :param namespace: Context ast.Namespace object.
+        :param name: The referenced FQN or ID.
+        :param resolved: The referenced ast.Type object.
+        :param timestamp: Time of the event.
+        """
+        pass
+
+    def namespace_linked(self, namespace, duration, timestamp):
+        """
+        The type references of a namespace were linked.
+
+        :param namespace: ast.Namespace object.
+        :param duration: Linking time.
+        :param timestamp: Time of the event.
+        """
+        pass
+
+
 class Processor(object):
     """
     Franca IDL processor.
     """
 
-    def __init__(self):
+    def __init__(self, parser_pool=None, cache=None,
+                 comment_mode=franca_parser.EAGER_COMMENTS, stats=None,
+                 hooks=None):
         """
         Constructor.
+
+        :param parser_pool: franca_parser.ParserPool object to get parsers
+            from or None to use a single parser owned by the processor.
+        :param cache: franca_cache.ASTCache object to load parsed files from
+            or None. Not used with a parser pool - pass the cache to the pool.
+        :param comment_mode: Structured comment mode of the parser, e.g.
+            franca_parser.NO_COMMENTS for validation only. Not used with a
+            parser pool.
+        :param stats: franca_stats.ProcessorStats object to collect the
+            per-stage times and counters in or None. Lexing is timed as
+            part of parsing with a parser pool.
+        :param hooks: ProcessorHooks object to notify of the processing
+            events or None.
         """
         # Default package paths.
         self.package_paths = []
         self.files = {}
         self.packages = {}
+        self.parser_pool = parser_pool
+        self.cache = cache
+        self.comment_mode = comment_mode
+        self.stats = stats
+        self.hooks = hooks
+        self._parser = None
+        self._index = franca_index.SymbolIndex()
+        # Import dependencies between the loaded files.
+        self.graph = franca_graph.DependencyGraph()
+        # Namespaces with updated type references.
+        self._linked = set()
+        self._linker = _TypeLinker(self)
+        self._resetter = _ReferenceResetter()
+        # Files parsed ahead of loading, e.g. by worker processes.
+        self._preparsed = {}
+        # Per-file contributions to the packages and file stamps.
+        self._file_namespaces = {}
+        self._file_imports = {}
+        self._file_stamps = {}
+
+    def _get_parser(self):
+        """
+        Get a parser, reused across imported files.
+
+        :return: franca_parser.Parser object.
+        """
+        if self.parser_pool is not None:
+            return self.parser_pool.get()
+        if self._parser is None:
+            if self.stats is None:
+                self._parser = franca_parser.Parser(
+                    cache=self.cache, comment_mode=self.comment_mode)
+            else:
+                with self.stats.timer("tables"):
+                    self._parser = franca_parser.Parser(
+                        cache=self.cache, comment_mode=self.comment_mode,
+                        stats=self.stats)
+        return self._parser
+
+    def _worker_config(self):
+        """
+        Get the configuration of the parsers of the worker processes,
+        matching the one of _get_parser(). Caching, statistics and profiles
+        stay with this process.
+
+        :return: A (parser class, lexer class or None, comment tags, parser
+            arguments) tuple.
+        """
+        if self.parser_pool is not None:
+            parser_class = self.parser_pool.parser_class
+            lexer_class = self.parser_pool.lexer_class
+            kwargs = dict(self.parser_pool.kwargs)
+        else:
+            parser_class = franca_parser.Parser
+            lexer_class = None
+            kwargs = {"comment_mode": self.comment_mode}
+        for name in ("cache", "stats", "profile"):
+            kwargs.pop(name, None)
+        return (parser_class, lexer_class, list(parser_class.comment_tags),
+                kwargs)
 
     @staticmethod
     def basename(namespace):
@@ -70,7 +409,9 @@ class Processor(object):
     @staticmethod
     def resolve(namespace, fqn):
         """
-        Resolve type references.
+        Resolve type references by walking the namespaces of the package
+        and its imports. A processor resolves the references of the
+        imported files through its symbol index instead - see _resolve().
 
         :param namespace: context ast.Namespace object.
         :param fqn: FQN or ID string.
@@ -103,27 +444,75 @@ class Processor(object):
                     if name in namespace.package.typecollections[ns]:
                         return namespace.package.typecollections[ns][name]
             else:
-                # Look in typecollections of packages imported in the
-                #   type's package using FQNs.
+                # Look in namespaces of packages imported in the type's
+                #   package using FQNs.
                 for package_import in namespace.package.imports:
                     if package_import.namespace == "{}.{}.*".format(pkg, ns):
-                        for typecollection in package_import.\
-                                package_reference.typecollections.values():
-                            if typecollection.name == ns and \
-                                    name in typecollection:
-                                return typecollection[name]
-                        for interface in package_import. \
-                                package_reference.interfaces.values():
-                            if name in interface:
-                                return interface[name]
+                        package = package_import.package_reference
+                        if ns in package and name in package[ns]:
+                            return package[ns][name]
         # Give up
         raise ProcessorException(
             "Unresolved reference '{}'.".format(fqn))
 
+    def _resolve(self, namespace, fqn):
+        """
+        Resolve type references through the symbol index, with the
+        precedence of resolve().
+
+        :param namespace: context ast.Namespace object.
+        :param fqn: FQN or ID string.
+        :return: Dereferenced ast.Type object.
+        """
+        if not isinstance(namespace, ast.Namespace) or \
+                not isinstance(fqn, str):
+            raise ValueError("Unexpected input.")
+        pkg, ns, name = Processor.split_fqn(fqn)
+        resolved = None
+        lookups = 1
+        if pkg is None:
+            # This is an ID
+            # Look in the type's namespace
+            if name in namespace:
+                resolved = namespace[name]
+            else:
+                # Look in type collections in the type's package and in
+                #   namespaces imported in the type's package
+                lookups += 1
+                resolved = self._index.scope(namespace.package).types.get(
+                    name)
+        else:
+            # This is an FQN
+            package = namespace.package
+            if pkg == package.name:
+                # Check in the current package
+                typecollection = package.typecollections.get(ns)
+                if typecollection is not None and name in typecollection:
+                    resolved = typecollection[name]
+            elif "{}.{}".format(pkg, ns) in \
+                    self._index.scope(package).imports:
+                # Look in namespaces of packages imported in the type's
+                #   package using FQNs.
+                lookups += 1
+                resolved = self._index.types.get(fqn)
+        if self.stats is not None:
+            self.stats.count("resolve_calls")
+            self.stats.count("resolve_lookups", lookups)
+        if resolved is None:
+            # Give up
+            raise ProcessorException(
+                "Unresolved reference '{}'.".format(fqn))
+        if self.hooks is not None:
+            self.hooks.reference_resolved(namespace, fqn, resolved,
+                                          time.time())
+        return resolved
+
     @staticmethod
     def resolve_namespace(package, fqn):
         """
-        Resolve namespace references.
+        Resolve namespace references by walking the package and its model
+        imports. A processor resolves the references of the imported files
+        through its symbol index instead - see _resolve_namespace().
 
         :param package: context ast.Package object.
         :param fqn: FQN or ID string.
@@ -131,150 +520,61 @@ class Processor(object):
         """
         if not isinstance(package, ast.Package) or not isinstance(fqn, str):
             raise ValueError("Unexpected input.")
-        if fqn.count(".") > 0:
-            pkg, name = fqn.rsplit(".", 2)
-        else:
-            pkg, name = (None, fqn)
-        if pkg is None:
-            # This is an ID
+        pkg = Processor.packagename(fqn)
+        name = Processor.basename(fqn)
+        if pkg is None or pkg == package.name:
             # Look for other namespaces in the package
             if name in package:
                 return package[name]
+        if pkg != package.name:
             # Look in model imports
             for package_import in package.imports:
                 if not package_import.namespace:
                     if name in package_import.package_reference:
                         return package_import.package_reference[name]
-        else:
-            # This is an FQN
-            if pkg == package.name:
-                # Check in the current package
-                if name in package:
-                    return package[name]
-            else:
-                # Look in model imports
-                for package_import in package.imports:
-                    if not package_import.namespace:
-                        if name in package_import.package_reference:
-                            return package_import.package_reference[name]
         # Give up
         raise ProcessorException(
             "Unresolved namespace reference '{}'.".format(fqn))
 
-    def _update_complextype_references(self, name):
+    def _resolve_namespace(self, package, fqn):
         """
-        Update type references in a complex type.
+        Resolve namespace references through the symbol index, with the
+        precedence of resolve_namespace().
 
-        :param name: ast.ComplexType object.
+        :param package: context ast.Package object.
+        :param fqn: FQN or ID string.
+        :return: Dereferenced ast.Namespace object.
         """
-        if isinstance(name, ast.Enumeration):
-            if name.extends:
-                name.reference = self.resolve(name.namespace, name.extends)
-                if not isinstance(name.reference, ast.Enumeration):
-                    raise ProcessorException(
-                        "Invalid enumeration reference '{}'.".format(
-                            name.extends))
-        elif isinstance(name, ast.Struct):
-            for field in name.fields.values():
-                self._update_type_references(name.namespace, field.type)
-            if name.extends:
-                name.reference = self.resolve(name.namespace, name.extends)
-                if not isinstance(name.reference, ast.Struct):
-                    raise ProcessorException(
-                        "Invalid struct reference '{}'.".format(
-                            name.extends))
-        elif isinstance(name, ast.Array):
-            self._update_type_references(name.namespace, name.type)
-        elif isinstance(name, ast.Map):
-            self._update_type_references(name.namespace, name.key_type)
-            self._update_type_references(name.namespace, name.value_type)
-        elif isinstance(name, ast.Constant):
-            self._update_type_references(name.namespace, name.type)
-        else:
-            assert False
-
-    def _update_type_references(self, namespace, name):
-        """
-        Update type references in a type.
-
-        :param namespace: ast.Namespace context.
-        :param name: ast.Type object.
-        """
-        if isinstance(name, ast.Typedef):
-            self._update_type_references(name.namespace, name.type)
-        elif isinstance(name, ast.PrimitiveType):
-            pass
-        elif isinstance(name, ast.ComplexType):
-            self._update_complextype_references(name)
-        elif isinstance(name, ast.Reference):
-            if not name.namespace:
-                name.namespace = namespace
-            if not name.reference:
-                resolved_name = self.resolve(namespace, name.name)
-                name.reference = resolved_name
-        elif isinstance(name, ast.Attribute):
-            self._update_type_references(name.namespace, name.type)
-        elif isinstance(name, ast.Method):
-            for arg in name.in_args.values():
-                self._update_type_references(name.namespace, arg.type)
-            for arg in name.out_args.values():
-                self._update_type_references(name.namespace, arg.type)
-            if isinstance(name.errors, OrderedDict):
-                pass
-            elif isinstance(name.errors, ast.Reference):
-                # Errors can be a reference to an enumeration
-                self._update_type_references(name.namespace, name.errors)
-                if not isinstance(name.errors.reference, ast.Enumeration):
-                    raise ProcessorException(
-                        "Invalid error reference '{}'.".format(
-                            name.errors.name))
-            else:
-                assert False
-        elif isinstance(name, ast.Broadcast):
-            for arg in name.out_args.values():
-                self._update_type_references(name.namespace, arg.type)
-        else:
-            assert False
+        if not isinstance(package, ast.Package) or not isinstance(fqn, str):
+            raise ValueError("Unexpected input.")
+        pkg = Processor.packagename(fqn)
+        name = Processor.basename(fqn)
+        if pkg is None or pkg == package.name:
+            # Look for other namespaces in the package
+            if name in package:
+                return package[name]
+        if pkg != package.name:
+            # Look in model imports
+            resolved = self._index.scope(package).namespaces.get(name)
+            if resolved is not None:
+                return resolved
+        # Give up
+        raise ProcessorException(
+            "Unresolved namespace reference '{}'.".format(fqn))
 
-    def _update_namespace_references(self, namespace):
+    def _link_namespace(self, namespace):
         """
         Update type references in a namespace.
 
         :param namespace: ast.Namespace object.
         """
-        for name in namespace.typedefs.values():
-            self._update_type_references(namespace, name)
-        for name in namespace.enumerations.values():
-            self._update_type_references(namespace, name)
-        for name in namespace.structs.values():
-            self._update_type_references(namespace, name)
-        for name in namespace.arrays.values():
-            self._update_type_references(namespace, name)
-        for name in namespace.maps.values():
-            self._update_type_references(namespace, name)
-        for name in namespace.constants.values():
-            self._update_type_references(namespace, name)
-
-    def _update_interface_references(self, namespace):
-        """
-        Update type references in an interface.
-
-        :param namespace: ast.Interface object.
-        """
-        self._update_namespace_references(namespace)
-        for name in namespace.attributes.values():
-            self._update_type_references(namespace, name)
-        for name in namespace.methods.values():
-            self._update_type_references(namespace, name)
-        for name in namespace.broadcasts.values():
-            self._update_type_references(namespace, name)
-        if namespace.extends:
-            namespace.reference = self.resolve_namespace(
-                namespace.package, namespace.extends)
-            if not isinstance(namespace.reference, ast.Interface):
-                raise ProcessorException(
-                    "Invalid interface reference '{}'.".format(
-                        namespace.extends))
+        if self.hooks is None:
+            self._linker.visit(namespace)
+        else:
+            start = timeit.default_timer()
+            self._linker.visit(namespace)
+            self.hooks.namespace_linked(
+                namespace, timeit.default_timer() - start, time.time())
 
     def _update_package_references(self, package):
         """
@@ -304,50 +604,370 @@ class Processor(object):
             else:
                 # Model import
                 assert package_import.namespace_reference is None
-        for namespace in package.typecollections:
-            self._update_namespace_references(
-                package.typecollections[namespace])
-        for namespace in package.interfaces:
-            self._update_interface_references(
-                package.interfaces[namespace])
+        # The visible names depend on the import references.
+        self._index.invalidate(package)
+        for namespace in package.typecollections.values():
+            if namespace not in self._linked:
+                self._link_namespace(namespace)
+                self._linked.add(namespace)
+        for namespace in package.interfaces.values():
+            if namespace not in self._linked:
+                self._link_namespace(namespace)
+                self._linked.add(namespace)
 
-    def import_package(self, fspec, package, references=None):
+    def _unlink_package(self, package):
         """
-        Import an ast.Package into the processor.
+        Clear the resolved references in a package, so that it can be
+        linked again.
+
+        :param package: ast.Package object.
+        """
+        for package_import in package.imports:
+            package_import.namespace_reference = None
+        namespaces = list(package.typecollections.values()) + \
+            list(package.interfaces.values())
+        for namespace in namespaces:
+            self._resetter.visit(namespace)
+            self._linked.discard(namespace)
+        self._index.invalidate(package)
+
+    def _remove_file(self, fspec):
+        """
+        Drop the contributions of a file from the processor.
+
+        :param fspec: File specification of a loaded file.
+        """
+        package = self.files.pop(fspec)
+        namespaces = self._file_namespaces.pop(fspec)
+        imports = set(id(item) for item in self._file_imports.pop(fspec))
+        self._file_stamps.pop(fspec, None)
+        package.files.remove(fspec)
+        package.imports[:] = [item for item in package.imports
+                              if id(item) not in imports]
+        for namespace in namespaces:
+            self._index.remove_namespace(package.name, namespace)
+            self._linked.discard(namespace)
+            if package.typecollections.get(namespace.name) is namespace:
+                del package.typecollections[namespace.name]
+            if package.interfaces.get(namespace.name) is namespace:
+                del package.interfaces[namespace.name]
+        self.graph.remove_node(fspec)
+        if not package.files:
+            del self.packages[package.name]
+
+    def package_graph(self):
+        """
+        Get the import dependencies between the loaded packages.
+
+        :return: franca_graph.DependencyGraph object with package names as
+            nodes.
+        """
+        return self.graph.grouped(lambda fspec: self.files[fspec].name)
+
+    def _find_file(self, fspec, package_path=None):
+        """
+        Locate a model file.
+
+        :param fspec: File specification.
+        :param package_path: Additional model path to search for imports.
+        :return: File specification of an existing file.
+        """
+        resolved_fspec = self._search_file(fspec, package_path)
+        if self.hooks is not None:
+            self.hooks.file_resolved(fspec, resolved_fspec, time.time())
+        return resolved_fspec
+
+    def _search_file(self, fspec, package_path):
+        """
+        Search for a model file. See _find_file().
+        """
+        if os.path.exists(fspec):
+            return fspec
+        if os.path.isabs(fspec):
+            # Absolute specification
+            raise ProcessorException(
+                "Model '{}' not found.".format(fspec))
+        # Relative specification.
+        package_paths = self.package_paths[:]
+        if package_path:
+            package_paths.insert(0, package_path)
+        # Check in the package path list.
+        for path in package_paths:
+            temp_fspec = os.path.join(path, fspec)
+            if os.path.exists(temp_fspec):
+                return temp_fspec
+        raise ProcessorException(
+            "Model '{}' not found.".format(fspec))
+
+    def _register_package(self, fspec, package, queue):
+        """
+        Register a parsed package in the processor, merging it into an
+        already imported package with the same name.
 
         :param fspec: File specification of the package.
         :param package: ast.Package object.
-        :param references: A list of package references.
+        :param queue: A deque of file specifications with unprocessed
+            imports.
         """
-        if not isinstance(package, ast.Package):
-            ValueError("Expected ast.Package as input.")
-        if not references:
-            references = []
-        # Check whether package is already imported
+        # Check whether the file is already imported
+        if package.name in self.packages and \
+                fspec in self.packages[package.name].files:
+            return
         if package.name in self.packages:
-            if fspec not in self.packages[package.name].files:
-                # Merge the new package into the already existing one.
+            # Merge the new package into the already existing one.
+            if self.stats is None:
                 self.packages[package.name] += package
-                # Register the package file in the processor.
-                self.files[fspec] = self.packages[package.name]
-                package = self.packages[package.name]
             else:
-                return
+                with self.stats.timer("merge", fspec):
+                    self.packages[package.name] += package
+            if self.hooks is not None:
+                self.hooks.package_merged(fspec, self.packages[package.name],
+                                          time.time())
         else:
             # Register the package in the processor.
             self.packages[package.name] = package
-            # Register the package file in the processor.
-            self.files[fspec] = package
-        # Process package imports
-        fspec_path = os.path.abspath(fspec)
-        fspec_dir = os.path.dirname(fspec_path)
-        for package_import in package.imports:
-            imported_package = self.import_file(
-                package_import.file, references + [package.name], fspec_dir)
-            # Update import reference
-            package_import.package_reference = imported_package
-        # Update type references
-        self._update_package_references(package)
+        # Record the file contributions to the package.
+        self._file_namespaces[fspec] = \
+            list(package.typecollections.values()) + \
+            list(package.interfaces.values())
+        self._file_imports[fspec] = list(package.imports)
+        self._index.add_package(package)
+        # Register the package file in the processor.
+        self.files[fspec] = self.packages[package.name]
+        self.graph.add_node(fspec)
+        queue.append(fspec)
+        if self.stats is not None:
+            self.stats.count("files")
+        if self.hooks is not None:
+            self.hooks.file_loaded(fspec, self.files[fspec], time.time())
+
+    @staticmethod
+    def _file_stamp(fspec):
+        """
+        Get the modification stamp of a file.
+
+        :param fspec: File specification.
+        :return: A (mtime, size, content hash) tuple or None if the file
+            does not exist. The content hash is None - it is computed by
+            reload() when the file is changed.
+        """
+        try:
+            stat = os.stat(fspec)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size, None
+
+    @staticmethod
+    def _file_digest(fspec):
+        """
+        Get the content hash of a file.
+
+        :param fspec: File specification.
+        :return: A hexadecimal SHA1 digest or None if the file cannot be
+            read.
+        """
+        try:
+            with open(fspec, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except IOError:
+            return None
+
+    def _load_file(self, fspec, package_path, queue):
+        """
+        Locate, parse and register a FIDL file unless already loaded.
+
+        :param fspec: File specification.
+        :param package_path: Additional model path to search for imports.
+        :param queue: A deque of file specifications with unprocessed
+            imports.
+        :return: A tuple of the file specification of the loaded file and
+            the parsed ast.Package.
+        """
+        if fspec in self.files:
+            # File already loaded.
+            return fspec, self.files[fspec]
+        if self.stats is not None:
+            return self._load_file_timed(fspec, package_path, queue)
+        fspec = self._find_file(fspec, package_path)
+        if fspec in self.files:
+            return fspec, self.files[fspec]
+        # Parse the file.
+        package = self._preparsed.pop(fspec, None)
+        if package is None:
+            package = self._parse_file(fspec)
+        self._register_package(fspec, package, queue)
+        self._file_stamps[fspec] = self._file_stamp(fspec)
+        return fspec, package
+
+    def _parse_file(self, fspec):
+        """
+        Parse a FIDL file, notifying the hooks.
+
+        :param fspec: File specification.
+        :return: The parsed ast.Package.
+        """
+        parser = self._get_parser()
+        hooks = self.hooks
+        if hooks is None:
+            return parser.parse_file(fspec)
+        size = os.path.getsize(fspec)
+        hooks.parse_started(fspec, size, time.time())
+        start = timeit.default_timer()
+        try:
+            package = parser.parse_file(fspec)
+        except Exception as e:
+            hooks.parse_finished(fspec, None, size,
+                                 timeit.default_timer() - start, time.time(),
+                                 e)
+            raise
+        hooks.parse_finished(fspec, package, size,
+                             timeit.default_timer() - start, time.time())
+        return package
+
+    def _load_file_timed(self, fspec, package_path, queue):
+        """
+        Locate, parse and register a FIDL file, recording the stage times
+        in the processor statistics. See _load_file().
+        """
+        stats = self.stats
+        # The file is known after the search only.
+        with stats.timer("find"):
+            fspec = self._find_file(fspec, package_path)
+        if fspec in self.files:
+            return fspec, self.files[fspec]
+        package = self._preparsed.pop(fspec, None)
+        if package is None:
+            # Build the parser outside of the load stage.
+            self._get_parser()
+            with stats.timer("load", fspec):
+                package = self._parse_file(fspec)
+        stats.count("nodes", sum(1 for _ in ast.walk(package)))
+        with stats.timer("register", fspec):
+            self._register_package(fspec, package, queue)
+            self._file_stamps[fspec] = self._file_stamp(fspec)
+        return fspec, package
+
+    def _parse_files_parallel(self, fspecs, package_path, jobs):
+        """
+        Parse the files, reachable from the given ones, in worker processes.
+
+        The import closure is planned from the file headers - see
+        franca_parser.Parser.scan_header() - and parsed at once. Files
+        that cannot be located or scanned are left to the regular loading
+        to report, as are imports that follow definitions.
+
+        :param fspecs: A list of file specifications.
+        :param package_path: Additional model path to search for imports.
+        :param jobs: Number of worker processes.
+        """
+        if ProcessPoolExecutor is None:
+            raise ProcessorException(
+                "Parallel parsing requires concurrent.futures.")
+        # Build the parser tables before forking the workers.
+        parser = self._get_parser()
+        pending = OrderedDict()
+        queue = deque((fspec, package_path) for fspec in fspecs)
+        while queue:
+            fspec, path = queue.popleft()
+            if fspec in self.files:
+                continue
+            try:
+                # The hooks are notified when the file is loaded.
+                fspec = self._search_file(fspec, path)
+            except ProcessorException:
+                continue
+            if fspec in self.files or fspec in self._preparsed or \
+                    fspec in pending:
+                continue
+            pending[fspec] = None
+            try:
+                _, imports = parser.scan_header(fspec)
+            except (franca_parser.ParserException,
+                    franca_lexer.LexerException):
+                continue
+            fspec_dir = os.path.dirname(os.path.abspath(fspec))
+            for package_import in imports:
+                queue.append((package_import.file, fspec_dir))
+        parsed = []
+        if parser.cache is not None:
+            # Look up the files in the cache and parse only misses.
+            for fspec in list(pending):
+                key = parser.file_cache_key(fspec)
+                package = parser.cache.get(key)
+                if package is None:
+                    pending[fspec] = key
+                else:
+                    package.files = [fspec]
+                    parsed.append(package)
+                    del pending[fspec]
+        if pending:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = executor.map(
+                    _parse_file_worker, pending,
+                    [self._worker_config()] * len(pending))
+                for fspec, data in zip(pending, results):
+                    package = pickle.loads(data)
+                    if pending[fspec] is not None:
+                        parser.cache.put(pending[fspec], package)
+                    parsed.append(package)
+        for package in parsed:
+            self._preparsed[package.files[0]] = package
+
+    def _load_imports(self, queue):
+        """
+        Discover, parse and register all files, reachable from the queued
+        files.
+
+        :param queue: A deque of file specifications with unprocessed
+            imports.
+        :return: A list of the touched ast.Package objects.
+        """
+        touched = OrderedDict()
+        while queue:
+            fspec = queue.popleft()
+            package = self.files[fspec]
+            touched[package.name] = package
+            # Process package imports
+            fspec_dir = os.path.dirname(os.path.abspath(fspec))
+            for package_import in self._file_imports[fspec]:
+                imported_fspec, _ = self._load_file(
+                    package_import.file, fspec_dir, queue)
+                # Update import reference
+                package_import.package_reference = self.files[imported_fspec]
+                self.graph.add_edge(fspec, imported_fspec)
+        return list(touched.values())
+
+    def _link_packages(self, packages):
+        """
+        Update type references in packages in dependency order. Packages
+        in an import cycle are linked one after another.
+
+        :param packages: A list of ast.Package objects.
+        """
+        graph = self.package_graph().subgraph(
+            package.name for package in packages)
+        for component in graph.strongly_connected_components():
+            for name in component:
+                if self.stats is None:
+                    self._update_package_references(self.packages[name])
+                else:
+                    with self.stats.timer("link"):
+                        self._update_package_references(self.packages[name])
+
+    def import_package(self, fspec, package, references=None):
+        """
+        Import an ast.Package into the processor.
+
+        :param fspec: File specification of the package.
+        :param package: ast.Package object.
+        :param references: Deprecated and ignored.
+        """
+        _warn_references(references)
+        if not isinstance(package, ast.Package):
+            raise ValueError("Expected ast.Package as input.")
+        queue = deque()
+        self._register_package(fspec, package, queue)
+        self._link_packages(self._load_imports(queue))
 
     def import_string(self, fspec, fidl, references=None):
         """
@@ -355,15 +975,15 @@ class Processor(object):
 
         :param fspec: File specification of the package.
         :param fidl: FIDL string.
-        :param references: A list of package references.
+        :param references: Deprecated and ignored.
         :return: The parsed ast.Package.
         """
+        _warn_references(references)
         # Parse the string.
-        parser = franca_parser.Parser()
-        package = parser.parse(fidl)
+        package = self._get_parser().parse(fidl)
         package.files = [fspec]
         # Import the package in the processor.
-        self.import_package(fspec, package, references)
+        self.import_package(fspec, package)
         return package
 
     def import_file(self, fspec, references=None, package_path=None):
@@ -371,35 +991,107 @@ class Processor(object):
         Parse an FIDL file and import it into the processor as package.
 
         :param fspec: File specification.
-        :param references: A list of package references.
+        :param references: Deprecated and ignored.
         :param package_path: Additional model path to search for imports.
         :return: The parsed ast.Package.
         """
-        if fspec in self.files:
-            # File already loaded.
-            return self.files[fspec]
-        if not os.path.exists(fspec):
-            if os.path.isabs(fspec):
-                # Absolute specification
-                raise ProcessorException(
-                    "Model '{}' not found.".format(fspec))
-            else:
-                # Relative specification.
-                package_paths = self.package_paths[:]
-                if package_path:
-                    package_paths.insert(0, package_path)
-                # Check in the package path list.
-                for path in package_paths:
-                    temp_fspec = os.path.join(path, fspec)
-                    if os.path.exists(temp_fspec):
-                        fspec = temp_fspec
-                        break
+        _warn_references(references)
+        return self.import_files([fspec], package_path)[0]
+
+    def import_files(self, fspecs, package_path=None, jobs=None):
+        """
+        Parse FIDL files and import them into the processor as packages.
+
+        All files, reachable through imports, are parsed first. Type
+        references are linked afterwards, once per namespace and in
+        dependency order.
+
+        :param fspecs: A list of file specifications.
+        :param package_path: Additional model path to search for imports.
+        :param jobs: Number of worker processes to parse files with. Files
+            are parsed in the calling process by default.
+        :return: A list of the parsed ast.Package objects.
+        """
+        try:
+            if jobs is not None and jobs > 1:
+                if self.stats is None:
+                    self._parse_files_parallel(fspecs, package_path, jobs)
                 else:
-                    raise ProcessorException(
-                        "Model '{}' not found.".format(fspec))
-        # Parse the file.
-        parser = franca_parser.Parser()
-        package = parser.parse_file(fspec)
-        # Import the package in the processor.
-        self.import_package(fspec, package, references)
-        return package
+                    with self.stats.timer("parallel"):
+                        self._parse_files_parallel(fspecs, package_path,
+                                                   jobs)
+            queue = deque()
+            packages = []
+            for fspec in fspecs:
+                _, package = self._load_file(fspec, package_path, queue)
+                packages.append(package)
+            self._link_packages(self._load_imports(queue))
+        finally:
+            self._preparsed.clear()
+        return packages
+
+    def reload(self, changed_paths=None):
+        """
+        Re-import changed files and relink the packages depending on them.
+
+        A file is changed if its modification time or size differs from
+        the imported one. Its content is hashed then, so that a file,
+        rewritten with the same content after an earlier reload, is not
+        parsed again.
+        Changed files are parsed again and their previous contributions are
+        dropped from the packages. Packages, importing the packages of the
+        changed files directly or transitively, are relinked in place.
+
+        :param changed_paths: A list of file specifications to check or None
+            to check all imported files.
+        :return: A list of the re-imported file specifications.
+        """
+        if changed_paths is None:
+            candidates = list(self._file_stamps)
+        else:
+            loaded = dict((os.path.abspath(fspec), fspec)
+                          for fspec in self._file_stamps)
+            candidates = [loaded[os.path.abspath(fspec)]
+                          for fspec in changed_paths
+                          if os.path.abspath(fspec) in loaded]
+        stale = []
+        # Content hashes of the changed files.
+        digests = {}
+        for fspec in candidates:
+            stamp = self._file_stamps[fspec]
+            new_stamp = self._file_stamp(fspec)
+            if new_stamp is None:
+                stale.append(fspec)
+                continue
+            if new_stamp[:2] == stamp[:2]:
+                continue
+            digest = self._file_digest(fspec)
+            if digest is not None and digest == stamp[2]:
+                # Rewritten with the same content.
+                self._file_stamps[fspec] = new_stamp[:2] + (digest,)
+                continue
+            stale.append(fspec)
+            digests[fspec] = new_stamp[:2] + (digest,)
+        if not stale:
+            return []
+        affected = self.package_graph().transitive_dependents(
+            set(self.files[fspec].name for fspec in stale))
+        for name in affected:
+            self._unlink_package(self.packages[name])
+        for fspec in stale:
+            self._remove_file(fspec)
+        queue = deque()
+        for fspec in stale:
+            if os.path.exists(fspec):
+                self._load_file(fspec, None, queue)
+                stamp = digests.get(fspec)
+                if stamp is not None and \
+                        self._file_stamps[fspec][:2] == stamp[:2]:
+                    # Hashed before the file was parsed again.
+                    self._file_stamps[fspec] = stamp
+        # Update the import references of the remaining files.
+        for fspec, package in self.files.items():
+            if package.name in affected and fspec not in stale:
+                queue.append(fspec)
+        self._link_packages(self._load_imports(queue))
+        return stale
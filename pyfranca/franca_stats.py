@@ -0,0 +1,322 @@
+"""
+Franca processing statistics and parser profiles.
+"""
+
+import timeit
+from collections import OrderedDict
+
+try:
+    from time import process_time as cpu_time
+except ImportError:
+    from time import clock as cpu_time
+
+
+class _StageTimer(object):
+    """
+    Context manager, timing a stage of ProcessorStats.
+    """
+
+    __slots__ = ("stats", "stage", "fspec")
+
+    def __init__(self, stats, stage, fspec):
+        self.stats = stats
+        self.stage = stage
+        self.fspec = fspec
+
+    def __enter__(self):
+        self.stats._start(self.stage, self.fspec)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats._stop()
+        return False
+
+
+class ProcessorStats(object):
+    """
+    Opt-in wall and CPU time per processing stage and per file, and
+    counters, collected by Processor and Parser.
+
+    Stage times are exclusive - the time of a stage, nested in another one,
+    e.g. lexing in parsing, is not included in the outer stage. The stage
+    times add up to the total processing time.
+
+    Stages: "find" - file search, "tables" - parser construction, "load" -
+    reading and caching files, "lex" and "parse", "register" and "merge" -
+    registering packages and merging them into packages with the same name,
+    "link" - resolving references, "parallel" - planning and parsing in
+    worker processes.
+
+    Counters: "files", "tokens", "nodes", "resolve_calls" and
+    "resolve_lookups" - index lookups of the resolve calls.
+
+    Tokens are timed one by one - the timer calls inflate the lexing time.
+    """
+
+    def __init__(self):
+        # Stage name -> [wall time, CPU time, calls].
+        self.stages = OrderedDict()
+        # File specification -> stage name -> [wall time, CPU time].
+        self.files = OrderedDict()
+        self.counters = OrderedDict()
+        # Stack of [stage, file, wall start, CPU start, nested wall time,
+        #   nested CPU time] of the running stages.
+        self._running = []
+
+    def timer(self, stage, fspec=None):
+        """
+        Get a context manager, timing a stage.
+
+        :param stage: Stage name.
+        :param fspec: File specification the stage processes or None for
+            the file of the enclosing stage.
+        :return: Context manager.
+        """
+        return _StageTimer(self, stage, fspec)
+
+    def _start(self, stage, fspec):
+        if fspec is None and self._running:
+            fspec = self._running[-1][1]
+        self._running.append([stage, fspec, timeit.default_timer(),
+                              cpu_time(), 0.0, 0.0])
+
+    def _stop(self):
+        stage, fspec, wall, cpu, nested_wall, nested_cpu = self._running[-1]
+        wall = timeit.default_timer() - wall
+        cpu = cpu_time() - cpu
+        self._running.pop()
+        self.add(stage, wall, cpu, fspec, nested_wall, nested_cpu)
+
+    def add(self, stage, wall, cpu, fspec=None, nested_wall=0.0,
+            nested_cpu=0.0):
+        """
+        Record the time of a stage, measured by the caller, e.g. the total
+        of many short intervals. The time is nested in the running stage.
+
+        :param stage: Stage name.
+        :param wall: Wall time in seconds.
+        :param cpu: CPU time in seconds.
+        :param fspec: File specification or None for the file of the running
+            stage.
+        :param nested_wall: Wall time of the nested stages to exclude.
+        :param nested_cpu: CPU time of the nested stages to exclude.
+        """
+        if self._running:
+            running = self._running[-1]
+            running[4] += wall
+            running[5] += cpu
+            if fspec is None:
+                fspec = running[1]
+        wall -= nested_wall
+        cpu -= nested_cpu
+        totals = self.stages.get(stage)
+        if totals is None:
+            totals = self.stages[stage] = [0.0, 0.0, 0]
+        totals[0] += wall
+        totals[1] += cpu
+        totals[2] += 1
+        if fspec is not None:
+            file_stages = self.files.get(fspec)
+            if file_stages is None:
+                file_stages = self.files[fspec] = OrderedDict()
+            file_totals = file_stages.get(stage)
+            if file_totals is None:
+                file_totals = file_stages[stage] = [0.0, 0.0]
+            file_totals[0] += wall
+            file_totals[1] += cpu
+
+    def count(self, counter, value=1):
+        """
+        Increment a counter.
+
+        :param counter: Counter name.
+        :param value: Increment.
+        """
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def reset(self):
+        """
+        Clear the collected statistics.
+        """
+        self.stages.clear()
+        self.files.clear()
+        self.counters.clear()
+
+    def as_dict(self):
+        """
+        Get the statistics as plain data, e.g. for JSON.
+
+        :return: A dictionary with "stages", "files" and "counters" items.
+        """
+        def times(values):
+            return {"wall": values[0], "cpu": values[1]}
+
+        stages = OrderedDict()
+        for stage, values in self.stages.items():
+            stages[stage] = times(values)
+            stages[stage]["calls"] = values[2]
+        files = OrderedDict()
+        for fspec, file_stages in self.files.items():
+            files[fspec] = OrderedDict(
+                (stage, times(values))
+                for stage, values in file_stages.items())
+        return {"stages": stages, "files": files,
+                "counters": OrderedDict(self.counters)}
+
+    def report(self, max_files=10):
+        """
+        Format the statistics as a text report.
+
+        :param max_files: Maximum number of files to list, slowest first.
+        :return: Report string.
+        """
+        lines = ["{:<16}{:>12}{:>12}{:>10}".format(
+            "Stage", "Wall ms", "CPU ms", "Calls")]
+        total_wall = total_cpu = 0.0
+        for stage, (wall, cpu, calls) in self.stages.items():
+            lines.append("{:<16}{:>12.3f}{:>12.3f}{:>10}".format(
+                stage, wall * 1e3, cpu * 1e3, calls))
+            total_wall += wall
+            total_cpu += cpu
+        lines.append("{:<16}{:>12.3f}{:>12.3f}".format(
+            "total", total_wall * 1e3, total_cpu * 1e3))
+        if self.counters:
+            lines.append("")
+            lines.append("{:<16}{:>12}".format("Counter", "Value"))
+            for counter, value in self.counters.items():
+                lines.append("{:<16}{:>12}".format(counter, value))
+        if self.files and max_files:
+            files = sorted(
+                self.files.items(),
+                key=lambda item: -sum(v[0] for v in item[1].values()))
+            lines.append("")
+            lines.append("{:<52}{:>12}".format("File", "Wall ms"))
+            for fspec, file_stages in files[:max_files]:
+                lines.append("{:<52}{:>12.3f}".format(
+                    fspec, sum(v[0] for v in file_stages.values()) * 1e3))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+class ParserProfile(object):
+    """
+    Reduction counts and times per grammar production and per semantic
+    action, collected by Parser in profiling mode. A profile can be shared
+    by several parsers.
+
+    The parse time is split into lexing, the semantic actions and the LR
+    parser engine - the rest, including the profiling overhead.
+    """
+
+    def __init__(self):
+        # Production string -> [action name, reductions, time].
+        self.productions = OrderedDict()
+        self.parses = 0
+        self.tokens = 0
+        self.parse_time = 0.0
+        self.lex_time = 0.0
+
+    def production(self, production, action):
+        """
+        Get the counters of a production, updated by its profiled action.
+
+        :param production: Production string, e.g. "defs -> defs def".
+        :param action: Name of the semantic action function.
+        :return: An [action name, reductions, time] list.
+        """
+        counters = self.productions.get(production)
+        if counters is None:
+            counters = self.productions[production] = [action, 0, 0.0]
+        return counters
+
+    def add_parse(self, parse_time, lex_time, tokens):
+        """
+        Record a parse.
+
+        :param parse_time: Parse time, including lexing, in seconds.
+        :param lex_time: Lexing time in seconds.
+        :param tokens: Number of tokens.
+        """
+        self.parses += 1
+        self.parse_time += parse_time
+        self.lex_time += lex_time
+        self.tokens += tokens
+
+    @property
+    def action_time(self):
+        """
+        Total time of the semantic actions in seconds.
+        """
+        return sum(counters[2] for counters in self.productions.values())
+
+    def actions(self):
+        """
+        Get the reductions and times per semantic action. An action can
+        serve several productions.
+
+        :return: An OrderedDict of action names and [reductions, time]
+            lists, slowest first.
+        """
+        actions = {}
+        for action, reductions, seconds in self.productions.values():
+            totals = actions.setdefault(action, [0, 0.0])
+            totals[0] += reductions
+            totals[1] += seconds
+        return OrderedDict(sorted(actions.items(),
+                                  key=lambda item: -item[1][1]))
+
+    def reset(self):
+        """
+        Clear the collected counts and times.
+        """
+        for counters in self.productions.values():
+            counters[1] = 0
+            counters[2] = 0.0
+        self.parses = 0
+        self.tokens = 0
+        self.parse_time = 0.0
+        self.lex_time = 0.0
+
+    def report(self, max_rows=20):
+        """
+        Format the profile as a text report, slowest productions and
+        actions first.
+
+        :param max_rows: Maximum number of productions and actions to list.
+        :return: Report string.
+        """
+        action_time = self.action_time
+        engine_time = self.parse_time - self.lex_time - action_time
+        lines = ["{} parses, {} tokens".format(self.parses, self.tokens)]
+        for name, seconds in (("total", self.parse_time),
+                              ("lexing", self.lex_time),
+                              ("actions", action_time),
+                              ("parser engine", engine_time)):
+            share = seconds / self.parse_time * 100 if self.parse_time else 0
+            lines.append("{:<16}{:>12.3f} ms{:>8.1f} %".format(
+                name, seconds * 1e3, share))
+        productions = sorted(
+            (counters for counters in self.productions.items()
+             if counters[1][1]),
+            key=lambda item: -item[1][2])
+        lines.append("")
+        lines.append("{:>10}{:>12}{:>10}  {}".format(
+            "Reductions", "Time ms", "us/red", "Production"))
+        for production, (_, reductions, seconds) in productions[:max_rows]:
+            lines.append("{:>10}{:>12.3f}{:>10.2f}  {}".format(
+                reductions, seconds * 1e3, seconds / reductions * 1e6,
+                production))
+        lines.append("")
+        lines.append("{:>10}{:>12}{:>10}  {}".format(
+            "Reductions", "Time ms", "us/red", "Action"))
+        actions = [item for item in self.actions().items() if item[1][0]]
+        for action, (reductions, seconds) in actions[:max_rows]:
+            lines.append("{:>10}{:>12.3f}{:>10.2f}  {}".format(
+                reductions, seconds * 1e3, seconds / reductions * 1e6,
+                action))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
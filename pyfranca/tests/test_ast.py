@@ -0,0 +1,387 @@
+"""
+Pyfranca AST tests.
+"""
+
+import unittest
+import copy
+import pickle
+import sys
+from collections import OrderedDict
+
+from pyfranca import Parser, ast
+
+
+class TestCompactNodes(unittest.TestCase):
+    """Test slotted AST nodes and the shared empty containers."""
+
+    def setUp(self):
+        self.package = Parser().parse("""
+            package P
+            interface I {
+                <** @description: Method. **>
+                method m {
+                    in { Int32 a }
+                }
+                attribute UInt8 x readonly
+            }
+        """)
+
+    def test_no_instance_dict(self):
+        method = self.package.interfaces["I"].methods["m"]
+        for node in [self.package, self.package.interfaces["I"], method,
+                     method.in_args["a"], method.in_args["a"].type]:
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.unknown_attribute = None
+
+    def test_shared_empty(self):
+        interface = self.package.interfaces["I"]
+        method = interface.methods["m"]
+        self.assertIs(interface.comments, ast.EMPTY_MAPPING)
+        self.assertIs(method.out_args, ast.EMPTY_MAPPING)
+        self.assertIs(method.flags, ast.EMPTY_LIST)
+        self.assertEqual(method.out_args, OrderedDict())
+        self.assertListEqual(method.flags, [])
+        self.assertEqual(method.comments["@description"], "Method.")
+        self.assertEqual(interface.attributes["x"].flags, ["readonly"])
+
+    def test_mutable_members(self):
+        struct = ast.Struct("S")
+        struct.fields["a"] = ast.StructField("a", ast.Int32())
+        enumeration = ast.Enumeration("E")
+        enumeration.enumerators["A"] = ast.Enumerator("A")
+        self.assertEqual(list(struct.fields), ["a"])
+        self.assertEqual(list(enumeration.enumerators), ["A"])
+        self.assertEqual(len(ast.Struct("S2").fields), 0)
+        self.assertEqual(len(ast.Enumeration("E2").enumerators), 0)
+
+    def test_immutable_empty(self):
+        with self.assertRaises(TypeError):
+            ast.EMPTY_MAPPING["key"] = "value"
+        with self.assertRaises(TypeError):
+            ast.EMPTY_MAPPING.update(key="value")
+        with self.assertRaises(TypeError):
+            ast.EMPTY_LIST.append("flag")
+        with self.assertRaises(TypeError):
+            ast.EMPTY_LIST += ["flag"]
+        self.assertEqual(len(ast.EMPTY_MAPPING), 0)
+        self.assertEqual(len(ast.EMPTY_LIST), 0)
+
+    def test_pickle(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            package = pickle.loads(pickle.dumps(self.package, protocol))
+            interface = package.interfaces["I"]
+            method = interface.methods["m"]
+            self.assertIs(interface.package, package)
+            self.assertIs(method.namespace, interface)
+            self.assertIs(method.flags, ast.EMPTY_LIST)
+            self.assertIs(interface.comments, ast.EMPTY_MAPPING)
+            self.assertEqual(method.comments["@description"], "Method.")
+            self.assertIsInstance(method.in_args["a"].type, ast.Int32)
+
+    def test_copy(self):
+        package = copy.deepcopy(self.package)
+        self.assertIs(package.interfaces["I"].comments, ast.EMPTY_MAPPING)
+        self.assertEqual(package.interfaces["I"].attributes["x"].flags,
+                         ["readonly"])
+
+
+class TestNamespaceMembers(unittest.TestCase):
+    """Test the namespace member index."""
+
+    def setUp(self):
+        self.interface = Parser().parse("""
+            package P
+            interface I {
+                typedef T is Int32
+                enumeration E { A }
+                struct S { Int32 f }
+                array A of UInt8
+                map M { Int32 to String }
+                const Int32 c = 1
+                attribute Int32 x
+                method m {}
+                broadcast b {}
+            }
+        """).interfaces["I"]
+
+    def test_lookup(self):
+        interface = self.interface
+        self.assertIs(interface["T"], interface.typedefs["T"])
+        self.assertIs(interface["E"], interface.enumerations["E"])
+        self.assertIs(interface["S"], interface.structs["S"])
+        self.assertIs(interface["A"], interface.arrays["A"])
+        self.assertIs(interface["M"], interface.maps["M"])
+        self.assertIs(interface["c"], interface.constants["c"])
+        self.assertIs(interface["x"], interface.attributes["x"])
+        self.assertIs(interface["m"], interface.methods["m"])
+        self.assertIs(interface["b"], interface.broadcasts["b"])
+        self.assertTrue("c" in interface)
+        self.assertFalse("X" in interface)
+        with self.assertRaises(KeyError):
+            interface["X"]
+        with self.assertRaises(TypeError):
+            1 in interface
+
+    def test_members(self):
+        self.assertEqual([name for name, _ in self.interface.members()],
+                         ["T", "E", "S", "A", "M", "c", "x", "m", "b"])
+
+    def test_direct_writes(self):
+        interface = self.interface
+        typedef = ast.Typedef("U", ast.String())
+        interface.typedefs["U"] = typedef
+        self.assertIs(interface["U"], typedef)
+        del interface.typedefs["T"]
+        self.assertFalse("T" in interface)
+        self.assertEqual(interface.methods.pop("m").name, "m")
+        self.assertFalse("m" in interface)
+        interface.broadcasts.clear()
+        self.assertFalse("b" in interface)
+        interface.structs.update(S2=ast.Struct("S2"))
+        self.assertIs(interface["S2"], interface.structs["S2"])
+        self.assertEqual([name for name, _ in interface.members()],
+                         ["E", "S", "A", "M", "c", "x", "U", "S2"])
+
+    def test_replaced_dictionary(self):
+        interface = self.interface
+        interface.typedefs = OrderedDict(
+            [("U", ast.Typedef("U", ast.String()))])
+        self.assertFalse("T" in interface)
+        self.assertIs(interface["U"], interface.typedefs["U"])
+        interface.typedefs["V"] = ast.Typedef("V", ast.String())
+        self.assertTrue("V" in interface)
+        self.assertEqual([name for name, _ in interface.members()],
+                         ["E", "S", "A", "M", "c", "x", "m", "b", "U", "V"])
+
+    def test_pickled_index(self):
+        interface = pickle.loads(pickle.dumps(self.interface, 2))
+        self.assertEqual([name for name, _ in interface.members()],
+                         ["T", "E", "S", "A", "M", "c", "x", "m", "b"])
+        interface.constants["d"] = ast.Constant("d", ast.Int32(),
+                                                ast.IntegerValue(2))
+        self.assertIs(interface["d"], interface.constants["d"])
+        del interface.attributes["x"]
+        self.assertFalse("x" in interface)
+
+    def test_duplicate(self):
+        with self.assertRaises(ast.ASTException) as context:
+            self.interface._add_member(ast.Method("c"))
+        self.assertEqual(str(context.exception),
+                         "Duplicate namespace member 'c'.")
+
+
+class NameCollector(ast.NodeVisitor):
+
+    def __init__(self):
+        self.names = []
+
+    def generic_visit(self, node):
+        self.names.append(node.__class__.__name__)
+        super(NameCollector, self).generic_visit(node)
+
+    def visit_Type(self, node):
+        self.names.append("Type " + node.name)
+        super(NameCollector, self).generic_visit(node)
+
+
+class ReferenceCollector(NameCollector):
+
+    def visit_Reference(self, node):
+        self.names.append("Reference " + node.name)
+
+
+class RemoveBroadcasts(ast.NodeTransformer):
+
+    def visit_Broadcast(self, node):
+        return None
+
+    def visit_PrimitiveType(self, node):
+        return ast.Int64()
+
+
+class TestVisitor(unittest.TestCase):
+    """Test the AST visitors."""
+
+    def setUp(self):
+        self.package = Parser().parse("""
+            package P
+            typeCollection TC {
+                typedef A is Int32
+                struct S { A a }
+            }
+            interface I {
+                method m {
+                    in { UInt8 b }
+                }
+                broadcast e {}
+                attribute String c
+            }
+        """)
+
+    def test_dispatch(self):
+        visitor = NameCollector()
+        visitor.visit(self.package)
+        self.assertEqual(visitor.names, [
+            "Package", "TypeCollection", "Type A", "Type Int32", "Type S",
+            "StructField", "Type A", "Interface", "Type c", "Type String",
+            "Type m", "Argument", "Type UInt8", "Type e"])
+
+    def test_subclass_dispatch(self):
+        NameCollector().visit(self.package)
+        visitor = ReferenceCollector()
+        visitor.visit(self.package.typecollections["TC"])
+        self.assertEqual(visitor.names, [
+            "TypeCollection", "Type A", "Type Int32", "Type S",
+            "StructField", "Reference A"])
+
+    def test_dispatch_table(self):
+        visitor = ReferenceCollector()
+        table = visitor.get_dispatch_table()
+        self.assertEqual(table[ast.Reference], visitor.visit_Reference)
+        self.assertEqual(table[ast.Struct], visitor.visit_Type)
+        self.assertEqual(table[ast.Package], visitor.generic_visit)
+        self.assertIs(visitor.get_dispatch_table(), table)
+
+    def test_iter_child_nodes(self):
+        method = self.package.interfaces["I"].methods["m"]
+        self.assertEqual(list(ast.iter_child_nodes(method)),
+                         [method.in_args["b"]])
+        self.assertEqual(list(ast.iter_child_nodes(ast.Int32())), [])
+
+    def test_transformer(self):
+        interface = self.package.interfaces["I"]
+        result = RemoveBroadcasts().visit(self.package)
+        self.assertIs(result, self.package)
+        self.assertEqual(list(interface.broadcasts), [])
+        self.assertFalse("e" in interface)
+        self.assertEqual([name for name, _ in interface.members()],
+                         ["m", "c"])
+        self.assertIs(interface.attributes["c"].type, ast.Int64())
+        self.assertIs(interface.methods["m"].in_args["b"].type, ast.Int64())
+        self.assertIs(
+            self.package.typecollections["TC"].typedefs["A"].type,
+            ast.Int64())
+
+
+class TestWalk(unittest.TestCase):
+    """Test the iterative AST traversal."""
+
+    def setUp(self):
+        self.package = Parser().parse("""
+            package P
+            typeCollection TC {
+                typedef A is Int32
+                struct S { A a }
+            }
+            interface I {
+                method m {
+                    in { UInt8 b }
+                }
+            }
+        """)
+
+    @staticmethod
+    def names(nodes):
+        return [getattr(node, "name", None) for node in nodes]
+
+    def test_pre_order(self):
+        self.assertEqual(self.names(ast.walk(self.package)), [
+            "P", "TC", "A", "Int32", "S", "a", "A", "I", "m", "b",
+            "UInt8"])
+
+    def test_post_order(self):
+        self.assertEqual(
+            self.names(ast.walk(self.package, order=ast.POST_ORDER)), [
+                "Int32", "A", "A", "a", "S", "TC", "UInt8", "b", "m", "I",
+                "P"])
+
+    def test_kinds(self):
+        self.assertEqual(
+            self.names(ast.walk(self.package, kinds=ast.Reference)), ["A"])
+        self.assertEqual(
+            self.names(ast.walk(self.package,
+                                kinds=(ast.Struct, ast.Method))),
+            ["S", "m"])
+
+    def test_prune(self):
+        def prune(node):
+            return isinstance(node, (ast.Type, ast.Interface))
+        self.assertEqual(self.names(ast.walk(self.package, prune=prune)),
+                         ["P", "TC", "A", "S", "I"])
+        self.assertEqual(
+            self.names(ast.walk(self.package, order=ast.POST_ORDER,
+                                prune=prune)),
+            ["A", "S", "TC", "I", "P"])
+
+    def test_parents(self):
+        nodes = list(ast.iter_nodes(self.package, kinds=ast.Argument))
+        method = self.package.interfaces["I"].methods["m"]
+        self.assertEqual(nodes, [(method, method.in_args["b"])])
+        self.assertEqual(next(ast.iter_nodes(self.package)),
+                         (None, self.package))
+
+    def test_deep_nesting(self):
+        node = ast.Int32()
+        for _ in range(sys.getrecursionlimit() + 100):
+            node = ast.Array(None, node)
+        for order in (ast.PRE_ORDER, ast.POST_ORDER):
+            self.assertEqual(sum(1 for _ in ast.walk(node, order=order)),
+                             sys.getrecursionlimit() + 101)
+
+    def test_unknown_order(self):
+        with self.assertRaises(ValueError):
+            list(ast.walk(self.package, order="in"))
+
+
+class TestPrimitiveTypes(unittest.TestCase):
+    """Test the shared primitive type instances."""
+
+    def test_flyweight(self):
+        self.assertIs(ast.Int32(), ast.Int32())
+        self.assertIsNot(ast.Int32(), ast.UInt32())
+        self.assertIs(ast.PRIMITIVE_TYPES["String"], ast.String())
+        self.assertEqual(ast.Int32().name, "Int32")
+        self.assertIs(ast.Int32().comments, ast.EMPTY_MAPPING)
+        self.assertIsNone(ast.Int32().namespace)
+
+    def test_parsed(self):
+        parser = Parser()
+        package = parser.parse("""
+            package P
+            typeCollection TC {
+                typedef A is Int32
+                array B of Int32
+            }
+        """)
+        package2 = parser.parse("""
+            package P2
+            typeCollection TC {
+                typedef A is Int32
+                typedef B is Int32[]
+            }
+        """)
+        tc = package.typecollections["TC"]
+        tc2 = package2.typecollections["TC"]
+        self.assertIs(tc.typedefs["A"].type, ast.Int32())
+        self.assertIs(tc.arrays["B"].type, ast.Int32())
+        self.assertIs(tc2.typedefs["A"].type, ast.Int32())
+        self.assertIs(tc2.typedefs["B"].type.type, ast.Int32())
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            ast.Int32().name = "Int64"
+        with self.assertRaises(AttributeError):
+            ast.Int32().namespace = None
+        with self.assertRaises(AttributeError):
+            del ast.Int32().comments
+
+    def test_pickle(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            self.assertIs(pickle.loads(pickle.dumps(ast.Int32(), protocol)),
+                          ast.Int32())
+        self.assertIs(copy.deepcopy(ast.String()), ast.String())
+
+
+if __name__ == '__main__':
+    unittest.main()
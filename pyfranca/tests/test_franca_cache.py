@@ -0,0 +1,200 @@
+"""
+Pyfranca AST cache tests.
+"""
+
+import unittest
+import errno
+import os
+import shutil
+import tempfile
+
+from pyfranca import ASTCache, Parser, Processor, ast
+from pyfranca.franca_processor import ProcessPoolExecutor
+
+
+class BaseTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.cache = ASTCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def tmp_fidl(self, filename, content):
+        fspec = os.path.join(self.tmp_dir, filename)
+        with open(fspec, "w") as f:
+            f.write(content)
+        return fspec
+
+
+class UnwritablePackage(ast.Package):
+    """Package, failing to pickle like a write to a full disk."""
+
+    def __reduce_ex__(self, protocol):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+
+class TestASTCache(BaseTestCase):
+    """Test the cache storage."""
+
+    def test_key(self):
+        self.assertEqual(ASTCache.key("package P"), ASTCache.key("package P"))
+        self.assertNotEqual(ASTCache.key("package P"),
+                            ASTCache.key("package P2"))
+        self.assertNotEqual(ASTCache.key("package P"),
+                            ASTCache.key("package P", "salt"))
+
+    def test_get_put(self):
+        key = ASTCache.key("package P")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, ast.Package("P"))
+        package = self.cache.get(key)
+        self.assertIsInstance(package, ast.Package)
+        self.assertEqual(package.name, "P")
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_damaged_entry(self):
+        key = ASTCache.key("package P")
+        with open(os.path.join(self.cache_dir, key + ".pickle"), "w") as f:
+            f.write("garbage")
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_eviction(self):
+        keys = [ASTCache.key("package P{}".format(i)) for i in range(4)]
+        self.cache.put(keys[0], ast.Package("P0"))
+        size = os.path.getsize(os.path.join(self.cache_dir,
+                                            keys[0] + ".pickle"))
+        self.cache.max_size = size * 3
+        for i, key in enumerate(keys[1:3]):
+            self.cache.put(key, ast.Package("P{}".format(i + 1)))
+        # Make P0 the most recently used entry.
+        for i, key in enumerate(keys[:3]):
+            os.utime(os.path.join(self.cache_dir, key + ".pickle"),
+                     (1000 + i, 1000 + i))
+        self.cache.get(keys[0])
+        self.cache.put(keys[3], ast.Package("P3"))
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+        self.assertIsNotNone(self.cache.get(keys[3]))
+
+    def test_write_error(self):
+        key = ASTCache.key("package P")
+        self.cache.put(key, UnwritablePackage("P"))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        self.assertIsNone(self.cache.get(key))
+
+    def test_overwrite_size(self):
+        key = ASTCache.key("package P")
+        self.cache.max_size = 1 << 20
+        for _ in range(3):
+            self.cache.put(key, ast.Package("P"))
+        self.assertEqual(self.cache._size, os.path.getsize(
+            os.path.join(self.cache_dir, key + ".pickle")))
+
+    def test_clear(self):
+        self.cache.put(ASTCache.key("package P"), ast.Package("P"))
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+class TestCachedParsing(BaseTestCase):
+    """Test loading parsed files from the cache."""
+
+    def test_parse_file(self):
+        fspec = self.tmp_fidl("P.fidl", """
+            package P
+            typeCollection TC {
+                typedef A is Int32
+            }
+        """)
+        parser = Parser(cache=self.cache)
+        package = parser.parse_file(fspec)
+        self.assertEqual(self.cache.misses, 1)
+        package2 = Parser(cache=self.cache).parse_file(fspec)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertIsNot(package2, package)
+        self.assertEqual(package2.files, [fspec])
+        self.assertIs(package2.typecollections["TC"].package, package2)
+        self.assertIsInstance(
+            package2.typecollections["TC"].typedefs["A"].type, ast.Int32)
+        # Modified files are parsed again.
+        self.tmp_fidl("P.fidl", "package P2")
+        package3 = parser.parse_file(fspec)
+        self.assertEqual(package3.name, "P2")
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_comment_tags(self):
+        class TagParser(Parser):
+            pass
+        TagParser.register_comment_tag("@requirement")
+        self.assertNotEqual(
+            TagParser(cache=self.cache).cache_key("package P"),
+            Parser(cache=self.cache).cache_key("package P"))
+
+    def test_mmap(self):
+        fspec = self.tmp_fidl("P.fidl", "package P")
+        parser = Parser(cache=self.cache, use_mmap=True)
+        key = parser.file_cache_key(fspec)
+        if str is not bytes:
+            # Text input is decoded on Python 3.
+            self.assertNotEqual(
+                key, Parser(cache=self.cache).file_cache_key(fspec))
+        parser.parse_file(fspec)
+        package = parser.parse_file(fspec)
+        self.assertEqual(package.name, "P")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertIsNotNone(self.cache.get(key))
+
+    def test_import_file(self):
+        self.tmp_fidl("P.fidl", """
+            package P
+            typeCollection TC {
+                typedef A is Int32
+            }
+        """)
+        fspec = self.tmp_fidl("P2.fidl", """
+            package P2
+            import P.TC.* from "P.fidl"
+            interface I {
+                attribute A a
+            }
+        """)
+        Processor(cache=self.cache).import_file(fspec)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+        processor = Processor(cache=self.cache)
+        processor.import_file(fspec)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+        a = processor.packages["P"].typecollections["TC"].typedefs["A"]
+        i = processor.packages["P2"].interfaces["I"]
+        self.assertIs(i.attributes["a"].type.reference, a)
+
+    @unittest.skipIf(ProcessPoolExecutor is None,
+                     "concurrent.futures not available")
+    def test_parallel_import(self):
+        self.tmp_fidl("P.fidl", """
+            package P
+            typeCollection TC {
+                typedef A is Int32
+            }
+        """)
+        fspec = self.tmp_fidl("P2.fidl", """
+            package P2
+            import P.TC.* from "P.fidl"
+            interface I {
+                attribute A a
+            }
+        """)
+        Processor(cache=self.cache).import_files([fspec], jobs=2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+        processor = Processor(cache=self.cache)
+        processor.import_files([fspec], jobs=2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+        a = processor.packages["P"].typecollections["TC"].typedefs["A"]
+        i = processor.packages["P2"].interfaces["I"]
+        self.assertIs(i.attributes["a"].type.reference, a)
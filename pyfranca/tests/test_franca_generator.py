@@ -0,0 +1,75 @@
+"""
+Pyfranca model generator tests.
+"""
+
+import unittest
+import shutil
+import tempfile
+
+from pyfranca import ModelGenerator, Processor, ast
+
+
+class TestModelGenerator(unittest.TestCase):
+    """Test the synthetic model generator."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_deterministic(self):
+        files = ModelGenerator(seed=1).generate()
+        self.assertEqual(files, ModelGenerator(seed=1).generate())
+        self.assertNotEqual(files, ModelGenerator(seed=2).generate())
+
+    def test_processor(self):
+        generator = ModelGenerator(packages=8, interfaces=2, methods=3,
+                                   attributes=4, broadcasts=1, types=8,
+                                   imports=3, depth=4, comments=1.0,
+                                   anonymous_arrays=0.5)
+        fspecs = generator.write(self.tmp_dir)
+        self.assertEqual(len(fspecs), 8)
+        processor = Processor()
+        packages = processor.import_files(fspecs)
+        self.assertEqual(len(processor.packages), 8)
+        for package in packages:
+            self.assertEqual(package.comments["@description"],
+                             "Package {}.".format(package.name[5:]))
+            types = package.typecollections["Types"]
+            self.assertEqual([len(types.structs), len(types.enumerations),
+                              len(types.arrays), len(types.maps)],
+                             [2, 2, 2, 2])
+            self.assertEqual(len(package.interfaces), 2)
+            for interface in package.interfaces.values():
+                self.assertEqual(len(interface.methods), 3)
+                self.assertEqual(len(interface.attributes), 4)
+                self.assertEqual(len(interface.broadcasts), 1)
+        self.assertTrue(any(
+            isinstance(attribute.type, ast.Array)
+            for package in packages
+            for interface in package.interfaces.values()
+            for attribute in interface.attributes.values()))
+
+    def test_imports(self):
+        generator = ModelGenerator(packages=12, imports=2, depth=3)
+        fspecs = generator.write(self.tmp_dir)
+        processor = Processor()
+        processor.import_files(fspecs)
+        graph = processor.graph
+        for index, fspec in enumerate(fspecs):
+            dependencies = graph.dependencies(fspec)
+            if generator.level(index) == 0:
+                self.assertEqual(dependencies, [])
+            else:
+                self.assertEqual(len(dependencies), 2)
+                for dependency in dependencies:
+                    self.assertEqual(
+                        generator.level(fspecs.index(dependency)),
+                        generator.level(index) - 1)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            ModelGenerator(packages=0)
+        with self.assertRaises(ValueError):
+            ModelGenerator(depth=0)
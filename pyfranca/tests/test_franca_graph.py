@@ -0,0 +1,111 @@
+"""
+Pyfranca dependency graph tests.
+"""
+
+import unittest
+
+from pyfranca.franca_graph import GraphException, DependencyGraph
+
+
+class BaseTestCase(unittest.TestCase):
+
+    @staticmethod
+    def graph(edges, nodes=()):
+        graph = DependencyGraph()
+        for node in nodes:
+            graph.add_node(node)
+        for node, dependency in edges:
+            graph.add_edge(node, dependency)
+        return graph
+
+
+class TestEdges(BaseTestCase):
+    """Test graph construction."""
+
+    def test_edges(self):
+        graph = self.graph([("a", "b"), ("a", "c"), ("b", "c"), ("a", "b")])
+        self.assertEqual(list(graph), ["a", "b", "c"])
+        self.assertEqual(len(graph), 3)
+        self.assertTrue("a" in graph)
+        self.assertFalse("d" in graph)
+        self.assertEqual(graph.dependencies("a"), ["b", "c"])
+        self.assertEqual(graph.dependencies("c"), [])
+        self.assertEqual(graph.dependents("c"), ["a", "b"])
+        self.assertEqual(graph.dependents("a"), [])
+
+    def test_remove_node(self):
+        graph = self.graph([("a", "b"), ("b", "c"), ("b", "b")])
+        graph.remove_node("b")
+        self.assertEqual(list(graph), ["a", "c"])
+        self.assertEqual(graph.dependencies("a"), [])
+        self.assertEqual(graph.dependents("c"), [])
+
+    def test_transitive(self):
+        graph = self.graph([("a", "b"), ("b", "c"), ("d", "c")], ["e"])
+        self.assertEqual(graph.transitive_dependencies(["a"]),
+                         {"a", "b", "c"})
+        self.assertEqual(graph.transitive_dependents(["c"]),
+                         {"a", "b", "c", "d"})
+        self.assertEqual(graph.transitive_dependents(["e"]), {"e"})
+
+    def test_subgraph(self):
+        graph = self.graph([("a", "b"), ("b", "c"), ("a", "c")])
+        subgraph = graph.subgraph(["c", "a"])
+        self.assertEqual(list(subgraph), ["c", "a"])
+        self.assertEqual(subgraph.dependencies("a"), ["c"])
+
+    def test_grouped(self):
+        graph = self.graph([("a1", "a2"), ("a2", "b1"), ("b1", "c1")])
+        grouped = graph.grouped(lambda node: node[0])
+        self.assertEqual(list(grouped), ["a", "b", "c"])
+        self.assertEqual(grouped.dependencies("a"), ["b"])
+        self.assertEqual(grouped.find_cycle(), None)
+
+
+class TestOrder(BaseTestCase):
+    """Test ordering and cycle detection."""
+
+    def test_topological_order(self):
+        graph = self.graph([("a", "b"), ("a", "c"), ("c", "b"), ("d", "a")])
+        self.assertEqual(graph.topological_order(), ["b", "c", "a", "d"])
+        self.assertEqual(graph.find_cycle(), None)
+
+    def test_empty(self):
+        graph = DependencyGraph()
+        self.assertEqual(graph.topological_order(), [])
+        self.assertEqual(graph.strongly_connected_components(), [])
+
+    def test_cycle(self):
+        graph = self.graph([("a", "b"), ("b", "c"), ("c", "d"), ("d", "b")])
+        self.assertEqual(graph.find_cycle(), ["b", "c", "d", "b"])
+        with self.assertRaises(GraphException) as context:
+            graph.topological_order()
+        self.assertEqual(str(context.exception),
+                         "Circular dependency 'b' -> 'c' -> 'd' -> 'b'.")
+        self.assertEqual(context.exception.cycle, ["b", "c", "d", "b"])
+
+    def test_self_cycle(self):
+        graph = self.graph([("a", "a")])
+        self.assertEqual(graph.find_cycle(), ["a", "a"])
+        self.assertEqual(graph.strongly_connected_components(), [["a"]])
+
+    def test_strongly_connected_components(self):
+        graph = self.graph([
+            ("a", "b"), ("b", "a"), ("b", "c"), ("c", "d"), ("d", "e"),
+            ("e", "c"), ("f", "e")])
+        self.assertEqual(graph.strongly_connected_components(),
+                         [["c", "d", "e"], ["a", "b"], ["f"]])
+
+    def test_deep(self):
+        # Iterative traversals handle long import chains.
+        count = 10000
+        graph = self.graph((i, i + 1) for i in range(count))
+        self.assertEqual(graph.topological_order(),
+                         list(range(count, -1, -1)))
+        graph.add_edge(count, 0)
+        self.assertEqual(len(graph.find_cycle()), count + 2)
+        self.assertEqual(len(graph.strongly_connected_components()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,14 @@ Pyfranca lexer tests.
 """
 
 import unittest
+import os
+import random
+import re
+import shutil
+import tempfile
 
-from pyfranca import Lexer
+from pyfranca import Lexer, FastLexer, LexerException, Parser, TokenStream
+from pyfranca.franca_lexer import open_input
 
 
 class BaseTestCase(unittest.TestCase):
@@ -301,3 +307,276 @@ class TestCheckRegularExpressions(BaseTestCase):
         self.assertEqual(tokenized_data[3].value, '=')
         self.assertEqual(tokenized_data[4].type, "BOOLEAN_VAL")
         self.assertEqual(tokenized_data[4].value, True)
+
+
+class TestComments(BaseTestCase):
+    """Test scanning comments."""
+
+    def test_long_comments(self):
+        text = "line\n" * 200000
+        for lexer_class in (Lexer, FastLexer):
+            tokens = lexer_class().tokenize_data(
+                "/*" + text + "*/ <**" + text + "**> a")
+            self.assertEqual([token.type for token in tokens],
+                             ["STRUCTURED_COMMENT", "ID"])
+            self.assertEqual(tokens[0].lineno, 200001)
+            self.assertEqual(tokens[0].value, text.strip())
+            self.assertEqual(tokens[1].lineno, 400001)
+
+    def test_unterminated_comments(self):
+        for lexer_class in (Lexer, FastLexer):
+            for data, message in (
+                    ("a\n/* x */ /* " + "*" * 100000,
+                     "Illegal character '/' at line 2."),
+                    ("<** x *>\n", "Illegal character '<' at line 1.")):
+                with self.assertRaises(LexerException) as context:
+                    lexer_class().tokenize_data(data)
+                self.assertEqual(str(context.exception), message)
+
+
+class TestFastLexer(unittest.TestCase):
+    """Test the conformance of the FastLexer to the PLY lexer."""
+
+    # Lexically interesting fragments for random inputs.
+    fragments = [
+        " ", "\t", "\n", "\n\n", "a", "ID_1", "trueValue", "true", "false",
+        "package", "Int32", "UInt8", "0", "12", "+12", "-7", "0x1F", "0XaB",
+        "0b101", "0B1", "1.5", ".5", "5.", "1e3", "1.5e-3f", "2.0d", "+1.0E+2",
+        "\"str\"", "\"multi\nline\"", "\"\"", "// line comment",
+        "/* block */", "/* multi\nline */", "<** @description: x **>",
+        "<** @see: a\n@author: b **>", "{", "}", ".", "*", "=", "[", "]",
+        "#", "(",
+    ]
+
+    @staticmethod
+    def _tokenize(lexer, data):
+        """
+        Get the tokens of an input text as tuples and the lexer error.
+        """
+        tokens = []
+        lexer.lexer.input(data)
+        try:
+            while True:
+                token = lexer.lexer.token()
+                if not token:
+                    break
+                tokens.append((token.type, token.value, token.lineno,
+                               token.lexpos))
+        except LexerException as e:
+            return tokens, str(e)
+        return tokens, None
+
+    def _assertConforms(self, data):
+        expected = self._tokenize(Lexer(), data)
+        actual = self._tokenize(FastLexer(), data)
+        self.assertEqual(actual, expected, repr(data))
+
+    @staticmethod
+    def corpus():
+        """
+        Get the test models and the FIDL inputs of the parser and processor
+        tests.
+        """
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        corpus = []
+        for dir_name, _, file_names in os.walk(os.path.join(base_dir, "fidl")):
+            for file_name in file_names:
+                with open(os.path.join(dir_name, file_name), "r") as f:
+                    corpus.append(f.read())
+        # The inputs of the parser and processor tests.
+        for file_name in ("test_franca_parser.py", "test_franca_processor.py"):
+            with open(os.path.join(base_dir, file_name), "r") as f:
+                corpus.extend(re.findall(r'"""(.*?)"""', f.read(),
+                                         re.DOTALL))
+        return corpus
+
+    def test_corpus(self):
+        corpus = self.corpus()
+        self.assertGreater(len(corpus), 100)
+        for data in corpus:
+            self._assertConforms(data)
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in range(1000):
+            data = "".join(rng.choice(self.fragments)
+                           for _ in range(rng.randint(1, 20)))
+            self._assertConforms(data)
+
+    def test_error(self):
+        with self.assertRaises(LexerException) as context:
+            FastLexer().tokenize_data("package P\n  #")
+        self.assertEqual(str(context.exception),
+                         "Illegal character '#' at line 2.")
+
+    def test_parser(self):
+        fidl = """
+            <** @description: P **>
+            package P
+            interface I {
+                version { major 1 minor 2 }
+                method M { in { Int32 a } out { String b } }
+                const UInt32 C = 0x10
+            }
+        """
+        package = Parser(the_lexer=FastLexer()).parse(fidl)
+        interface = package.interfaces["I"]
+        self.assertEqual(package.comments["@description"], "P")
+        self.assertEqual(interface.version.minor, 2)
+        self.assertEqual(interface.constants["C"].value.value, 16)
+        self.assertEqual(list(interface.methods["M"].out_args), ["b"])
+
+
+class TestTokenStream(unittest.TestCase):
+    """Test the compact token stream."""
+
+    def test_corpus(self):
+        rng = random.Random(0)
+        corpus = TestFastLexer.corpus() + [
+            "".join(rng.choice(TestFastLexer.fragments)
+                    for _ in range(rng.randint(1, 20)))
+            for _ in range(300)]
+        for data in corpus:
+            try:
+                expected = Lexer().tokenize_data(data)
+            except LexerException as e:
+                for lexer_class in (Lexer, FastLexer):
+                    with self.assertRaises(LexerException) as context:
+                        lexer_class().tokenize_stream(data)
+                    self.assertEqual(str(context.exception), str(e))
+                continue
+            for lexer_class in (Lexer, FastLexer):
+                stream = lexer_class().tokenize_stream(data)
+                self.assertEqual(len(stream), len(expected))
+                self.assertEqual(
+                    [(token.type, token.value, token.lineno, token.lexpos)
+                     for token in (stream[i] for i in range(len(stream)))],
+                    [(token.type, token.value, token.lineno, token.lexpos)
+                     for token in expected])
+
+    def test_stream(self):
+        data = """
+            <** @description: P **>
+            package P
+            const UInt8 C = 0x1F
+        """
+        stream = FastLexer().tokenize_stream(data)
+        self.assertEqual([token_type for token_type, _, _ in stream], [
+            "STRUCTURED_COMMENT", "PACKAGE", "ID", "CONST", "UINT8", "ID",
+            "=", "HEXADECIMAL_VAL"])
+        self.assertEqual(stream.type(-1), "HEXADECIMAL_VAL")
+        self.assertEqual(stream.text(-1), "0x1F")
+        self.assertEqual(stream.value(-1), 31)
+        self.assertEqual(stream.text(0), "<** @description: P **>")
+        self.assertEqual(stream.value(0), "@description: P")
+        self.assertEqual(list(stream.lines), [2, 3, 3, 4, 4, 4, 4, 4])
+        self.assertEqual(stream.nbytes, 8 * TokenStream.bytes_per_token)
+
+    def test_slice(self):
+        stream = Lexer().tokenize_stream("package P.Q")
+        tail = stream[1:]
+        self.assertIsInstance(tail, TokenStream)
+        self.assertEqual(list(tail), [("ID", 8, 9), (".", 9, 10),
+                                      ("ID", 10, 11)])
+        self.assertEqual(tail.value(2), "Q")
+        self.assertEqual(len(tail[1:2]), 1)
+        if isinstance(stream.starts, memoryview):
+            # Slices share the arrays.
+            self.assertIs(tail.starts.obj, stream.starts.obj)
+
+
+def native(text):
+    """Get a native string - encoded in UTF-8 on Python 2."""
+    return text.encode("utf-8") if str is bytes else text
+
+
+class TestFileInput(unittest.TestCase):
+    """Test the memory-mapped file input."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def tmp_file(self, content):
+        fspec = os.path.join(self.tmp_dir, "input.fidl")
+        with open(fspec, "wb") as f:
+            f.write(content)
+        return fspec
+
+    @staticmethod
+    def _tokenize(lexer, data):
+        """
+        Get the tokens of an input as tuples without the positions and the
+        lexer error.
+        """
+        tokens = []
+        lexer.lexer.lineno = 1
+        lexer.lexer.input(data)
+        try:
+            while True:
+                token = lexer.lexer.token()
+                if not token:
+                    break
+                tokens.append((token.type, token.value, token.lineno))
+        except LexerException as e:
+            return tokens, str(e)
+        finally:
+            lexer.lexer.input("")
+        return tokens, None
+
+    def test_corpus(self):
+        lexer = FastLexer()
+        for data in TestFastLexer.corpus():
+            expected = self._tokenize(lexer, data)
+            for newline in ("\n", "\r\n"):
+                fspec = self.tmp_file(
+                    data.replace("\n", newline).encode("utf-8"))
+                with open_input(fspec, use_mmap=True) as buffer:
+                    self.assertEqual(self._tokenize(lexer, buffer), expected)
+
+    def test_parse_file(self):
+        fspec = self.tmp_file(
+            u"""
+            <** @description: Gr\u00fc\u00dfe **>
+            package P
+            typeCollection TC {
+                const String S = "\u00e4\n\u00f6"
+            }
+            """.replace(u"\n", u"\r\n").encode("utf-8"))
+        package = Parser(use_mmap=True).parse_file(fspec)
+        expected = Parser(encoding="utf-8").parse_file(fspec)
+        self.assertEqual(package.comments["@description"],
+                         native(u"Gr\u00fc\u00dfe"))
+        self.assertEqual(package.comments, expected.comments)
+        self.assertEqual(package.files, [fspec])
+        value = package.typecollections["TC"].constants["S"].value.value
+        expected_value = \
+            expected.typecollections["TC"].constants["S"].value.value
+        self.assertEqual(value, native(u"\u00e4\n\u00f6"))
+        self.assertEqual(value, expected_value)
+        self.assertIs(type(value), type(expected_value))
+        for key, comment in package.comments.items():
+            self.assertIs(type(comment), type(expected.comments[key]))
+
+    def test_empty_file(self):
+        fspec = self.tmp_file(b"")
+        with open_input(fspec, use_mmap=True) as buffer:
+            self.assertEqual(self._tokenize(FastLexer(), buffer), ([], None))
+
+    def test_errors(self):
+        fspec = self.tmp_file(b"package P\r\n  \xc3\xa4")
+        with self.assertRaises(LexerException) as context:
+            FastLexer().tokenize_file(fspec, use_mmap=True)
+        # Python 2 reports the first byte, like for text input.
+        self.assertEqual(str(context.exception),
+                         "Illegal character '\xc3' at line 2." if str is bytes
+                         else u"Illegal character '\u00e4' at line 2.")
+        with self.assertRaises(LexerException):
+            Lexer().tokenize_file(fspec, use_mmap=True)
+        with self.assertRaises(ValueError):
+            Parser(the_lexer=Lexer(), use_mmap=True)
+        with self.assertRaises(ValueError):
+            with open_input(fspec, "utf-16", use_mmap=True):
+                pass
@@ -3,8 +3,13 @@ Pyfranca lexer and parser tests.
 """
 
 import unittest
+import os
+import shutil
+import pickle
+import tempfile
 
-from pyfranca import LexerException, ParserException, Parser, ast
+from pyfranca import Lexer, LexerException, ParserException, Parser, ast, \
+    LAZY_COMMENTS, NO_COMMENTS, ParserProfile
 
 
 class BaseTestCase(unittest.TestCase):
@@ -1325,3 +1330,292 @@ class TestConstants(BaseTestCase):
         """)
         self.assertEqual(str(context.exception),
                          "Syntax error at line 4 near 'UInt32'.")
+
+
+class TestParserReuse(BaseTestCase):
+    """Test reusing a parser for multiple inputs."""
+
+    def test_own_lexer(self):
+        lexer = Lexer()
+        parser = Parser(the_lexer=lexer)
+        Lexer()
+        parser.parse("package P")
+        self.assertEqual(lexer.lexer.lexdata, "package P")
+
+    def test_reuse(self):
+        parser = Parser()
+        with self.assertRaises(ParserException):
+            parser.parse("""
+                package P
+                interface I {
+                    method M {
+            """)
+        with self.assertRaises(ParserException) as context:
+            parser.parse("""
+                package P
+                interface {
+            """)
+        self.assertEqual(str(context.exception),
+                         "Syntax error at line 3 near '{'.")
+        package = parser.parse("package P2")
+        self.assertEqual(package.name, "P2")
+
+
+class TestTableCache(BaseTestCase):
+    """Test the LALR table cache."""
+
+    def setUp(self):
+        self.table_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        Parser.clear_table_cache()
+        shutil.rmtree(self.table_dir)
+
+    def test_shared_tables(self):
+        parser = Parser()
+        parser2 = Parser()
+        self.assertIsNot(parser._parser, parser2._parser)
+        self.assertIs(parser._parser.action, parser2._parser.action)
+        self.assertIs(parser._parser.goto, parser2._parser.goto)
+        package = parser2.parse("package P")
+        self.assertEqual(package.name, "P")
+
+    def test_grammar_signature(self):
+        self.assertEqual(Parser.grammar_signature(),
+                         Parser.grammar_signature())
+        self.assertNotEqual(Parser.grammar_signature(),
+                            Parser.grammar_signature(["ID"]))
+
+    def test_table_file(self):
+        Parser.clear_table_cache()
+        Parser(table_dir=self.table_dir)
+        files = os.listdir(self.table_dir)
+        self.assertEqual(len(files), 1)
+        self.assertIn(Parser.grammar_signature(), files[0])
+        Parser.clear_table_cache()
+        package = Parser(table_dir=self.table_dir).parse("package P")
+        self.assertEqual(package.name, "P")
+
+    def test_damaged_table_file(self):
+        fspec = os.path.join(self.table_dir, "franca_parsetab_{}.pickle".format(
+            Parser.grammar_signature()))
+        with open(fspec, "w") as f:
+            f.write("garbage")
+        Parser.clear_table_cache()
+        package = Parser(table_dir=self.table_dir).parse("package P")
+        self.assertEqual(package.name, "P")
+        self.assertEqual(os.listdir(self.table_dir), [os.path.basename(fspec)])
+        Parser.clear_table_cache()
+        package = Parser(table_dir=self.table_dir).parse("package P")
+        self.assertEqual(package.name, "P")
+
+
+class TestStructuredComments(BaseTestCase):
+    """Test the structured comment scanner."""
+
+    def test_single_pass(self):
+        comments = Parser.parse_structured_comment(
+            "<** ignored @see:a@author b\n@see c @experimental **>")
+        self.assertEqual(list(comments.items()), [
+            ("@see", "c"), ("@author", "b"), ("@experimental", "**>")])
+
+    def test_no_tags(self):
+        comments = Parser.parse_structured_comment("<** no tags **>")
+        self.assertEqual(len(comments), 0)
+
+    def test_custom_tag(self):
+        class TagParser(Parser):
+            pass
+        TagParser.register_comment_tag("@seealso")
+        TagParser.register_comment_tag("@seealso")
+        self.assertEqual(TagParser.comment_tags.count("@seealso"), 1)
+        self.assertNotIn("@seealso", Parser.comment_tags)
+        comments = TagParser.parse_structured_comment(
+            "@seealso : X @see Y")
+        self.assertEqual(comments["@seealso"], "X")
+        self.assertEqual(comments["@see"], "Y")
+        comments = Parser.parse_structured_comment("@seealso : X")
+        self.assertEqual(comments["@see"], "also : X")
+        package = TagParser().parse("""
+            <** @seealso: Q **>
+            package P
+        """)
+        self.assertEqual(package.comments["@seealso"], "Q")
+
+    def test_invalid_tag(self):
+        class TagParser(Parser):
+            pass
+        for tag in ("requirement", "@"):
+            with self.assertRaises(ValueError):
+                TagParser.register_comment_tag(tag)
+
+
+class TestCommentModes(BaseTestCase):
+    """Test the lazy and disabled structured comment modes."""
+
+    fidl = """
+        <** @description: Package P **>
+        package P
+        interface I {
+            <** @description: Method M
+                @see: N
+            **>
+            method M {
+                in {
+                    <** no tags **>
+                    Int32 a
+                }
+            }
+        }
+    """
+
+    def test_lazy(self):
+        package = Parser(comment_mode=LAZY_COMMENTS).parse(self.fidl)
+        comments = package.interfaces["I"].methods["M"].comments
+        self.assertIsInstance(comments, ast.LazyComments)
+        self.assertFalse(comments.parsed)
+        self.assertEqual(comments["@see"], "N")
+        self.assertTrue(comments.parsed)
+        self.assertEqual(list(comments), ["@description", "@see"])
+        eager = Parser().parse(self.fidl)
+        self.assertEqual(
+            comments, eager.interfaces["I"].methods["M"].comments)
+        self.assertEqual(dict(package.comments), dict(eager.comments))
+        arg = package.interfaces["I"].methods["M"].in_args["a"]
+        self.assertEqual(len(arg.comments), 0)
+        self.assertIs(package.interfaces["I"].comments, ast.EMPTY_MAPPING)
+
+    def test_lazy_pickle(self):
+        package = Parser(comment_mode=LAZY_COMMENTS).parse(self.fidl)
+        package.comments.get("@description")
+        package2 = pickle.loads(pickle.dumps(package))
+        self.assertEqual(package2.comments.raw, package.comments.raw)
+        self.assertFalse(package2.comments.parsed)
+        self.assertEqual(package2.comments["@description"], "Package P")
+
+    def test_no_comments(self):
+        package = Parser(comment_mode=NO_COMMENTS).parse(self.fidl)
+        self.assertIs(package.comments, ast.EMPTY_MAPPING)
+        self.assertIs(package.interfaces["I"].methods["M"].comments,
+                      ast.EMPTY_MAPPING)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Parser(comment_mode="later")
+
+
+class TestScanHeader(BaseTestCase):
+    """Test scanning the package name and imports of files."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def tmp_fidl(self, content):
+        fspec = os.path.join(self.tmp_dir, "P.fidl")
+        with open(fspec, "w") as f:
+            f.write(content)
+        return fspec
+
+    @staticmethod
+    def _imports(imports):
+        return [(i.namespace, i.file) for i in imports]
+
+    def test_models(self):
+        base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "fidl")
+        parser = Parser()
+        for dir_name, _, file_names in os.walk(base_dir):
+            for file_name in file_names:
+                fspec = os.path.join(dir_name, file_name)
+                package = parser.parse_file(fspec)
+                name, imports = parser.scan_header(fspec)
+                self.assertEqual(name, package.name)
+                self.assertEqual(self._imports(imports),
+                                 self._imports(package.imports))
+
+    def test_header(self):
+        fspec = self.tmp_fidl("""
+            <** @description: P **>
+            package P.Q
+            import P.A.* from "a.fidl"
+            import P.B.TC.T from "b.fidl"
+            import model "c.fidl"
+            typeCollection TC {
+                # Not lexed.
+            }
+            import model "d.fidl"
+        """)
+        name, imports = Parser().scan_header(fspec)
+        self.assertEqual(name, "P.Q")
+        self.assertEqual(self._imports(imports), [
+            ("P.A.*", "a.fidl"), ("P.B.TC.T", "b.fidl"), (None, "c.fidl")])
+        self.assertEqual(Parser().scan_header(self.tmp_fidl("package P")),
+                         ("P", []))
+
+    def test_syntax_errors(self):
+        for fidl, message in (
+                ("", "Reached unexpected end of file."),
+                ("interface I {}", "Syntax error at line 1 near 'interface'."),
+                ("package P\nimport model", "Reached unexpected end of file."),
+                ("package P\nimport A.*.B from \"a.fidl\"",
+                 "Syntax error at line 2 near '.'.")):
+            with self.assertRaises(ParserException) as context:
+                Parser().scan_header(self.tmp_fidl(fidl))
+            self.assertEqual(str(context.exception), message)
+            with self.assertRaises(ParserException) as context2:
+                Parser().parse(fidl)
+            self.assertEqual(str(context2.exception), message)
+
+
+class TestProfile(BaseTestCase):
+    """Test the per-production profiling mode."""
+
+    fidl = """
+        package P
+        typeCollection TC {
+            typedef T is Int32
+            typedef U is String
+        }
+        interface I {
+            attribute TC.T a
+        }
+    """
+
+    def test_reductions(self):
+        profile = ParserProfile()
+        parser = Parser(profile=profile)
+        package = parser.parse(self.fidl)
+        self.assertEqual(list(package.interfaces), ["I"])
+        parser.parse(self.fidl)
+        self.assertEqual(profile.parses, 2)
+        self.assertGreater(profile.tokens, 0)
+        self.assertEqual(profile.productions["defs -> defs def"][:2],
+                         ["p_defs_1", 2])
+        self.assertEqual(profile.productions["defs -> def"][:2],
+                         ["p_defs_2", 2])
+        # p_type_1 serves a production per primitive type.
+        self.assertEqual(profile.actions()["p_type_1"][0], 4)
+        self.assertGreaterEqual(profile.parse_time,
+                                profile.lex_time + profile.action_time)
+        report = profile.report()
+        self.assertIn("defs -> defs def", report)
+        self.assertIn("p_type_1", report)
+        profile.reset()
+        self.assertEqual(profile.parses, 0)
+        self.assertEqual(profile.productions["defs -> defs def"][1], 0)
+
+    def test_shared_tables(self):
+        profile = ParserProfile()
+        Parser(profile=profile)
+        Parser().parse(self.fidl)
+        self.assertEqual(profile.parses, 0)
+        self.assertEqual(profile.productions["defs -> defs def"][1], 0)
+
+    def test_syntax_error(self):
+        profile = ParserProfile()
+        with self.assertRaises(ParserException):
+            Parser(profile=profile).parse("package P interface {")
+        self.assertEqual(profile.parses, 1)
@@ -3,11 +3,17 @@ Pyfranca processor tests.
 """
 
 import unittest
+import io
 import os
 import errno
 import shutil
+import threading
+import warnings
 
-from pyfranca import ProcessorException, Processor, ast
+from pyfranca import ProcessorException, ParserException, Processor, \
+    Parser, ParserPool, ProcessorStats, ProcessorHooks, Lexer, FastLexer, \
+    ast, LAZY_COMMENTS, NO_COMMENTS
+from pyfranca.franca_processor import ProcessPoolExecutor
 
 
 class BaseTestCase(unittest.TestCase):
@@ -107,6 +113,21 @@ class TestImports(BaseTestCase):
         p2 = self.processor.packages["P2"]
         self.assertEqual(p2.name, "P2")
 
+    def test_deprecated_references(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.processor.import_string("test.fidl", """
+                package P
+            """)
+            self.assertEqual(caught, [])
+            self.processor.import_string("test2.fidl", """
+                package P2
+            """, ["P"])
+        self.assertEqual([item.category for item in caught],
+                         [DeprecationWarning])
+        self.assertEqual(caught[0].filename, __file__.rstrip("c"))
+        self.assertEqual(len(self.processor.packages), 2)
+
     def test_import_nonexistent_model(self):
         with self.assertRaises(ProcessorException) as context:
             self.processor.import_string("test.fidl", """
@@ -148,6 +169,540 @@ class TestImports(BaseTestCase):
         """)
         self.processor.import_file(fspec)
         # FIXME: What is the correct behavior?
+        graph = self.processor.package_graph()
+        self.assertEqual(graph.find_cycle(), ["P", "P2", "P"])
+        self.assertEqual(graph.strongly_connected_components(),
+                         [["P", "P2"]])
+
+
+class TestParserReuse(BaseTestCase):
+    """Test parser reuse across imported files."""
+
+    def test_parser_reuse(self):
+        parser = self.processor._get_parser()
+        self.processor.import_string("test.fidl", """
+            package P
+        """)
+        self.processor.import_string("test2.fidl", """
+            package P2
+        """)
+        self.assertIs(self.processor._get_parser(), parser)
+        self.assertEqual(len(self.processor.packages), 2)
+
+    def test_state_reset(self):
+        with self.assertRaises(ParserException):
+            self.processor.import_string("test.fidl", """
+                package P
+
+
+                interface {
+            """)
+        with self.assertRaises(ParserException) as context:
+            self.processor.import_string("test2.fidl", """
+                package P2
+                interface I {
+            """)
+        self.assertEqual(str(context.exception),
+                         "Reached unexpected end of file.")
+        with self.assertRaises(ParserException) as context:
+            self.processor.import_string("test3.fidl", """
+                package P3
+                interface {
+            """)
+        self.assertEqual(str(context.exception),
+                         "Syntax error at line 3 near '{'.")
+
+    def test_parser_pool(self):
+        pool = ParserPool()
+        processor = Processor(parser_pool=pool)
+        parser = processor._get_parser()
+        self.assertIs(pool.get(), parser)
+        parsers = []
+        thread = threading.Thread(
+            target=lambda: parsers.append(processor._get_parser()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(parsers[0], parser)
+        processor.import_string("test.fidl", """
+            package P
+        """)
+        self.assertIn("P", processor.packages)
+
+    def test_parser_pool_lexers(self):
+        with self.assertRaises(ValueError):
+            ParserPool(the_lexer=FastLexer())
+        pool = ParserPool(lexer_class=FastLexer)
+        lexers = [pool.get()._lexer]
+        thread = threading.Thread(
+            target=lambda: lexers.append(pool.get()._lexer))
+        thread.start()
+        thread.join()
+        self.assertIsInstance(lexers[0], FastLexer)
+        self.assertIsInstance(lexers[1], FastLexer)
+        self.assertIsNot(lexers[0], lexers[1])
+
+
+class LinkCountingProcessor(Processor):
+    """Processor, counting namespace linking passes."""
+
+    def __init__(self):
+        super(LinkCountingProcessor, self).__init__()
+        self.linked = []
+
+    def _link_namespace(self, namespace):
+        self.linked.append(namespace.name)
+        super(LinkCountingProcessor, self)._link_namespace(namespace)
+
+
+class ImportFilesTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(ImportFilesTestCase, self).setUp()
+        self.processor = LinkCountingProcessor()
+        self.processor.package_paths.append(self.get_spec())
+        self.tmp_fidl("common.fidl", """
+            package P
+            typeCollection Common {
+                typedef A is Int32
+            }
+        """)
+        self.tmp_fidl("types.fidl", """
+            package P
+            import P.Common.* from "common.fidl"
+            typeCollection Types {
+                typedef B is A
+            }
+        """)
+        self.tmp_fidl("I.fidl", """
+            package P2
+            import P.Types.* from "types.fidl"
+            import P.Common.* from "common.fidl"
+            interface I {
+                attribute B b
+            }
+        """)
+        self.tmp_fidl("I2.fidl", """
+            package P2
+            import P.Types.* from "types.fidl"
+            interface I2 {
+                attribute B b
+            }
+        """)
+
+
+class TestImportFiles(ImportFilesTestCase):
+    """Test bulk imports."""
+
+    def test_import_files(self):
+        packages = self.processor.import_files(["I.fidl", "I2.fidl"])
+        self.assertEqual([package.name for package in packages],
+                         ["P2", "P2"])
+        self.assertEqual(len(self.processor.files), 4)
+        p = self.processor.packages["P"]
+        p2 = self.processor.packages["P2"]
+        self.assertEqual(len(p.files), 2)
+        self.assertEqual(len(p2.files), 2)
+        b = p.typecollections["Types"].typedefs["B"]
+        self.assertEqual(p2.interfaces["I"].attributes["b"].type.reference, b)
+        self.assertEqual(p2.interfaces["I2"].attributes["b"].type.reference, b)
+        self.assertEqual(b.type.reference,
+                         p.typecollections["Common"].typedefs["A"])
+
+    def test_link_once(self):
+        self.processor.import_files(["I.fidl", "I2.fidl"])
+        self.assertEqual(sorted(self.processor.linked),
+                         ["Common", "I", "I2", "Types"])
+        # Imported packages are linked first.
+        self.assertEqual(set(self.processor.linked[:2]), {"Common", "Types"})
+        # Merging a file into a linked package links only the new namespaces.
+        self.import_tmp_fidl("I3.fidl", """
+            package P2
+            import P.Common.* from "common.fidl"
+            interface I3 {
+                attribute A a
+            }
+        """)
+        self.assertEqual(sorted(self.processor.linked),
+                         ["Common", "I", "I2", "I3", "Types"])
+
+    def test_import_references(self):
+        self.processor.import_files(["I.fidl", "I2.fidl"])
+        p = self.processor.packages["P"]
+        for package in self.processor.packages.values():
+            for package_import in package.imports:
+                self.assertIs(package_import.package_reference, p)
+
+    def test_dependency_graph(self):
+        self.processor.import_files(["I.fidl", "I2.fidl"])
+        graph = self.processor.graph
+        order = [os.path.basename(fspec)
+                 for fspec in graph.topological_order()]
+        self.assertEqual(order, ["common.fidl", "types.fidl", "I.fidl",
+                                 "I2.fidl"])
+        common = self.get_spec(filename="common.fidl")
+        self.assertEqual(
+            sorted(os.path.basename(fspec)
+                   for fspec in graph.dependents(common)),
+            ["I.fidl", "types.fidl"])
+        packages = self.processor.package_graph()
+        self.assertEqual(packages.topological_order(), ["P", "P2"])
+        self.assertEqual(packages.dependents("P"), ["P2"])
+
+
+class RequirementParser(Parser):
+    """Parser with a custom structured comment tag."""
+    pass
+
+
+@unittest.skipIf(ProcessPoolExecutor is None,
+                 "concurrent.futures not available")
+class TestParallelImport(ImportFilesTestCase):
+    """Test parsing files in worker processes."""
+
+    def test_parallel_parser_pool(self):
+        RequirementParser.register_comment_tag("@requirement")
+        with io.open(self.get_spec(filename="E.fidl"), "w",
+                     encoding="latin-1") as f:
+            f.write(u"""
+                package P3
+                import P.Common.* from "common.fidl"
+                <** @description: Gr\u00fc\u00dfe @requirement: R1 **>
+                typeCollection TC {
+                    typedef T is A
+                }
+            """)
+
+        def import_files(jobs):
+            pool = ParserPool(parser_class=RequirementParser,
+                              lexer_class=FastLexer, encoding="latin-1")
+            processor = Processor(parser_pool=pool)
+            processor.package_paths.append(self.get_spec())
+            processor.import_files(["E.fidl"], jobs=jobs)
+            tc = processor.packages["P3"].typecollections["TC"]
+            return (sorted(os.path.basename(fspec)
+                           for fspec in processor.files),
+                    dict(tc.comments), tc.typedefs["T"].type.reference.name)
+
+        sequential = import_files(1)
+        self.assertEqual(sequential, (
+            ["E.fidl", "common.fidl"],
+            {"@description": u"Gr\u00fc\u00dfe", "@requirement": "R1"},
+            "A"))
+        self.assertEqual(import_files(2), sequential)
+
+    def test_parallel_import(self):
+        packages = self.processor.import_files(["I.fidl", "I2.fidl"], jobs=2)
+        self.assertEqual([package.name for package in packages],
+                         ["P2", "P2"])
+        self.assertEqual(len(self.processor.files), 4)
+        p = self.processor.packages["P"]
+        p2 = self.processor.packages["P2"]
+        b = p.typecollections["Types"].typedefs["B"]
+        self.assertIs(b.namespace.package, p)
+        self.assertIs(p2.interfaces["I"].attributes["b"].type.reference, b)
+        self.assertIs(p2.interfaces["I2"].attributes["b"].type.reference, b)
+        self.assertIs(b.type.reference,
+                      p.typecollections["Common"].typedefs["A"])
+        self.assertEqual(self.processor._preparsed, {})
+
+    def test_parallel_comment_mode(self):
+        self.tmp_fidl("C.fidl", """
+            <** @description: P3 **>
+            package P3
+        """)
+        for comment_mode in (LAZY_COMMENTS, NO_COMMENTS):
+            processor = Processor(comment_mode=comment_mode)
+            processor.package_paths.append(self.get_spec())
+            processor.import_files(["I.fidl", "C.fidl"], jobs=2)
+            comments = processor.packages["P3"].comments
+            if comment_mode == LAZY_COMMENTS:
+                self.assertIsInstance(comments, ast.LazyComments)
+                self.assertEqual(comments["@description"], "P3")
+            else:
+                self.assertIs(comments, ast.EMPTY_MAPPING)
+
+    def test_parallel_late_import(self):
+        # Imports after definitions are not planned, but still loaded.
+        self.tmp_fidl("L.fidl", """
+            package P3
+            typeCollection TC {
+                typedef T is P.Common.A
+            }
+            import P.Common.* from "common.fidl"
+        """)
+        package = self.processor.import_files(["L.fidl"], jobs=2)[0]
+        self.assertEqual(len(self.processor.files), 2)
+        self.assertIs(package.typecollections["TC"].typedefs["T"].type
+                      .reference,
+                      self.processor.packages["P"].typecollections["Common"]
+                      .typedefs["A"])
+
+    def test_parallel_syntax_error(self):
+        self.tmp_fidl("bad.fidl", """
+            package P3
+            import P.Common.* from "common.fidl"
+            interface {
+        """)
+        with self.assertRaises(ParserException) as context:
+            self.processor.import_files(["I.fidl", "bad.fidl"], jobs=2)
+        self.assertEqual(str(context.exception),
+                         "Syntax error at line 4 near '{'.")
+
+    def test_parallel_missing_file(self):
+        self.tmp_fidl("missing.fidl", """
+            package P3
+            import model "nosuch.fidl"
+        """)
+        with self.assertRaises(ProcessorException) as context:
+            self.processor.import_files(["I.fidl", "missing.fidl"], jobs=2)
+        self.assertEqual(str(context.exception),
+                         "Model 'nosuch.fidl' not found.")
+
+
+class TestStats(ImportFilesTestCase):
+    """Test the processor statistics."""
+
+    def test_stats(self):
+        stats = ProcessorStats()
+        processor = Processor(stats=stats)
+        processor.package_paths.append(self.get_spec())
+        processor.import_files(["I.fidl", "I2.fidl"])
+        self.assertEqual(
+            set(stats.stages),
+            {"find", "tables", "load", "lex", "parse", "register", "merge",
+             "link"})
+        self.assertEqual(stats.stages["parse"][2], 4)
+        self.assertEqual(sorted(stats.files), sorted(processor.files))
+        tokens = 0
+        for fspec in processor.files:
+            with open(fspec, "r") as f:
+                tokens += len(Lexer().tokenize_data(f.read()))
+        self.assertEqual(stats.counters["files"], 4)
+        self.assertEqual(stats.counters["tokens"], tokens)
+        self.assertEqual(stats.counters["resolve_calls"], 3)
+        self.assertEqual(stats.counters["resolve_lookups"], 6)
+        self.assertGreater(stats.counters["nodes"], 4)
+        data = stats.as_dict()
+        self.assertEqual(data["counters"]["files"], 4)
+        self.assertEqual(set(data["stages"]["lex"]),
+                         {"wall", "cpu", "calls"})
+        self.assertIn("resolve_calls", stats.report())
+
+    @unittest.skipIf(ProcessPoolExecutor is None,
+                     "concurrent.futures not available")
+    def test_parallel_stats(self):
+        stats = ProcessorStats()
+        processor = Processor(stats=stats)
+        processor.package_paths.append(self.get_spec())
+        processor.import_files(["I.fidl", "I2.fidl"], jobs=2)
+        self.assertIn("parallel", stats.stages)
+        self.assertNotIn("lex", stats.stages)
+        self.assertEqual(stats.counters["files"], 4)
+
+    def test_syntax_error(self):
+        self.tmp_fidl("bad.fidl", """
+            package P3
+            interface {
+        """)
+        stats = ProcessorStats()
+        processor = Processor(stats=stats)
+        with self.assertRaises(ParserException):
+            processor.import_file(self.get_spec(filename="bad.fidl"))
+        self.assertEqual(stats.stages["parse"][2], 1)
+        self.assertEqual(stats.counters["tokens"], 4)
+
+
+class RecordingHooks(ProcessorHooks):
+    """Processor hooks, recording the events."""
+
+    def __init__(self):
+        self.events = []
+
+    def file_resolved(self, fspec, resolved_fspec, timestamp):
+        self.events.append(("file_resolved", os.path.basename(fspec)))
+
+    def parse_started(self, fspec, size, timestamp):
+        self.events.append(("parse_started", os.path.basename(fspec)))
+
+    def parse_finished(self, fspec, package, size, duration, timestamp,
+                       error=None):
+        self.events.append(("parse_finished", os.path.basename(fspec),
+                            package.name if package else str(error)))
+        assert size == os.path.getsize(fspec) and duration >= 0.0
+
+    def file_loaded(self, fspec, package, timestamp):
+        self.events.append(("file_loaded", os.path.basename(fspec),
+                            package.name))
+
+    def package_merged(self, fspec, package, timestamp):
+        self.events.append(("package_merged", os.path.basename(fspec),
+                            package.name))
+
+    def reference_resolved(self, namespace, name, resolved, timestamp):
+        self.events.append(("reference_resolved", namespace.name, name,
+                            resolved.name))
+
+    def namespace_linked(self, namespace, duration, timestamp):
+        self.events.append(("namespace_linked", namespace.name))
+
+
+class TestHooks(ImportFilesTestCase):
+    """Test the processor hooks."""
+
+    def _processor(self, hooks):
+        processor = Processor(hooks=hooks)
+        processor.package_paths.append(self.get_spec())
+        return processor
+
+    def test_events(self):
+        hooks = RecordingHooks()
+        self._processor(hooks).import_files(["I.fidl", "I2.fidl"])
+        self.assertEqual(hooks.events[:4], [
+            ("file_resolved", "I.fidl"),
+            ("parse_started", "I.fidl"),
+            ("parse_finished", "I.fidl", "P2"),
+            ("file_loaded", "I.fidl", "P2")])
+        self.assertIn(("package_merged", "I2.fidl", "P2"), hooks.events)
+        self.assertIn(("package_merged", "common.fidl", "P"), hooks.events)
+        self.assertEqual(
+            [event for event in hooks.events
+             if event[0] in ("reference_resolved", "namespace_linked")], [
+                ("reference_resolved", "Types", "A", "A"),
+                ("namespace_linked", "Types"),
+                ("namespace_linked", "Common"),
+                ("reference_resolved", "I", "B", "B"),
+                ("namespace_linked", "I"),
+                ("reference_resolved", "I2", "B", "B"),
+                ("namespace_linked", "I2")])
+        self.assertEqual(
+            sum(1 for event in hooks.events if event[0] == "file_loaded"), 4)
+
+    @unittest.skipIf(ProcessPoolExecutor is None,
+                     "concurrent.futures not available")
+    def test_parallel_events(self):
+        hooks = RecordingHooks()
+        self._processor(hooks).import_files(["I.fidl", "I2.fidl"], jobs=2)
+        kinds = [event[0] for event in hooks.events]
+        self.assertNotIn("parse_started", kinds)
+        self.assertEqual(kinds.count("file_loaded"), 4)
+        sequential = RecordingHooks()
+        self._processor(sequential).import_files(["I.fidl", "I2.fidl"])
+        self.assertEqual(
+            sorted(event for event in hooks.events
+                   if event[0] == "file_resolved"),
+            sorted(event for event in sequential.events
+                   if event[0] == "file_resolved"))
+
+    def test_syntax_error(self):
+        self.tmp_fidl("bad.fidl", """
+            package P3
+            interface {
+        """)
+        hooks = RecordingHooks()
+        with self.assertRaises(ParserException):
+            self._processor(hooks).import_file("bad.fidl")
+        self.assertEqual(hooks.events[-1], (
+            "parse_finished", "bad.fidl", "Syntax error at line 3 near '{'."))
+
+    def test_no_op_hooks(self):
+        processor = self._processor(ProcessorHooks())
+        processor.import_files(["I.fidl", "I2.fidl"])
+        self.assertEqual(len(processor.files), 4)
+
+
+class TestReload(ImportFilesTestCase):
+    """Test re-importing changed files."""
+
+    def setUp(self):
+        super(TestReload, self).setUp()
+        self.tmp_fidl("unrelated.fidl", """
+            package U
+            typeCollection TC {
+                typedef X is Int32
+            }
+        """)
+        self.processor.import_files(["I.fidl", "I2.fidl", "unrelated.fidl"])
+        self.processor.linked = []
+
+    def test_unchanged(self):
+        self.assertEqual(self.processor.reload(), [])
+        self.assertEqual(self.processor.linked, [])
+
+    def test_rewritten(self):
+        fspec = self.get_spec(filename="common.fidl")
+        with open(fspec) as f:
+            content = f.read()
+        for mtime_offset, reloaded in ((1, [fspec]), (2, [])):
+            self.tmp_fidl("common.fidl", content)
+            stat = os.stat(fspec)
+            os.utime(fspec, (stat.st_atime, stat.st_mtime + mtime_offset))
+            # Files are hashed by the first reload, not on import.
+            self.assertEqual(self.processor.reload(), reloaded)
+
+    def test_reload(self):
+        p = self.processor.packages["P"]
+        p2 = self.processor.packages["P2"]
+        types = p.typecollections["Types"]
+        i = p2.interfaces["I"]
+        fspec = self.tmp_fidl("common.fidl", """
+            package P
+            typeCollection Common {
+                typedef A is UInt32
+            }
+        """)
+        self.assertEqual(self.processor.reload([fspec]), [fspec])
+        # Dependent packages are relinked, unrelated ones are not.
+        self.assertEqual(sorted(self.processor.linked),
+                         ["Common", "I", "I2", "Types"])
+        self.assertIs(self.processor.packages["P"], p)
+        self.assertIs(p.typecollections["Types"], types)
+        self.assertIs(p2.interfaces["I"], i)
+        a = p.typecollections["Common"].typedefs["A"]
+        self.assertIsInstance(a.type, ast.UInt32)
+        self.assertIs(types.typedefs["B"].type.reference, a)
+        self.assertEqual(len(p.files), 2)
+        self.assertEqual(len(self.processor.files), 5)
+        self.assertEqual(len(p.imports), 1)
+
+    def test_reload_all(self):
+        self.tmp_fidl("I2.fidl", """
+            package P2
+            import P.Types.* from "types.fidl"
+            interface I3 {
+                attribute B b
+            }
+        """)
+        reloaded = self.processor.reload()
+        self.assertEqual([os.path.basename(fspec) for fspec in reloaded],
+                         ["I2.fidl"])
+        p2 = self.processor.packages["P2"]
+        self.assertEqual(list(p2.interfaces.keys()), ["I", "I3"])
+        b = self.processor.packages["P"].typecollections["Types"].typedefs["B"]
+        self.assertIs(p2.interfaces["I3"].attributes["b"].type.reference, b)
+        self.assertEqual(sorted(self.processor.linked), ["I", "I3"])
+
+    def test_changed_paths(self):
+        fspec = self.tmp_fidl("common.fidl", """
+            package P
+            typeCollection Common {
+                typedef A is UInt32
+            }
+        """)
+        self.assertEqual(
+            self.processor.reload([self.get_spec(filename="types.fidl")]), [])
+        self.assertEqual(self.processor.reload([fspec]), [fspec])
+
+    def test_removed_type(self):
+        fspec = self.tmp_fidl("common.fidl", """
+            package P
+            typeCollection Common {
+                typedef A2 is UInt32
+            }
+        """)
+        with self.assertRaises(ProcessorException) as context:
+            self.processor.reload([fspec])
+        self.assertEqual(str(context.exception),
+                         "Unresolved reference 'A'.")
 
 
 class TestPackagesInMultipleFiles(BaseTestCase):
@@ -330,6 +885,53 @@ class TestReferences(BaseTestCase):
         self.assertEqual(b.type.name, "A")
         self.assertEqual(b.type.reference, a)
 
+    def test_fqn_reference_to_different_model(self):
+        self.processor.import_string("test.fidl", """
+            package P.Q
+            typeCollection TC {
+                typedef A is Int32
+            }
+            interface I {
+                struct S { Int32 a }
+            }
+        """)
+        self.processor.import_string("test2.fidl", """
+            package P2
+            import P.Q.TC.* from "test.fidl"
+            import P.Q.I.* from "test.fidl"
+            interface I {
+                typedef B is P.Q.TC.A
+                typedef C is P.Q.I.S
+            }
+        """)
+        p = self.processor.packages["P.Q"]
+        i = self.processor.packages["P2"].interfaces["I"]
+        self.assertEqual(i.typedefs["B"].type.reference,
+                         p.typecollections["TC"].typedefs["A"])
+        self.assertEqual(i.typedefs["C"].type.reference,
+                         p.interfaces["I"].structs["S"])
+
+    def test_fqn_reference_without_import(self):
+        self.processor.import_string("test.fidl", """
+            package P
+            typeCollection TC {
+                typedef A is Int32
+            }
+            typeCollection TC2 {
+                typedef A2 is Int32
+            }
+        """)
+        with self.assertRaises(ProcessorException) as context:
+            self.processor.import_string("test2.fidl", """
+                package P2
+                import P.TC2.* from "test.fidl"
+                interface I {
+                    typedef B is P.TC.A
+                }
+            """)
+        self.assertEqual(str(context.exception),
+                         "Unresolved reference 'P.TC.A'.")
+
     def test_unresolved_reference_in_typedef(self):
         with self.assertRaises(ProcessorException) as context:
             self.processor.import_string("test.fidl", """
@@ -546,6 +1148,55 @@ class TestReferences(BaseTestCase):
         i3 = self.processor.packages["P2"].interfaces["I3"]
         self.assertEqual(i3.reference, i)
 
+    def test_interface_extension3(self):
+        self.processor.import_string("test.fidl", """
+            package P.Q
+            interface I { }
+        """)
+        self.processor.import_string("test2.fidl", """
+            package P2
+            import model "test.fidl"
+            interface I2 extends P.Q.I { }
+        """)
+        i = self.processor.packages["P.Q"].interfaces["I"]
+        i2 = self.processor.packages["P2"].interfaces["I2"]
+        self.assertEqual(i2.reference, i)
+
+    def test_static_resolve(self):
+        self.processor.import_string("test.fidl", """
+            package P.Q
+            typeCollection TC {
+                typedef A is Int32
+            }
+            interface I {
+                struct S { Int32 a }
+            }
+        """)
+        self.processor.import_string("test2.fidl", """
+            package P2
+            import P.Q.TC.* from "test.fidl"
+            import P.Q.I.* from "test.fidl"
+            import model "test.fidl"
+            typeCollection TC2 {
+                typedef C is Int32
+            }
+            interface I2 extends P.Q.I {
+                typedef B is A
+            }
+        """)
+        p2 = self.processor.packages["P2"]
+        i2 = p2.interfaces["I2"]
+        for name in ("A", "B", "C", "S", "P.Q.TC.A", "P.Q.I.S", "P2.TC2.C"):
+            self.assertIs(Processor.resolve(i2, name),
+                          self.processor._resolve(i2, name))
+        for name in ("I", "P.Q.I", "I2", "P2.TC2"):
+            self.assertIs(Processor.resolve_namespace(p2, name),
+                          self.processor._resolve_namespace(p2, name))
+        with self.assertRaises(ProcessorException) as context:
+            Processor.resolve(i2, "P.Q.TC.S")
+        self.assertEqual(str(context.exception),
+                         "Unresolved reference 'P.Q.TC.S'.")
+
     def test_invalid_interface_extension(self):
         with self.assertRaises(ProcessorException) as context:
             self.processor.import_string("test.fidl", """
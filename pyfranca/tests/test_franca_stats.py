@@ -0,0 +1,48 @@
+"""
+Pyfranca processing statistics tests.
+"""
+
+import unittest
+
+from pyfranca import ProcessorStats
+
+
+class TestProcessorStats(unittest.TestCase):
+    """Test the statistics collector."""
+
+    def test_nested_stages(self):
+        stats = ProcessorStats()
+        with stats.timer("outer", "a.fidl"):
+            with stats.timer("inner"):
+                pass
+            stats.add("measured", 10.0, 5.0)
+        self.assertEqual(list(stats.stages), ["inner", "measured", "outer"])
+        self.assertEqual(stats.stages["measured"], [10.0, 5.0, 1])
+        # The nested times are excluded from the outer stage.
+        self.assertLess(stats.stages["outer"][0], 0.0)
+        self.assertEqual(list(stats.files["a.fidl"]),
+                         ["inner", "measured", "outer"])
+
+    def test_exception(self):
+        stats = ProcessorStats()
+        with self.assertRaises(ValueError):
+            with stats.timer("stage"):
+                raise ValueError()
+        self.assertEqual(stats.stages["stage"][2], 1)
+        with stats.timer("stage"):
+            pass
+        self.assertEqual(stats.stages["stage"][2], 2)
+        self.assertEqual(stats.files, {})
+
+    def test_counters(self):
+        stats = ProcessorStats()
+        stats.count("files")
+        stats.count("tokens", 10)
+        stats.count("tokens", 5)
+        self.assertEqual(stats.counters, {"files": 1, "tokens": 15})
+        report = stats.report()
+        self.assertIn("tokens", report)
+        self.assertIn("15", report)
+        stats.reset()
+        self.assertEqual(stats.as_dict(),
+                         {"stages": {}, "files": {}, "counters": {}})
@@ -22,7 +22,7 @@ version = read_package_variable("__version__")
 
 setup(
     name="pyfranca",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     version=version,
     description="Python parser and tools for working with the Franca "
                 "interface definition language.",
@@ -42,6 +42,7 @@ setup(
     test_suite="pyfranca.tests.get_suite",
     scripts=[
         "tools/fidl_dump.py",
+        "tools/fidl_generator.py",
         "tools/fidl_validator.py",
     ],
 )
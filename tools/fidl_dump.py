@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 
 import argparse
-from pyfranca import Processor, LexerException, ParserException, \
-    ProcessorException
+from pyfranca import Processor, ASTCache, LexerException, \
+    ParserException, ProcessorException
 
 
 def dump_comments(item, prefix):
@@ -101,6 +101,15 @@ def parse_command_line():
     parser.add_argument(
         "-I", "--import", dest="import_dirs", metavar="import_dir",
         action="append", help="Model import directories.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Number of processes to parse files with.")
+    parser.add_argument(
+        "--cache", dest="cache_dir", metavar="cache_dir",
+        help="Directory to cache parsed files in.")
+    parser.add_argument(
+        "--cache-size", type=int, default=None, metavar="MB",
+        help="Maximum cache size in megabytes.")
     args = parser.parse_args()
     return args
 
@@ -108,13 +117,16 @@ def parse_command_line():
 def main():
     args = parse_command_line()
 
-    processor = Processor()
+    cache = None
+    if args.cache_dir:
+        max_size = args.cache_size * 1024 * 1024 if args.cache_size else None
+        cache = ASTCache(args.cache_dir, max_size)
+    processor = Processor(cache=cache)
     if args.import_dirs:
         processor.package_paths.extend(args.import_dirs)
 
     try:
-        for fidl in args.fidl:
-            processor.import_file(fidl)
+        processor.import_files(args.fidl, jobs=args.jobs)
     except (LexerException, ParserException, ProcessorException) as e:
         print("ERROR: {}".format(e))
         exit(1)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+from pyfranca import ModelGenerator
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Synthetic Franca model generator.")
+    parser.add_argument(
+        "output_dir",
+        help="Directory to write the FIDL files to.")
+    parser.add_argument(
+        "-p", "--packages", type=int, default=10,
+        help="Number of packages (files).")
+    parser.add_argument(
+        "-i", "--interfaces", type=int, default=2,
+        help="Number of interfaces per package.")
+    parser.add_argument(
+        "-m", "--methods", type=int, default=5,
+        help="Number of methods per interface.")
+    parser.add_argument(
+        "-a", "--attributes", type=int, default=5,
+        help="Number of attributes per interface.")
+    parser.add_argument(
+        "-b", "--broadcasts", type=int, default=2,
+        help="Number of broadcasts per interface.")
+    parser.add_argument(
+        "-t", "--types", type=int, default=6,
+        help="Number of types per type collection.")
+    parser.add_argument(
+        "--struct-fields", type=int, default=5,
+        help="Number of fields per structure.")
+    parser.add_argument(
+        "--enumerators", type=int, default=5,
+        help="Number of enumerators per enumeration.")
+    parser.add_argument(
+        "--imports", type=int, default=2,
+        help="Maximum number of packages a package imports.")
+    parser.add_argument(
+        "--depth", type=int, default=3,
+        help="Number of import levels.")
+    parser.add_argument(
+        "--comments", type=float, default=0.5,
+        help="Fraction of the elements with structured comments.")
+    parser.add_argument(
+        "--anonymous-arrays", type=float, default=0.1,
+        help="Fraction of the typed elements with anonymous array types.")
+    parser.add_argument(
+        "--package-prefix", default="gen",
+        help="Prefix of the package names.")
+    parser.add_argument(
+        "-s", "--seed", type=int, default=0,
+        help="Random seed.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    try:
+        generator = ModelGenerator(
+            packages=args.packages, interfaces=args.interfaces,
+            methods=args.methods, attributes=args.attributes,
+            broadcasts=args.broadcasts, types=args.types,
+            struct_fields=args.struct_fields, enumerators=args.enumerators,
+            imports=args.imports, depth=args.depth, comments=args.comments,
+            anonymous_arrays=args.anonymous_arrays,
+            package_prefix=args.package_prefix, seed=args.seed)
+    except ValueError as e:
+        print("ERROR: {}".format(e))
+        exit(1)
+    fspecs = generator.write(args.output_dir)
+
+    size = sum(os.path.getsize(fspec) for fspec in fspecs)
+    print("Generated {} files, {:.1f} kB in '{}'.".format(
+        len(fspecs), size / 1024.0, args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
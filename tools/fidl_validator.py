@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 
 import argparse
-from pyfranca import Processor, LexerException, ParserException, \
-    ProcessorException
+from pyfranca import Processor, ASTCache, ProcessorStats, LexerException, \
+    ParserException, ProcessorException, NO_COMMENTS
 
 
 def parse_command_line():
@@ -14,6 +14,18 @@ def parse_command_line():
     parser.add_argument(
         "-I", "--import", dest="import_dirs", metavar="import_dir",
         action="append", help="Model import directories.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Number of processes to parse files with.")
+    parser.add_argument(
+        "--cache", dest="cache_dir", metavar="cache_dir",
+        help="Directory to cache parsed files in.")
+    parser.add_argument(
+        "--cache-size", type=int, default=None, metavar="MB",
+        help="Maximum cache size in megabytes.")
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="Print the processing times per stage and counters.")
     args = parser.parse_args()
     return args
 
@@ -21,18 +33,27 @@ def parse_command_line():
 def main():
     args = parse_command_line()
 
-    processor = Processor()
+    cache = None
+    if args.cache_dir:
+        max_size = args.cache_size * 1024 * 1024 if args.cache_size else None
+        cache = ASTCache(args.cache_dir, max_size)
+    stats = ProcessorStats() if args.stats else None
+    # Structured comments are not validated.
+    processor = Processor(cache=cache, comment_mode=NO_COMMENTS, stats=stats)
     if args.import_dirs:
         processor.package_paths.extend(args.import_dirs)
 
     try:
-        for fidl in args.fidl:
-            processor.import_file(fidl)
+        processor.import_files(args.fidl, jobs=args.jobs)
     except (LexerException, ParserException, ProcessorException) as e:
         print("ERROR: {}".format(e))
+        if stats:
+            print(stats.report())
         exit(1)
 
     print("Valid Franca model.")
+    if stats:
+        print(stats.report())
 
 
 if __name__ == "__main__":